@@ -5,6 +5,10 @@ from typing import Tuple, List, Dict, Any
 import csv
 import math
 
+from columnar_dataset import ColumnarDataset
+from mapped_csv import MappedCSV
+import dataset_snapshot
+
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
     """Calculate the start and end index for the given page and page size.
@@ -26,13 +30,41 @@ class Server:
     """
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, columnar: bool = False, mapped: bool = False,
+                 snapshot: bool = False):
+        """Initialize the server.
+
+        Args:
+            columnar (bool): keep the dataset column by column, see
+                ColumnarDataset, instead of as a list of rows.
+            mapped (bool): read the rows of each page from a mmap of the
+                file, see MappedCSV, instead of parsing it all.
+            snapshot (bool): map the columnar dataset from its binary
+                snapshot, built when missing or out of date, see
+                dataset_snapshot.
+        """
         self.__dataset = None
+        self.columnar = columnar
+        self.mapped = mapped
+        self.snapshot = snapshot
 
     def dataset(self) -> List[List]:
         """Cached dataset
+
+        A columnar or mapped dataset is indexed and sliced like the list
+        of rows, but only builds the rows of the slices asked for.
         """
         if self.__dataset is None:
+            if self.snapshot:
+                self.__dataset = dataset_snapshot.load_or_build(
+                    self.DATA_FILE)
+                return self.__dataset
+            if self.mapped:
+                self.__dataset = MappedCSV(self.DATA_FILE)
+                return self.__dataset
+            if self.columnar:
+                self.__dataset = ColumnarDataset.from_csv(self.DATA_FILE)
+                return self.__dataset
             with open(self.DATA_FILE) as f:
                 reader = csv.reader(f)
                 dataset = [row for row in reader]
@@ -4,6 +4,13 @@
 from typing import Tuple, List, Dict, Any
 import csv
 import math
+import os
+
+from columnar_dataset import ColumnarDataset
+from indexed_dataset import IndexedDataset
+from keyset_cursor import AFTER, BEFORE, decode_cursor, encode_cursor
+from mapped_csv import MappedCSV
+import dataset_snapshot
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -26,13 +33,46 @@ class Server:
     """
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, columnar: bool = False, mapped: bool = False,
+                 snapshot: bool = False, secret: bytes = None):
+        """Initialize the server.
+
+        Args:
+            columnar (bool): keep the dataset column by column, see
+                ColumnarDataset, instead of as a list of rows.
+            mapped (bool): read the rows of each page from a mmap of the
+                file, see MappedCSV, instead of parsing it all.
+            snapshot (bool): map the columnar dataset from its binary
+                snapshot, built when missing or out of date, see
+                dataset_snapshot.
+            secret (bytes): the key cursors are signed with, random by
+                default: servers must share it to accept each other's
+                cursors.
+        """
         self.__dataset = None
+        self.__indexed_dataset = None
+        self.columnar = columnar
+        self.mapped = mapped
+        self.snapshot = snapshot
+        self.secret = secret or os.urandom(32)
 
     def dataset(self) -> List[List]:
         """Cached dataset
+
+        A columnar or mapped dataset is indexed and sliced like the list
+        of rows, but only builds the rows of the slices asked for.
         """
         if self.__dataset is None:
+            if self.snapshot:
+                self.__dataset = dataset_snapshot.load_or_build(
+                    self.DATA_FILE)
+                return self.__dataset
+            if self.mapped:
+                self.__dataset = MappedCSV(self.DATA_FILE)
+                return self.__dataset
+            if self.columnar:
+                self.__dataset = ColumnarDataset.from_csv(self.DATA_FILE)
+                return self.__dataset
             with open(self.DATA_FILE) as f:
                 reader = csv.reader(f)
                 dataset = [row for row in reader]
@@ -40,6 +80,17 @@ class Server:
 
         return self.__dataset
 
+    def indexed_dataset(self) -> Dict[int, List]:
+        """Dataset indexed by sorting position, starting at 0
+
+        The IndexedDataset is used like the dict {position: row}: rows
+        can be deleted or added, and the live rows from a position are
+        found without walking over the deleted ones.
+        """
+        if self.__indexed_dataset is None:
+            self.__indexed_dataset = IndexedDataset(self.dataset())
+        return self.__indexed_dataset
+
     def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
         """
         Get a page of data from the dataset.
@@ -112,6 +163,10 @@ class Server:
                 - "data": The list of items for the page.
                 - "page_size": The size of the page.
                 - "next_index": The next valid index after the page.
+                - "page": The page number of the first item, counting
+                          only the rows not deleted.
+                - "total_items": The number of rows not deleted.
+                - "total_pages": The number of pages of these rows.
 
         Raises:
             AssertionError: If `index` or `page_size` is not an integer.
@@ -119,27 +174,77 @@ class Server:
         """
         # Validate input
         assert isinstance(index, int), "index must be an integer"
-        assert isinstance(page_size, int)
-        csv = self.indexed_dataset()
-        csv_size = len(csv)
-        assert 0 <= index < csv_size
-
-        data = []
-        current_index = index
-
-        # Gather data, skipping missing entries
-        for _ in range(page_size):
-            while current_index < csv_size and current_index not in csv:
-                current_index += 1
-            if current_index < csv_size:
-                data.append(csv[current_index])
-                current_index += 1
-            else:
-                break
+        assert isinstance(page_size, int) and page_size > 0
+        indexed = self.indexed_dataset()
+        assert 0 <= index < indexed.end
+
+        # the live rows from index, found in O(page_size + log n)
+        rows = indexed.take(index, page_size)
+        data = [row for _, row in rows]
+        next_index = rows[-1][0] + 1 if rows else indexed.end
+        start = rows[0][0] if rows else index
+        total_items = len(indexed)
 
         return {
             "index": index,
             "data": data,
             "page_size": len(data),
-            "next_index": current_index if current_index < csv_size else None
+            "next_index": next_index if next_index < indexed.end else None,
+            "page": indexed.rank(start) // page_size + 1,
+            "total_items": total_items,
+            "total_pages": math.ceil(total_items / page_size)
+        }
+
+    def get_cursor(self, cursor: str = None,
+                   page_size: int = 10) -> Dict[str, Any]:
+        """
+        Return the page of rows following (or preceding) a cursor.
+
+        A cursor is an opaque, signed token naming the position of a row
+        (positions never move, see IndexedDataset), so a page starts
+        right after the rows already seen even if rows were deleted or
+        appended in between, and it costs O(page_size + log n) however
+        deep it is.
+
+        Args:
+            cursor (str): A "next_cursor" or "prev_cursor" of a previous
+                page, None for the first page.
+            page_size (int): The number of items per page.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing:
+                - "data": List of items on the page.
+                - "page_size": Number of items on the page.
+                - "next_cursor": Cursor of the following page
+                                 (or None if there is no following row).
+                - "prev_cursor": Cursor of the preceding page
+                                 (or None if there is no preceding row).
+
+        Raises:
+            AssertionError: If `page_size` is not a positive integer.
+            ValueError: If `cursor` was not issued with this secret.
+        """
+        assert isinstance(page_size, int) and page_size > 0
+        indexed = self.indexed_dataset()
+        if cursor is None:
+            direction, position = AFTER, -1
+        else:
+            direction, position = decode_cursor(self.secret, cursor)
+
+        if direction == AFTER:
+            rows = indexed.take(position + 1, page_size)
+            first, last = position + 1, position
+        else:
+            rows = indexed.take_before(position, page_size)
+            first, last = position, position - 1
+        if rows:
+            first, last = rows[0][0], rows[-1][0]
+
+        return {
+            "data": [row for _, row in rows],
+            "page_size": len(rows),
+            "next_cursor": encode_cursor(self.secret, AFTER, last)
+            if indexed.rank(last + 1) < len(indexed) else None,
+            "prev_cursor": encode_cursor(self.secret, BEFORE, first)
+            if first > 0 and indexed.rank(first) > 0 else None
         }
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Main file
+"""
+import tracemalloc
+
+Server = __import__('2-hypermedia_pagination').Server
+
+server = Server(columnar=True)
+
+print(server.get_page(1, 3))
+print(server.get_hyper(100, 3))
+print(server.get_page(3000, 100))
+print(server.get_page(1, 3) == Server().get_page(1, 3))
+
+for columnar in (False, True):
+    tracemalloc.start()
+    dataset = Server(columnar=columnar).dataset()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("columnar={}: {} KiB".format(columnar, size // 1024))
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Main file
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+Server = __import__('1-simple_pagination').Server
+
+server = Server(mapped=True)
+print(server.get_page(1, 3))
+print(server.get_page(3, 2))
+print(server.get_page(3000, 100))
+print(server.get_page(24, 100) == Server().get_page(24, 100))
+
+# a copy of the dataset 100 times bigger
+path = os.path.join(tempfile.gettempdir(), "5-main.csv")
+with open(Server.DATA_FILE) as f:
+    header = f.readline()
+    rows = f.read()
+with open(path, "w") as f:
+    f.write(header)
+    for _ in range(100):
+        f.write(rows)
+
+
+class BigServer(Server):
+    """Server of the big copy"""
+    DATA_FILE = path
+
+
+for label, options in (("csv", {}), ("mapped, first run", {"mapped": True}),
+                       ("mapped, saved index", {"mapped": True})):
+    tracemalloc.start()
+    start = time.perf_counter()
+    big = BigServer(**options)
+    page = big.get_page(1000, 10)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("{}: {} rows, page 1000 in {:.0f} ms, {} KiB held".format(
+        label, len(big.dataset()), elapsed * 1000, size // 1024))
+    del big
+
+os.unlink(path)
+os.unlink(path + ".offsets")
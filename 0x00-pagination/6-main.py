@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Main file
+"""
+import os
+import shutil
+import tempfile
+
+Server = __import__('2-hypermedia_pagination').Server
+dataset_snapshot = __import__('dataset_snapshot')
+
+# the first server builds Popular_Baby_Names.csv.snapshot, the next ones
+# map it
+server = Server(snapshot=True)
+print(server.get_hyper(1, 2))
+print(server.get_hyper(100, 3) == Server().get_hyper(100, 3))
+print(os.path.exists(dataset_snapshot.default_path(Server.DATA_FILE)))
+print(dataset_snapshot.verify(Server.DATA_FILE))
+
+for way, seconds in dataset_snapshot.bench(Server.DATA_FILE).items():
+    print("{}: {:.2f} ms".format(way, seconds * 1000))
+
+# after a touch the CSV is hashed once, then its new mtime is trusted
+copy = os.path.join(tempfile.mkdtemp(), "names.csv")
+shutil.copyfile(Server.DATA_FILE, copy)
+dataset_snapshot.load_or_build(copy)
+os.utime(copy, ns=(0, 10 ** 18))
+dataset_snapshot.load(dataset_snapshot.default_path(copy), copy)
+with open(dataset_snapshot.default_path(copy), "rb") as f:
+    print(dataset_snapshot.HEADER.unpack(f.read(
+        dataset_snapshot.HEADER.size))[2] == os.stat(copy).st_mtime_ns)
+shutil.rmtree(os.path.dirname(copy))
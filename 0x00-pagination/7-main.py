@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Main file
+"""
+import time
+
+Server = __import__('3-hypermedia_del_pagination').Server
+IndexedDataset = __import__('indexed_dataset').IndexedDataset
+
+server = Server()
+indexed = server.indexed_dataset()
+for index in range(10, 2000):
+    del indexed[index]
+res = server.get_hyper_index(5, 10)
+print(res["next_index"], res["page"], res["total_items"], res["total_pages"])
+print([row[3] for row in res["data"]])
+indexed[1000] = ["2017", "FEMALE", "HISPANIC", "Ada", "1", "1"]
+indexed.append(["2017", "MALE", "HISPANIC", "Bo", "1", "1"])
+res = server.get_hyper_index(res["next_index"], 3)
+print(res["next_index"], res["page"], res["total_items"])
+print([row[3] for row in res["data"]])
+
+# a page after a run of 199990 deleted rows
+rows = [[position] for position in range(200000)]
+indexed = IndexedDataset(rows)
+plain = dict(enumerate(rows))
+for index in range(5, 199995):
+    del indexed[index]
+    del plain[index]
+
+start = time.perf_counter()
+page = indexed.take(3, 4)
+elapsed = time.perf_counter() - start
+
+start = time.perf_counter()
+walked = []
+current = 3
+while len(walked) < 4 and current < 200000:
+    if current in plain:
+        walked.append((current, plain[current]))
+    current += 1
+walk = time.perf_counter() - start
+print(page == walked, [position for position, _ in page])
+print("take {:.3f} ms, walk {:.0f} ms".format(elapsed * 1000, walk * 1000))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Main file
+"""
+
+Server = __import__('3-hypermedia_del_pagination').Server
+
+server = Server(secret=b"pagination demo")
+indexed = server.indexed_dataset()
+
+res = server.get_cursor(page_size=3)
+print([row[3] for row in res["data"]], res["prev_cursor"])
+res = server.get_cursor(res["next_cursor"], 3)
+print([row[3] for row in res["data"]])
+
+# rows deleted before and after the cursor, and a row appended: the next
+# page starts right after the last row seen
+del indexed[0]
+del indexed[6]
+del indexed[7]
+indexed.append(["2017", "MALE", "HISPANIC", "Bo", "1", "1"])
+following = server.get_cursor(res["next_cursor"], 3)
+print([row[3] for row in following["data"]])
+previous = server.get_cursor(following["prev_cursor"], 3)
+print([row[3] for row in previous["data"]] ==
+      [row[3] for row in res["data"]])
+
+# the last page
+last = server.get_cursor(page_size=10)
+while last["next_cursor"]:
+    last = server.get_cursor(last["next_cursor"], 5000)
+print(last["data"][-1], last["next_cursor"])
+
+# tampered or foreign cursors are refused
+cursor = res["next_cursor"]
+for bad in (cursor[:-2] + ("AA" if cursor[-2:] != "AA" else "BB"),
+            "not a cursor", Server().get_cursor()["next_cursor"]):
+    try:
+        server.get_cursor(bad)
+    except ValueError as err:
+        print(err)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+""" Columnar, dictionary-encoded storage of a CSV dataset."""
+
+from array import array
+from typing import Iterable, List, Union
+import csv
+
+# smallest typecodes first, with the range of values they hold
+INT_TYPECODES = (
+    ("B", 0, 0xFF), ("H", 0, 0xFFFF), ("I", 0, 0xFFFFFFFF),
+    ("b", -0x80, 0x7F), ("h", -0x8000, 0x7FFF),
+    ("i", -0x80000000, 0x7FFFFFFF),
+    ("q", -0x8000000000000000, 0x7FFFFFFFFFFFFFFF),
+)
+
+
+def smallest_typecode(low: int, high: int) -> str:
+    """Return the array typecode of the fewest bytes holding low..high.
+
+    Args:
+        low (int): The smallest value to store.
+        high (int): The largest value to store.
+
+    Returns:
+        str: An array typecode, or None if no integer type is wide enough.
+    """
+    fitting = [(array(code).itemsize, code)
+               for code, minimum, maximum in INT_TYPECODES
+               if minimum <= low and high <= maximum]
+    return min(fitting)[1] if fitting else None
+
+
+def is_canonical_int(value: str) -> bool:
+    """Tell whether `value` is exactly the str of an int.
+
+    Such values can be stored as numbers and turned back into the very
+    same string ("07" or " 7" cannot)."""
+    digits = value[1:] if value.startswith("-") else value
+    return digits.isdigit() and digits.isascii() and str(int(value)) == value
+
+
+class Column:
+    """A column of a ColumnarDataset.
+
+    An integer column keeps its values in an array of the smallest
+    typecode. Any other column is dictionary-encoded: each distinct
+    string is stored once in `values` and the rows hold its position in
+    the `codes` array.
+    """
+
+    def __init__(self, codes: array, values: List[str] = None):
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def encode(cls, codes: array, values: List[str]) -> "Column":
+        """Build a column from the dictionary encoding of its strings,
+        as an integer column when every string is a canonical int.
+
+        Args:
+            codes (array): The position in `values` of the string of
+                each row.
+            values (List[str]): The distinct strings of the column.
+
+        Returns:
+            Column: The column in its smallest form.
+        """
+        if values and all(is_canonical_int(value) for value in values):
+            numbers = [int(value) for value in values]
+            typecode = smallest_typecode(min(numbers), max(numbers))
+            if typecode is not None:
+                return cls(array(typecode, [numbers[code]
+                                            for code in codes]))
+        typecode = smallest_typecode(0, max(len(values) - 1, 0))
+        return cls(array(typecode, codes), values)
+
+    def __getitem__(self, index: int) -> str:
+        """Return the string of row `index`."""
+        if self.values is None:
+            return str(self.codes[index])
+        return self.values[self.codes[index]]
+
+    def slice(self, start: int, end: int) -> List[str]:
+        """Return the strings of rows `start` to `end` (exclusive)."""
+        codes = self.codes[start:end]
+        if self.values is None:
+            return [str(number) for number in codes]
+        values = self.values
+        return [values[code] for code in codes]
+
+    def nbytes(self) -> int:
+        """Return the bytes of the column array (not of its values)."""
+        return len(self.codes) * self.codes.itemsize
+
+
+class ColumnarDataset:
+    """A read-only table stored column by column.
+
+    It behaves like the list of rows the CSV reader would return: len(),
+    indexing and slicing give rows as lists of strings, but they are only
+    built for the rows asked for. Years, counts and ranks take one to
+    four bytes each instead of a str object, and the few genders and
+    ethnicities (and the names, repeated across years) are stored once.
+    """
+
+    def __init__(self, header: List[str], columns: List[Column]):
+        self.header = header
+        self.columns = columns
+
+    @classmethod
+    def from_rows(cls, header: List[str],
+                  rows: Iterable[List[str]]) -> "ColumnarDataset":
+        """Encode rows of strings column by column.
+
+        The rows are consumed one at a time, so they are never all held
+        as strings.
+
+        Args:
+            header (List[str]): The names of the columns.
+            rows (Iterable[List[str]]): The rows, one string per column.
+
+        Returns:
+            ColumnarDataset: The encoded dataset.
+
+        Raises:
+            ValueError: If a row does not have one field per column.
+        """
+        width = len(header)
+        lookups = [{} for _ in range(width)]
+        codes = [array("I") for _ in range(width)]
+        for number, row in enumerate(rows, 1):
+            if len(row) != width:
+                raise ValueError("row {} has {} fields, not {}".format(
+                    number, len(row), width))
+            for position in range(width):
+                lookup = lookups[position]
+                value = row[position]
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                codes[position].append(code)
+        return cls(list(header), [
+            Column.encode(column, list(lookup))
+            for column, lookup in zip(codes, lookups)])
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ColumnarDataset":
+        """Load a CSV file whose first row is the header.
+
+        Args:
+            path (str): The path of the CSV file.
+
+        Returns:
+            ColumnarDataset: The encoded dataset.
+        """
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            return cls.from_rows(header, reader)
+
+    def __len__(self) -> int:
+        return len(self.columns[0].codes) if self.columns else 0
+
+    def row(self, index: int) -> List[str]:
+        """Return row `index` as a list of strings."""
+        return [column[index] for column in self.columns]
+
+    def __getitem__(self, index: Union[int, slice]) -> List:
+        """Return a row, or a list of rows for a slice."""
+        if isinstance(index, slice):
+            start, end, step = index.indices(len(self))
+            if step != 1:
+                return [self.row(position)
+                        for position in range(start, end, step)]
+            return [list(row) for row in zip(*(
+                column.slice(start, end) for column in self.columns))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("dataset index out of range")
+        return self.row(index)
+
+    def nbytes(self) -> int:
+        """Return the bytes of the column arrays."""
+        return sum(column.nbytes() for column in self.columns)
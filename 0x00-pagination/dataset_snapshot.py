@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+""" Binary snapshots of a ColumnarDataset, loaded through mmap.
+
+    ./dataset_snapshot.py build Popular_Baby_Names.csv
+    ./dataset_snapshot.py verify Popular_Baby_Names.csv
+    ./dataset_snapshot.py bench Popular_Baby_Names.csv
+
+A snapshot holds the column arrays as raw bytes, so loading one maps the
+file and wraps the arrays in memoryviews without parsing anything. It
+records the size, modification time and SHA-256 of its source CSV: a
+snapshot whose source changed is refused, see `load`.
+"""
+
+from array import array
+from typing import List, Tuple, Union
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from columnar_dataset import Column, ColumnarDataset
+
+# magic, source size, source mtime in ns, source SHA-256, metadata size
+HEADER = struct.Struct("=8sQQ32sQ")
+MTIME = struct.Struct("=Q")
+MTIME_OFFSET = struct.calcsize("=8sQ")
+MAGIC = b"COLSNP1" + sys.byteorder[0].encode()
+ALIGNMENT = 8
+
+
+class StringTable:
+    """The distinct strings of a column, kept as one UTF-8 blob and the
+    offsets of the strings in it; a string is only decoded when read."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self.blob[self.offsets[index]:self.offsets[index + 1]],
+                   "utf-8")
+
+
+def default_path(csv_path: str) -> str:
+    """Return the snapshot path of a CSV file: its path + ".snapshot"."""
+    return csv_path + ".snapshot"
+
+
+def file_digest(path: str) -> bytes:
+    """Return the SHA-256 of the file at `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def source_stamp(csv_path: str) -> Tuple[int, int, bytes]:
+    """Return the size, mtime in ns and SHA-256 of a CSV file."""
+    stat = os.stat(csv_path)
+    return stat.st_size, stat.st_mtime_ns, file_digest(csv_path)
+
+
+def dump(dataset: ColumnarDataset, path: str, csv_path: str):
+    """Write `dataset`, parsed from `csv_path`, as a snapshot at `path`.
+
+    The file is written next to `path` then renamed over it, so a reader
+    never maps half a snapshot.
+
+    Args:
+        dataset (ColumnarDataset): The dataset to save.
+        path (str): The path of the snapshot.
+        csv_path (str): The CSV file the dataset was parsed from.
+    """
+    blocks = []
+    columns = []
+    for column in dataset.columns:
+        # arrays of a parsed dataset, memoryviews of a loaded one
+        codes = column.codes
+        typecode = getattr(codes, "typecode", None) or codes.format
+        entry = {"typecode": typecode, "codes": len(blocks)}
+        blocks.append(codes.tobytes())
+        if column.values is not None:
+            encoded = [column.values[code].encode()
+                       for code in range(len(column.values))]
+            offsets = array("Q", [0])
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value))
+            entry["offsets"] = len(blocks)
+            blocks.append(offsets.tobytes())
+            entry["blob"] = len(blocks)
+            blocks.append(b"".join(encoded))
+        columns.append(entry)
+
+    # blocks start on ALIGNMENT bytes from the end of the metadata
+    spans = []
+    position = 0
+    for block in blocks:
+        spans.append([position, len(block)])
+        position += -(-len(block) // ALIGNMENT) * ALIGNMENT
+    metadata = json.dumps({"header": dataset.header, "rows": len(dataset),
+                           "columns": columns, "blocks": spans}).encode()
+    metadata += b" " * (-(HEADER.size + len(metadata)) % ALIGNMENT)
+
+    size, mtime, digest = source_stamp(csv_path)
+    temporary = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, size, mtime, digest, len(metadata)))
+        f.write(metadata)
+        for block in blocks:
+            f.write(block)
+            f.write(b"\0" * (-len(block) % ALIGNMENT))
+    os.replace(temporary, path)
+
+
+def load(path: str, csv_path: str = None) -> ColumnarDataset:
+    """Map the snapshot at `path` as a ColumnarDataset.
+
+    With `csv_path`, the snapshot must have been built from that file as
+    it is now. Same size and mtime are trusted; a different mtime with
+    the same size (a copy, a touch) costs a hash of the CSV, which must
+    still match, and the new mtime is then stored in the snapshot so the
+    next loads skip the hash.
+
+    Args:
+        path (str): The path of the snapshot.
+        csv_path (str): The CSV file the snapshot must match.
+
+    Returns:
+        ColumnarDataset: The dataset, its arrays backed by the mapping.
+
+    Raises:
+        ValueError: If the file is not a snapshot or its source changed.
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    if len(view) < HEADER.size:
+        raise ValueError("{} is not a dataset snapshot".format(path))
+    magic, size, mtime, digest, metadata_size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("{} is not a dataset snapshot".format(path))
+    if csv_path is not None:
+        stat = os.stat(csv_path)
+        if stat.st_size != size or (stat.st_mtime_ns != mtime and
+                                    file_digest(csv_path) != digest):
+            raise ValueError("{} is out of date with {}".format(
+                path, csv_path))
+        if stat.st_mtime_ns != mtime:
+            restamp(path, stat.st_mtime_ns)
+
+    start = HEADER.size + metadata_size
+    metadata = json.loads(bytes(view[HEADER.size:start]))
+    blocks = [view[start + offset:start + offset + length]
+              for offset, length in metadata["blocks"]]
+    columns = []
+    for entry in metadata["columns"]:
+        codes = blocks[entry["codes"]].cast(entry["typecode"])
+        values = None
+        if "blob" in entry:
+            values = StringTable(blocks[entry["offsets"]].cast("Q"),
+                                 blocks[entry["blob"]])
+        columns.append(Column(codes, values))
+    return ColumnarDataset(metadata["header"], columns)
+
+
+def restamp(path: str, mtime: int):
+    """Store a new source mtime in the header of a snapshot, in place.
+
+    Failing to (a read-only snapshot) only costs a hash at the next load.
+    """
+    try:
+        fd = os.open(path, os.O_WRONLY)
+    except OSError:
+        return
+    try:
+        os.pwrite(fd, MTIME.pack(mtime), MTIME_OFFSET)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def load_or_build(csv_path: str, path: str = None) -> ColumnarDataset:
+    """Load the snapshot of `csv_path`, building it first when it is
+    missing or out of date.
+
+    Args:
+        csv_path (str): The CSV file.
+        path (str): The snapshot path, see `default_path`.
+
+    Returns:
+        ColumnarDataset: The dataset of the CSV file.
+    """
+    path = path or default_path(csv_path)
+    try:
+        return load(path, csv_path)
+    except (OSError, ValueError):
+        pass
+    dataset = ColumnarDataset.from_csv(csv_path)
+    try:
+        dump(dataset, path, csv_path)
+    except OSError:
+        pass
+    return dataset
+
+
+def verify(csv_path: str, path: str = None) -> List[str]:
+    """Check a snapshot against its CSV, row by row.
+
+    Args:
+        csv_path (str): The CSV file.
+        path (str): The snapshot path, see `default_path`.
+
+    Returns:
+        List[str]: The problems found, empty for a good snapshot.
+    """
+    path = path or default_path(csv_path)
+    try:
+        dataset = load(path)
+    except (OSError, ValueError) as error:
+        return [str(error)]
+    size, _, digest = source_stamp(csv_path)
+    with open(path, "rb") as f:
+        _, saved_size, _, saved_digest, _ = HEADER.unpack(
+            f.read(HEADER.size))
+    problems = []
+    if (size, digest) != (saved_size, saved_digest):
+        problems.append("{} changed since the snapshot".format(csv_path))
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        if next(reader, None) != dataset.header:
+            problems.append("the header differs")
+        rows = 0
+        for index, row in enumerate(reader):
+            if index >= len(dataset) or dataset[index] != row:
+                problems.append("row {} differs".format(index))
+                break
+            rows += 1
+    if not problems and rows != len(dataset):
+        problems.append("{} rows in the CSV, {} in the snapshot".format(
+            rows, len(dataset)))
+    return problems
+
+
+def best_time(function, repeat: int) -> float:
+    """Return the best time in seconds of `repeat` calls of `function`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(csv_path: str, path: str = None, repeat: int = 5) -> dict:
+    """Time a cold start of each way to load the dataset and read a page.
+
+    Args:
+        csv_path (str): The CSV file.
+        path (str): The snapshot path, see `default_path`.
+        repeat (int): The runs of each way, the best one counts.
+
+    Returns:
+        dict: Seconds per way of loading.
+    """
+    path = path or default_path(csv_path)
+    load_or_build(csv_path, path)
+
+    def from_rows():
+        with open(csv_path) as f:
+            rows = [row for row in csv.reader(f)][1:]
+        return rows[1000:1010]
+
+    return {
+        "csv rows": best_time(from_rows, repeat),
+        "csv columnar": best_time(
+            lambda: ColumnarDataset.from_csv(csv_path)[1000:1010], repeat),
+        "snapshot": best_time(
+            lambda: load(path, csv_path)[1000:1010], repeat),
+    }
+
+
+def main(argv: List[str] = None) -> Union[int, None]:
+    """Parse the command line and run the command."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+    for name, text in (("build", "build or rebuild the snapshot of a CSV"),
+                       ("verify", "check a snapshot against its CSV"),
+                       ("bench", "compare startup times with the CSV")):
+        command = commands.add_parser(name, help=text)
+        command.add_argument("csv")
+        command.add_argument("--snapshot", metavar="PATH",
+                             help="snapshot path, default CSV.snapshot")
+        if name == "bench":
+            command.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    path = args.snapshot or default_path(args.csv)
+
+    if args.command == "build":
+        try:
+            dataset = ColumnarDataset.from_csv(args.csv)
+        except ValueError as error:
+            print("{}: {}".format(args.csv, error))
+            return 1
+        dump(dataset, path, args.csv)
+        print("{}: {} rows, {} bytes".format(
+            path, len(dataset), os.path.getsize(path)))
+    elif args.command == "verify":
+        problems = verify(args.csv, path)
+        for problem in problems:
+            print(problem)
+        if problems:
+            return 1
+        print("{}: OK".format(path))
+    else:
+        for way, seconds in bench(args.csv, path, args.repeat).items():
+            print("{:<14} {:>10.2f} ms".format(way, seconds * 1000))
+    return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+""" Dataset indexed by position that stays fast to page through while
+rows are deleted and inserted."""
+
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Iterator, List, Sequence, Tuple
+
+
+class IndexedDataset(MutableMapping):
+    """The rows of a dataset by position, like {position: row}.
+
+    Deleting a row leaves a hole at its position: the other rows keep
+    their positions. Rows can be set back at a deleted position or
+    appended after the last one.
+
+    Two structures over the positions find the live rows without walking
+    the holes:
+
+    - a Fenwick tree of the live flags, for the number of live rows
+      before a position (`rank`) and the position of the k-th live row
+      (`select`), both O(log n);
+    - the live positions linked in order through the `older` and `newer`
+      arrays, so the rows after a live one are reached in O(1) each.
+
+    `take(index, count)` and `take_before(index, count)` thus cost
+    O(count + log n) whatever the holes.
+    The rows themselves stay in the source sequence (a list, or a
+    columnar or mapped dataset); only the rows set afterwards are kept
+    aside in `added`.
+    """
+
+    def __init__(self, rows: Sequence[List]):
+        """Index every row of `rows` as live.
+
+        Args:
+            rows (Sequence[List]): The dataset, indexed from 0.
+        """
+        count = len(rows)
+        self.rows = rows
+        self.added = {}
+        self.live = bytearray(b"\x01") * count
+        self.live_count = count
+        # tree[i] counts the live positions in (i - lowbit(i), i], 1-based
+        self.tree = array("i", [0]) * (count + 1)
+        for i in range(1, count + 1):
+            self.tree[i] += 1
+            parent = i + (i & -i)
+            if parent <= count:
+                self.tree[parent] += self.tree[i]
+        self.newer = array("i", range(1, count + 1))
+        self.older = array("i", range(-1, count - 1))
+        if count:
+            self.newer[count - 1] = -1
+        self.first = 0 if count else -1
+        self.last = count - 1
+
+    @property
+    def end(self) -> int:
+        """The position after the last one, live or deleted."""
+        return len(self.live)
+
+    def __len__(self) -> int:
+        return self.live_count
+
+    def __contains__(self, index: Any) -> bool:
+        return isinstance(index, int) and 0 <= index < len(self.live) \
+            and self.live[index] == 1
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the live positions in order."""
+        newer = self.newer
+        index = self.first
+        while index != -1:
+            yield index
+            index = newer[index]
+
+    def __getitem__(self, index: int) -> List:
+        if index not in self:
+            raise KeyError(index)
+        row = self.added.get(index)
+        return self.rows[index] if row is None else row
+
+    def __setitem__(self, index: int, row: List):
+        """Replace a live row, put one back at a deleted position or
+        append one at position `end`."""
+        if index == len(self.live):
+            self.append(row)
+            return
+        if not isinstance(index, int) or not 0 <= index < len(self.live):
+            raise KeyError(index)
+        self.added[index] = row
+        if not self.live[index]:
+            self._revive(index)
+
+    def __delitem__(self, index: int):
+        if index not in self:
+            raise KeyError(index)
+        self.added.pop(index, None)
+        self.live[index] = 0
+        self.live_count -= 1
+        self._add(index, -1)
+        older, newer = self.older[index], self.newer[index]
+        if older == -1:
+            self.first = newer
+        else:
+            self.newer[older] = newer
+        if newer == -1:
+            self.last = older
+        else:
+            self.older[newer] = older
+
+    def append(self, row: List) -> int:
+        """Add a row after the last position and return its position."""
+        index = len(self.live)
+        self.added[index] = row
+        self.live.append(1)
+        self.live_count += 1
+        position = index + 1
+        # the new node covers (position - lowbit, position]
+        self.tree.append(1 + self.rank(index) -
+                         self.rank(position - (position & -position)))
+        self.older.append(self.last)
+        self.newer.append(-1)
+        if self.last == -1:
+            self.first = index
+        else:
+            self.newer[self.last] = index
+        self.last = index
+        return index
+
+    def _revive(self, index: int):
+        """Mark a deleted position live and link it between its live
+        neighbours."""
+        before = self.rank(index)
+        older = self.select(before - 1) if before else -1
+        newer = self.first if older == -1 else self.newer[older]
+        self.live[index] = 1
+        self.live_count += 1
+        self._add(index, 1)
+        self.older[index], self.newer[index] = older, newer
+        if older == -1:
+            self.first = index
+        else:
+            self.newer[older] = index
+        if newer == -1:
+            self.last = index
+        else:
+            self.older[newer] = index
+
+    def _add(self, index: int, delta: int):
+        """Add `delta` to the live count of a position."""
+        tree = self.tree
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def rank(self, index: int) -> int:
+        """Return the number of live rows before position `index`."""
+        tree = self.tree
+        i = min(index, len(tree) - 1)
+        count = 0
+        while i > 0:
+            count += tree[i]
+            i -= i & -i
+        return count
+
+    def select(self, rank: int) -> int:
+        """Return the position of the live row of rank `rank` (from 0).
+
+        Raises:
+            IndexError: If there are not that many live rows.
+        """
+        if not 0 <= rank < self.live_count:
+            raise IndexError("rank out of range")
+        tree = self.tree
+        size = len(tree) - 1
+        position = 0
+        remaining = rank + 1
+        step = 1 << (size.bit_length() - 1)
+        while step:
+            following = position + step
+            if following <= size and tree[following] < remaining:
+                position = following
+                remaining -= tree[following]
+            step >>= 1
+        return position
+
+    def next_live(self, index: int) -> int:
+        """Return the first live position from `index`, or None."""
+        if index in self:
+            return index
+        before = self.rank(index)
+        return self.select(before) if before < self.live_count else None
+
+    def take(self, index: int, count: int) -> List[Tuple[int, List]]:
+        """Return the (position, row) pairs of the `count` live rows from
+        position `index`."""
+        pairs = []
+        position = self.next_live(index)
+        newer = self.newer
+        while position is not None and position != -1 and \
+                len(pairs) < count:
+            pairs.append((position, self[position]))
+            position = newer[position]
+        return pairs
+
+    def take_before(self, index: int, count: int) -> List[Tuple[int, List]]:
+        """Return the (position, row) pairs of the `count` live rows
+        before position `index`, in order."""
+        pairs = []
+        before = self.rank(index)
+        position = self.select(before - 1) if before else -1
+        older = self.older
+        while position != -1 and len(pairs) < count:
+            pairs.append((position, self[position]))
+            position = older[position]
+        pairs.reverse()
+        return pairs
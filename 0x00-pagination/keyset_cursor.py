@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+""" Signed, opaque pagination cursors."""
+
+from typing import Tuple
+import base64
+import binascii
+import hashlib
+import hmac
+import struct
+
+AFTER = 0
+BEFORE = 1
+
+# version, direction, row position
+PAYLOAD = struct.Struct("!BBQ")
+VERSION = 1
+SIGNATURE_SIZE = 16
+
+
+def encode_cursor(secret: bytes, direction: int, position: int) -> str:
+    """Return the cursor of the rows after (or before) a row position.
+
+    Args:
+        secret (bytes): The key the cursor is signed with.
+        direction (int): AFTER or BEFORE.
+        position (int): The row position the page starts after (or ends
+            before).
+
+    Returns:
+        str: The cursor, URL-safe base64 without padding.
+    """
+    payload = PAYLOAD.pack(VERSION, direction, position)
+    signature = hmac.new(secret, payload, hashlib.sha256).digest()
+    token = base64.urlsafe_b64encode(payload + signature[:SIGNATURE_SIZE])
+    return token.rstrip(b"=").decode()
+
+
+def decode_cursor(secret: bytes, cursor: str) -> Tuple[int, int]:
+    """Return the direction and row position of a cursor.
+
+    Args:
+        secret (bytes): The key the cursor was signed with.
+        cursor (str): A cursor of `encode_cursor`.
+
+    Returns:
+        Tuple[int, int]: AFTER or BEFORE, and the row position.
+
+    Raises:
+        ValueError: If the cursor is malformed or its signature is wrong.
+    """
+    try:
+        token = base64.urlsafe_b64decode(
+            cursor.encode() + b"=" * (-len(cursor) % 4))
+    except (binascii.Error, UnicodeEncodeError, AttributeError):
+        raise ValueError("invalid cursor")
+    payload, signature = token[:PAYLOAD.size], token[PAYLOAD.size:]
+    expected = hmac.new(secret, payload, hashlib.sha256).digest()
+    if len(payload) != PAYLOAD.size or \
+            not hmac.compare_digest(signature, expected[:SIGNATURE_SIZE]):
+        raise ValueError("invalid cursor")
+    version, direction, position = PAYLOAD.unpack(payload)
+    if version != VERSION or direction not in (AFTER, BEFORE):
+        raise ValueError("invalid cursor")
+    return direction, position
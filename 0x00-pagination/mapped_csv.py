@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+""" Memory-mapped CSV file paged through an index of row offsets."""
+
+from array import array
+from itertools import accumulate, chain
+from typing import Iterable, Iterator, List, Union
+import csv
+import io
+import mmap
+import os
+import struct
+import sys
+
+# magic, source size, source mtime in ns, number of offsets
+INDEX_HEADER = struct.Struct("=8sQQQ")
+INDEX_MAGIC = b"ROWIDX1" + sys.byteorder[0].encode()
+
+
+def row_offsets(data: mmap.mmap, start: int = 0) -> array:
+    """Return the byte offset of every row of the mapped CSV `data` from
+    `start`, followed by the size of `data`.
+
+    The lines are read by mmap itself, only their lengths reach Python.
+    A newline inside a quoted field does not start a row: a line with an
+    odd number of quotes is joined to the next one.
+
+    Args:
+        data (mmap.mmap): The mapped CSV file.
+        start (int): The offset of the first row.
+
+    Returns:
+        array: n + 1 offsets ('Q') for n rows, row i spanning
+               offsets[i] to offsets[i + 1].
+    """
+    if start >= len(data):
+        return array("Q", [len(data)])
+    data.seek(start)
+    lines = iter(data.readline, b"")
+    if data.find(b'"', start) == -1:
+        lengths = map(len, lines)
+    else:
+        lengths = quoted_row_lengths(lines)
+    return array("Q", accumulate(chain([start], lengths)))
+
+
+def quoted_row_lengths(lines: Iterable[bytes]) -> Iterator[int]:
+    """Yield the length of each row of CSV `lines`, joining the lines
+    of a quoted field that spans several of them."""
+    pending = quotes = 0
+    for line in lines:
+        pending += len(line)
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            yield pending
+            pending = quotes = 0
+    if pending:
+        yield pending
+
+
+class MappedCSV:
+    """A CSV file read through mmap and decoded one slice at a time.
+
+    It behaves like the list of rows (header excluded) the CSV reader
+    would return, but nothing is parsed up front: the byte offsets of the
+    rows are read from an index file next to the CSV, or built once and
+    saved there, and a slice decodes only its own bytes. The index itself
+    is mapped, so the memory in use does not grow with the file.
+
+    The index is trusted on the size and modification time of the CSV
+    alone: an edit keeping both (or a copy keeping the mtime of another
+    file of the same size) is not noticed, delete the index after one.
+    """
+
+    def __init__(self, path: str, index_path: str = None):
+        """Map the CSV file and its row index.
+
+        Args:
+            path (str): The path of the CSV file, header on its first row.
+            index_path (str): Where the offsets are kept, defaults to
+                `path` + ".offsets". The index is rebuilt when the size or
+                modification time of the CSV changed.
+        """
+        self.path = path
+        self.index_path = index_path or path + ".offsets"
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+                if stat.st_size else b""
+        self.offsets = self._load_index(stat)
+        if self.offsets is None:
+            header_end = self.data.find(b"\n")
+            self.offsets = row_offsets(
+                self.data, len(self.data) if header_end == -1
+                else header_end + 1)
+            self._save_index(stat)
+
+    def _load_index(self, stat: os.stat_result):
+        """Return the mapped offsets of a fresh index file, or None."""
+        try:
+            with open(self.index_path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mapped) < INDEX_HEADER.size:
+            return None
+        magic, size, mtime, count = INDEX_HEADER.unpack_from(mapped)
+        if magic != INDEX_MAGIC or size != stat.st_size or \
+                mtime != stat.st_mtime_ns or \
+                len(mapped) != INDEX_HEADER.size + count * 8:
+            return None
+        return memoryview(mapped)[INDEX_HEADER.size:].cast("Q")
+
+    def _save_index(self, stat: os.stat_result):
+        """Write the offsets next to the CSV, if the directory allows."""
+        temporary = "{}.{}.tmp".format(self.index_path, os.getpid())
+        try:
+            with open(temporary, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size,
+                                          stat.st_mtime_ns,
+                                          len(self.offsets)))
+                self.offsets.tofile(f)
+            os.replace(temporary, self.index_path)
+        except OSError:
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def rows(self, start: int, end: int) -> List[List[str]]:
+        """Decode rows `start` to `end` (exclusive), clamped to the file.
+
+        Args:
+            start (int): The index of the first row.
+            end (int): The index after the last row.
+
+        Returns:
+            List[List[str]]: The rows as lists of strings.
+        """
+        end = min(end, len(self))
+        if start >= end:
+            return []
+        chunk = self.data[self.offsets[start]:self.offsets[end]]
+        return list(csv.reader(io.StringIO(chunk.decode(), newline="")))
+
+    def __getitem__(self, index: Union[int, slice]) -> List:
+        """Return a row, or a list of rows for a slice."""
+        if isinstance(index, slice):
+            start, end, step = index.indices(len(self))
+            if step != 1:
+                return [self.rows(position, position + 1)[0]
+                        for position in range(start, end, step)]
+            return self.rows(start, end)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("dataset index out of range")
+        return self.rows(index, index + 1)[0]
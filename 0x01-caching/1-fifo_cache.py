@@ -3,38 +3,24 @@
 
 
 from base_caching import BaseCaching
+from itertools import islice
 
 
 class FIFOCache(BaseCaching):
     """FIFOCache class inherits from BaseCaching
     and implements a FIFO caching system"""
-    def __init__(self):
+    def __init__(self, **kwargs):
         """Initialize the FIFOCache instance."""
-        super().__init__()
+        super().__init__(**kwargs)
 
-    def put(self, key, item):
-        """Add an item to the cache with FIFO policy.
+    def _victim(self) -> str:
+        """Return the first key put in the cache (FIFO policy).
 
-        Args:
-            key (str): The key under which the item is stored.
-            item (any): The item to store in the cache.
+        `cache_data` keeps insertion order and updating an item does not
+        move its key, so the first key of the dictionary is the oldest.
         """
-        if key and item:
-            if len(self.cache_data) >= self.MAX_ITEMS:
-                # Remove the first item (FIFO policy)y
-                first_key = next(iter(self.cache_data))
-                self.cache_data.pop(first_key)
-                print(f"DISCARD: {first_key}")
-            # Add the new key-value pair
-            self.cache_data[key] = item
+        return next(iter(self.cache_data))
 
-    def get(self, key):
-        """Retrieve an item from the cache by key.
-
-        Args:
-            key (str): The key of the item to retrieve.
-
-        Returns:
-            The cached item, or None if the key is not in the cache or is None
-        """
-        return self.cache_data.get(key, None)
+    def _victims(self, count: int) -> list:
+        """Return the `count` first keys put in the cache."""
+        return list(islice(self.cache_data, count))
@@ -1,8 +1,9 @@
 #!/usr/bin/python3
 """ 1-main """
 FIFOCache = __import__('1-fifo_cache').FIFOCache
+print_discard = __import__('eviction_listeners').print_discard
 
-my_cache = FIFOCache()
+my_cache = FIFOCache(listeners=[print_discard])
 my_cache.put("A", "Hello")
 my_cache.put("B", "World")
 my_cache.put("C", "Holberton")
@@ -2,65 +2,134 @@
 """LFU cache policy"""
 
 from base_caching import BaseCaching
-from typing import Union, Any
+from collections import OrderedDict
 
 
 class LFUCache(BaseCaching):
     """LFUCache class inherits from BaseCaching
     and implements a LFU caching system
+
+    Keys are grouped into frequency buckets (frequency -> OrderedDict of
+    keys from least to most recently used), so get, put and eviction are
+    all O(1). Ties between keys with the same frequency are broken by
+    evicting the least recently used one.
+
+    `min_frequency` is None when the lowest bucket emptied on a removal:
+    the next insertion sets it back to 1, so it is only searched for when
+    two evictions follow each other.
+
+    When `aging_interval` is set, every `aging_interval` operations all
+    frequencies are halved so keys that were hot long ago can age out.
     """
-    def __init__(self):
-        super().__init__()
-        self.frequency_and_key_order = {}
+    def __init__(self, aging_interval: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.key_frequency = {}
+        self.frequency_buckets = {}
+        self.min_frequency = 0
+        self.aging_interval = aging_interval
+        self.operations = 0
 
-    def put(self, key: str, item: Any):
-        """
-        Add an item to the cache with LFU policy
+    def _on_insert(self, key: str):
+        """Add a new key with a frequency of 1."""
+        self._tick()
+        self.key_frequency[key] = 1
+        self.frequency_buckets.setdefault(1, OrderedDict())[key] = None
+        self.min_frequency = 1
 
-        Args:
-            key (str): The key under which the item is stored.
-            item (Any): The item to store in the cache.
-        """
-        if key is None or item is None:
+    def _on_insert_many(self, keys: list):
+        """Add new keys with a frequency of 1."""
+        self.key_frequency.update(dict.fromkeys(keys, 1))
+        self.frequency_buckets.setdefault(1, OrderedDict()).update(
+            dict.fromkeys(keys))
+        self.min_frequency = 1
+        if self.aging_interval:
+            self.operations += len(keys) - 1
+            self._tick()
+
+    def _on_access_many(self, keys: list):
+        """Count a cache hit of get_many as a use of each key."""
+        touch = self._touch
+        for key in keys:
+            touch(key)
+        if self.aging_interval:
+            self.operations += len(keys) - 1
+            self._tick()
+
+    def _on_update(self, key: str):
+        """Count an update as a use of the key."""
+        self._tick()
+        self._touch(key)
+
+    def _on_access(self, key: str):
+        """Count a cache hit as a use of the key."""
+        self._tick()
+        self._touch(key)
+
+    def _on_remove(self, key: str):
+        """Forget a key that left the cache."""
+        frequency = self.key_frequency.pop(key)
+        bucket = self.frequency_buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.frequency_buckets[frequency]
+            if self.min_frequency == frequency:
+                self.min_frequency = None
+
+    def _victim(self) -> str:
+        """Return the least recently used key of the lowest frequency."""
+        if self.min_frequency is None:
+            self.min_frequency = min(self.frequency_buckets)
+        return next(iter(self.frequency_buckets[self.min_frequency]))
+
+    def _victims(self, count: int) -> list:
+        """Return the `count` next keys to evict, lowest frequency first
+        and least recently used first within a frequency."""
+        victims = []
+        for frequency in sorted(self.frequency_buckets):
+            for key in self.frequency_buckets[frequency]:
+                victims.append(key)
+                if len(victims) == count:
+                    return victims
+        return victims
+
+    def _touch(self, key: str):
+        """Move a key into the next frequency bucket as its most
+        recently used entry."""
+        frequency = self.key_frequency[key]
+        bucket = self.frequency_buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.frequency_buckets[frequency]
+            if self.min_frequency == frequency:
+                self.min_frequency = frequency + 1
+        self.key_frequency[key] = frequency + 1
+        self.frequency_buckets.setdefault(
+            frequency + 1, OrderedDict())[key] = None
+
+    def _tick(self):
+        """Count an operation and age the frequencies when due."""
+        if not self.aging_interval:
             return
+        self.operations += 1
+        if self.operations >= self.aging_interval:
+            self.operations = 0
+            self._age()
 
-        if key in self.cache_data:
-            # If the key exists, update the item and frequency
-            self.cache_data[key] = item
-            self.frequency_and_key_order[key] += 1
-        else:
-            # If the key doesn't exist and the cache is full, evict an item
-            if len(self.cache_data) >= self.MAX_ITEMS:
-                # Find the least frequently used item(s)
-                min_freq = min(self.frequency_and_key_order.values())
-                lfu_keys = [
-                    k
-                    for k, v in self.frequency_and_key_order.items()
-                    if v == min_freq
-                    ]
-
-                # Evict the least recently used among LFU items
-                key_to_evict = lfu_keys[0]
-                del self.cache_data[key_to_evict]
-                del self.frequency_and_key_order[key_to_evict]
-                print(f"DISCARD: {key_to_evict}")
-
-            # Add the new key and set frequency to 1
-            self.cache_data[key] = item
-            self.frequency_and_key_order[key] = 1
-
-    def get(self, key: str) -> Union[Any, None]:
-        """Retrieve an item from the cache by key.
-
-        Args:
-            key (str): The key of the item to retrieve.
-
-        Returns:
-            The cached item, or None if the key is not in the cache or is None
-        """
-        if key is None or key not in self.cache_data:
-            return None
+    def _age(self):
+        """Halve every frequency (never below 1).
 
-        # Increment frequency count for the accessed key
-        self.frequency_and_key_order[key] += 1
-        return self.cache_data[key]
+        Buckets that collapse into the same frequency are merged lowest
+        frequency first, keeping the recency order inside each bucket.
+        The cost is O(n) once every `aging_interval` operations, which
+        stays amortized O(1) as long as the interval is at least the
+        cache capacity.
+        """
+        buckets = {}
+        for frequency in sorted(self.frequency_buckets):
+            aged = max(1, frequency // 2)
+            target = buckets.setdefault(aged, OrderedDict())
+            for key in self.frequency_buckets[frequency]:
+                target[key] = None
+                self.key_frequency[key] = aged
+        self.frequency_buckets = buckets
+        self.min_frequency = min(buckets) if buckets else 0
@@ -1,8 +1,9 @@
 #!/usr/bin/python3
 """ 100-main """
 LFUCache = __import__('100-lfu_cache').LFUCache
+print_discard = __import__('eviction_listeners').print_discard
 
-my_cache = LFUCache()
+my_cache = LFUCache(listeners=[print_discard])
 my_cache.put("A", "Hello")
 my_cache.put("B", "World")
 my_cache.put("C", "Holberton")
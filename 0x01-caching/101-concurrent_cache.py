@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Thread-safe, lock-striped caching policies"""
+
+from threading import Lock
+from typing import Any, Union
+
+from cache_snapshot import decoded
+from cache_stats import CacheStats
+from write_behind import WriteBehindQueue
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+
+class ShardedCache():
+    """ShardedCache splits the keyspace into shards, each one a cache of
+    the `POLICY` class guarded by its own lock.
+
+    A key always lives in the same shard (chosen by its hash), so threads
+    working on keys of different shards never wait for each other, and the
+    policy bookkeeping of a shard is only ever changed under its lock.
+    The capacity (entries and bytes) is split between the shards, the
+    first ones taking one more unit of the remainder, so the shards add
+    up to exactly the capacity asked for; there are never more shards
+    than entries. Eviction per shard is an approximation of the global
+    policy.
+    With a `writer`, the shards share one write-behind queue; a
+    `negative_cache` is shared too, it has its own lock.
+    """
+    POLICY = LRUCache
+    SHARDS = 16
+
+    def __init__(self, shards: int = None, max_items: int = None,
+                 max_bytes: int = None, writer=None,
+                 write_batch_size: int = 100, write_interval: float = 1.0,
+                 **kwargs):
+        """Initialize the shards.
+
+        Args:
+            shards (int): number of shards, defaults to SHARDS, at most
+                max_items.
+            max_items (int): total number of entries, defaults to
+                POLICY.MAX_ITEMS.
+            max_bytes (int): optional total byte budget.
+            writer (callable): optional write-behind writer(batch), see
+                BaseCaching.
+            write_batch_size (int): dirty keys that trigger a write.
+            write_interval (float): seconds between two writes.
+            **kwargs: any other option of the POLICY class.
+        """
+        self.shard_count = shards or self.SHARDS
+        if max_items is None:
+            max_items = self.POLICY.MAX_ITEMS
+        if max_items is not None:
+            self.shard_count = max(1, min(self.shard_count, max_items))
+        self.shards = [
+            self.POLICY(max_items=self._share(max_items, index),
+                        max_bytes=self._share(max_bytes, index), **kwargs)
+            for index in range(self.shard_count)
+        ]
+        self.locks = [Lock() for _ in range(self.shard_count)]
+        self.write_behind = None
+        if writer is not None:
+            self.write_behind = WriteBehindQueue(
+                writer, write_batch_size, write_interval)
+            for shard in self.shards:
+                shard.write_behind = self.write_behind
+
+    def _share(self, total: int, index: int) -> int:
+        """Return the part of `total` given to shard `index`."""
+        if total is None:
+            return None
+        share, remainder = divmod(total, self.shard_count)
+        return share + (index < remainder)
+
+    def _shard_index(self, key: Any) -> int:
+        """Return the index of the shard owning `key`."""
+        return hash(key) % self.shard_count
+
+    def put(self, key: Any, item: Any, ttl: float = None, tags=None):
+        """Add an item to the shard owning `key`.
+
+        Args:
+            key (Any): The key under which the item is stored.
+            item (Any): The item to store in the cache.
+            ttl (float): Seconds the entry lives, see BaseCaching.put.
+            tags (iterable): Tags of the entry, see invalidate_tag.
+        """
+        if key is None or item is None:
+            return
+        index = self._shard_index(key)
+        with self.locks[index]:
+            self.shards[index].put(key, item, ttl, tags)
+
+    def get(self, key: Any) -> Union[Any, None]:
+        """Retrieve an item from the shard owning `key`.
+
+        Args:
+            key (Any): The key of the item to retrieve.
+
+        Returns:
+            The cached item, or None if the key is not in the cache or is None
+        """
+        if key is None:
+            return None
+        index = self._shard_index(key)
+        with self.locks[index]:
+            return self.shards[index].get(key)
+
+    def delete(self, key: Any) -> bool:
+        """Remove `key` from its shard, return True if it was cached."""
+        if key is None:
+            return False
+        index = self._shard_index(key)
+        with self.locks[index]:
+            return self.shards[index].delete(key)
+
+    def _group(self, keys) -> dict:
+        """Split keys by shard index (see _shard_index), dropping the
+        None keys."""
+        groups = {}
+        count = self.shard_count
+        for key in keys:
+            if key is not None:
+                index = hash(key) % count
+                if index in groups:
+                    groups[index].append(key)
+                else:
+                    groups[index] = [key]
+        return groups
+
+    def get_many(self, keys) -> dict:
+        """Return a dictionary of the items found for `keys`, taking the
+        lock of each shard once; the misses of a shard are loaded with one
+        call of its batch loader."""
+        found = {}
+        for index, shard_keys in self._group(keys).items():
+            with self.locks[index]:
+                found.update(self.shards[index].get_many(shard_keys))
+        return found
+
+    def put_many(self, items, ttl: float = None, tags=None):
+        """Add a dictionary or an iterable of (key, item) pairs, taking
+        the lock of each shard once."""
+        batches = {}
+        count = self.shard_count
+        for key, item in dict(items).items():
+            if key is not None:
+                index = hash(key) % count
+                if index in batches:
+                    batches[index][key] = item
+                else:
+                    batches[index] = {key: item}
+        for index, batch in batches.items():
+            with self.locks[index]:
+                self.shards[index].put_many(batch, ttl, tags)
+
+    def delete_many(self, keys) -> int:
+        """Remove many keys, return the number of keys that were cached."""
+        deleted = 0
+        for index, shard_keys in self._group(keys).items():
+            with self.locks[index]:
+                deleted += self.shards[index].delete_many(shard_keys)
+        return deleted
+
+    def invalidate_tag(self, tag) -> int:
+        """Remove the entries of `tag` from every shard, return how many
+        there were."""
+        removed = 0
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                removed += shard.invalidate_tag(tag)
+        return removed
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Remove the entries whose key starts with `prefix` from every
+        shard (built with prefix_index=True), return how many there
+        were."""
+        removed = 0
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                removed += shard.invalidate_prefix(prefix)
+        return removed
+
+    def flush(self):
+        """Hand the pending write-behind entries to the writer now."""
+        if self.write_behind is not None:
+            self.write_behind.flush()
+
+    def close(self):
+        """Write the pending entries and stop the write-behind thread."""
+        if self.write_behind is not None:
+            self.write_behind.close()
+
+    def dump_snapshot(self, path: str) -> int:
+        """Save every shard, under its lock, to `path`.<index>; return
+        the number of entries saved."""
+        saved = 0
+        for index, (lock, shard) in enumerate(zip(self.locks, self.shards)):
+            with lock:
+                saved += shard.dump_snapshot("{}.{}".format(path, index))
+        return saved
+
+    def load_snapshot(self, path: str) -> int:
+        """Fill the empty shards from the files of `dump_snapshot`, made
+        with the same number of shards; return the number of entries."""
+        loaded = 0
+        for index, (lock, shard) in enumerate(zip(self.locks, self.shards)):
+            with lock:
+                loaded += shard.load_snapshot("{}.{}".format(path, index))
+        return loaded
+
+    def add_listener(self, listener):
+        """Notify `listener(key, item, reason)` of the evictions of every
+        shard; it is called with the lock of the shard held."""
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard.add_listener(listener)
+
+    @property
+    def stats(self) -> CacheStats:
+        """The statistics of every shard added together."""
+        total = CacheStats()
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                shard._check_stats()
+                total.merge(shard.stats)
+        return total
+
+    def stats_snapshot(self) -> dict:
+        """Return the statistics of the whole cache as a dictionary."""
+        return self.stats.snapshot(size=len(self), bytes=sum(
+            shard.current_bytes for shard in self.shards))
+
+    def stats_exposition(self, prefix: str = "cache") -> str:
+        """Return the statistics in the Prometheus text format."""
+        return self.stats.exposition(
+            prefix, {"cache": type(self).__name__}, size=len(self),
+            bytes=sum(shard.current_bytes for shard in self.shards))
+
+    def __len__(self) -> int:
+        """Return the number of entries over all the shards."""
+        return sum(len(shard.cache_data) for shard in self.shards)
+
+    @property
+    def cache_data(self) -> dict:
+        """A point-in-time copy of the entries of every shard."""
+        data = {}
+        for lock, shard in zip(self.locks, self.shards):
+            with lock:
+                data.update((key, decoded(item))
+                            for key, item in shard.cache_data.items())
+        return data
+
+    def print_cache(self):
+        """Print the entries of every shard sorted by key."""
+        data = self.cache_data
+        print("Current cache:")
+        for key in sorted(data.keys()):
+            print("{}: {}".format(key, data.get(key)))
+
+
+class ConcurrentFIFOCache(ShardedCache):
+    """Thread-safe FIFO cache, FIFO order is kept per shard"""
+    POLICY = FIFOCache
+
+
+class ConcurrentLIFOCache(ShardedCache):
+    """Thread-safe LIFO cache, LIFO order is kept per shard"""
+    POLICY = LIFOCache
+
+
+class ConcurrentLRUCache(ShardedCache):
+    """Thread-safe LRU cache, recency is kept per shard"""
+    POLICY = LRUCache
+
+
+class ConcurrentMRUCache(ShardedCache):
+    """Thread-safe MRU cache, recency is kept per shard"""
+    POLICY = MRUCache
+
+
+class ConcurrentLFUCache(ShardedCache):
+    """Thread-safe LFU cache, frequencies are kept per shard"""
+    POLICY = LFUCache
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+""" 101-main: stress test and read-heavy throughput of the sharded caches
+"""
+import os
+import random
+import threading
+import time
+
+concurrent_cache = __import__('101-concurrent_cache')
+
+
+def stress(cache_class, threads=8, operations=20000):
+    """Hammer one cache from many threads then check every shard."""
+    cache = cache_class(shards=8, max_items=256)
+    errors = []
+
+    def worker(seed):
+        rnd = random.Random(seed)
+        try:
+            for _ in range(operations):
+                key = rnd.randrange(1024)
+                if rnd.random() < 0.3:
+                    cache.put(key, key)
+                else:
+                    item = cache.get(key)
+                    assert item is None or item == key
+        except Exception as error:
+            errors.append(error)
+
+    workers = [threading.Thread(target=worker, args=(seed,))
+               for seed in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    assert not errors, errors
+    for shard in cache.shards:
+        assert len(shard.cache_data) <= shard.max_items, shard
+    assert sum(len(shard.cache_data) for shard in cache.shards) == \
+        len(cache) <= 256
+    print("{}: {} errors, {} entries".format(
+        cache_class.__name__, len(errors), len(cache)))
+
+
+def throughput(threads, operations=100000):
+    """Run a 95% read workload and return the operations per second."""
+    cache = concurrent_cache.ConcurrentLRUCache(shards=64, max_items=4096)
+    for key in range(4096):
+        cache.put(key, key)
+
+    def worker(seed):
+        rnd = random.Random(seed)
+        for _ in range(operations // threads):
+            key = rnd.randrange(4096)
+            if rnd.random() < 0.05:
+                cache.put(key, key)
+            else:
+                cache.get(key)
+
+    workers = [threading.Thread(target=worker, args=(seed,))
+               for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return operations / (time.perf_counter() - start)
+
+
+for name in ("ConcurrentFIFOCache", "ConcurrentLIFOCache",
+             "ConcurrentLRUCache", "ConcurrentMRUCache",
+             "ConcurrentLFUCache"):
+    stress(getattr(concurrent_cache, name))
+
+# the shards add up to the capacity asked for, whatever their number
+for shards, max_items in ((None, None), (16, 100), (3, 1000)):
+    cache = concurrent_cache.ConcurrentLRUCache(shards=shards,
+                                                max_items=max_items)
+    for key in range(5000):
+        cache.put(key, key)
+    print(cache.shard_count, len(cache),
+          sum(shard.max_items for shard in cache.shards))
+
+base = throughput(1)
+for threads in sorted({1, 2, 4, os.cpu_count() or 1}):
+    ops = throughput(threads)
+    print("{:>3} threads: {:>10.0f} ops/s ({:.2f}x)".format(
+        threads, ops, ops / base))
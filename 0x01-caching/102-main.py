@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+""" 102-main """
+import random
+
+TinyLFUCache = __import__('102-tinylfu_cache').TinyLFUCache
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+print_discard = __import__('eviction_listeners').print_discard
+
+my_cache = TinyLFUCache(listeners=[print_discard])
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.put("C", "Holberton")
+my_cache.put("D", "School")
+my_cache.print_cache()
+print(my_cache.get("B"))
+print(my_cache.get("B"))
+my_cache.put("E", "Battery")
+my_cache.print_cache()
+print(my_cache.get("E"))
+my_cache.put("F", "Mission")
+my_cache.print_cache()
+
+
+def hit_ratio(cache_class):
+    """Replay a drifting hot working set interrupted by scans of cold
+    keys and return the hit ratio."""
+    cache = cache_class(max_items=500)
+    rnd = random.Random(0)
+    hits = lookups = 0
+    cold = 10 ** 6
+    for step in range(100000):
+        if step % 5000 < 1000:
+            # a scan: every key is seen once and never again
+            key = cold
+            cold += 1
+        else:
+            # the popular keys change every 20000 lookups
+            key = int(rnd.paretovariate(0.6)) + step // 20000 * 1000
+        lookups += 1
+        if cache.get(key) is None:
+            cache.put(key, key)
+        else:
+            hits += 1
+    return hits / lookups
+
+
+ratios = [(cache_class.__name__, hit_ratio(cache_class))
+          for cache_class in (LRUCache, LFUCache, TinyLFUCache)]
+for name, ratio in ratios:
+    print("{}: {:.1%} hit ratio".format(name, ratio))
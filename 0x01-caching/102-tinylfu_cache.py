@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""W-TinyLFU caching policy"""
+
+from base_caching import BaseCaching
+from collections import OrderedDict
+from typing import Any, Union
+
+
+class CountMinSketch():
+    """CountMinSketch estimates how often keys were seen with a few
+    small counters per key instead of one entry per distinct key.
+
+    Counters saturate at 15 and are all halved after `sample_size`
+    increments, so the estimates follow the recent popularity of keys.
+    """
+    DEPTH = 4
+    MAX_COUNT = 15
+    SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)
+
+    def __init__(self, capacity: int, sample_size: int = None):
+        """Size the sketch for a cache of `capacity` entries.
+
+        Args:
+            capacity (int): number of entries of the cache.
+            sample_size (int): increments between two halvings,
+                defaults to ten times the width of the sketch.
+        """
+        width = 16
+        while width < capacity:
+            width <<= 1
+        self.width = width
+        self.mask = width - 1
+        self.table = bytearray(self.DEPTH * width)
+        self.sample_size = sample_size or 10 * width
+        self.additions = 0
+
+    def _indexes(self, key: Any):
+        """Return the counter of `key` in every row of the table."""
+        hashed = hash(key)
+        for row, seed in enumerate(self.SEEDS):
+            spread = (hashed * seed) & 0xFFFFFFFF
+            yield row * self.width + ((spread ^ (spread >> 15)) & self.mask)
+
+    def increment(self, key: Any):
+        """Count one more occurrence of `key`."""
+        table = self.table
+        for index in self._indexes(key):
+            if table[index] < self.MAX_COUNT:
+                table[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.halve()
+
+    def frequency(self, key: Any) -> int:
+        """Return the estimated number of occurrences of `key`."""
+        return min(self.table[index] for index in self._indexes(key))
+
+    def halve(self):
+        """Divide every counter by two to age old occurrences."""
+        self.table = bytearray(count >> 1 for count in self.table)
+        self.additions //= 2
+
+
+class TinyLFUCache(BaseCaching):
+    """TinyLFUCache inherits from BaseCaching
+    and implements a W-TinyLFU caching system
+
+    New keys enter a small LRU admission window. A key leaving the window
+    only joins the main region if the frequency sketch says it is more
+    popular than the key the main region would evict, so a scan of cold
+    keys cannot flush the working set. The main region is a segmented
+    LRU: keys hit while in probation are promoted to the protected
+    segment, and the protected overflow is demoted back to probation.
+    """
+    # every new key must go through the admission filter
+    BULK_EVICTION = False
+    WINDOW_RATIO = 0.01
+    PROTECTED_RATIO = 0.8
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        capacity = self.max_items or 1
+        self.window_size = max(1, int(capacity * self.WINDOW_RATIO))
+        main_size = max(1, capacity - self.window_size)
+        self.protected_size = max(1, int(main_size * self.PROTECTED_RATIO))
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = CountMinSketch(capacity)
+
+    def _on_insert(self, key: str):
+        """Record the key and place it in the admission window."""
+        self.sketch.increment(key)
+        self.window[key] = None
+        if len(self.window) > self.window_size:
+            # the cache had room: the window overflow joins the main region
+            candidate, _ = self.window.popitem(last=False)
+            self.probation[candidate] = None
+
+    def _on_access(self, key: str):
+        """Record the hit and refresh the key in its segment."""
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.probation:
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_size:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+        else:
+            self.protected.move_to_end(key)
+
+    def _on_update(self, key: str):
+        """Treat an update like a hit."""
+        self._on_access(key)
+
+    def _on_miss(self, key: str):
+        """Record the lookup so a key missed often can be admitted."""
+        self.sketch.increment(key)
+
+    def _on_remove(self, key: str):
+        """Forget a key that left the cache."""
+        for segment in (self.window, self.probation, self.protected):
+            if key in segment:
+                del segment[key]
+                return
+
+    def _policy_state(self) -> dict:
+        """Save the segments but not the sketch: its counters are indexed
+        by `hash`, which changes from a process to the next for str."""
+        state = super()._policy_state()
+        del state["sketch"]
+        return state
+
+    def _restore_policy_state(self, state: dict):
+        """Restore the segments and rebuild the sketch from their keys,
+        counting the protected ones, hit at least once, twice."""
+        super()._restore_policy_state(state)
+        increment = self.sketch.increment
+        for segment in (self.window, self.probation, self.protected):
+            for key in segment:
+                increment(key)
+        for key in self.protected:
+            increment(key)
+
+    def _main_victim(self) -> Union[str, None]:
+        """Return the key the main region would evict."""
+        for segment in (self.probation, self.protected):
+            if segment:
+                return next(iter(segment))
+        return None
+
+    def _victim(self) -> str:
+        """Run the admission filter and return the key to discard.
+
+        When the window is full its least recently used key is the
+        candidate: it is admitted to probation if it is more frequent than
+        the main victim, which is then discarded, otherwise the candidate
+        itself is discarded.
+        """
+        victim = self._main_victim()
+        if victim is None:
+            return next(iter(self.window))
+        if len(self.window) < self.window_size:
+            return victim
+        candidate = next(iter(self.window))
+        if self.sketch.frequency(candidate) > self.sketch.frequency(victim):
+            del self.window[candidate]
+            self.probation[candidate] = None
+            return victim
+        return candidate
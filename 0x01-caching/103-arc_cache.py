@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""ARC caching policy"""
+
+from base_caching import BaseCaching
+from collections import OrderedDict
+
+
+class ARCCache(BaseCaching):
+    """ARCCache inherits from BaseCaching
+    and implements an Adaptive Replacement Cache
+
+    Cached keys are split between T1 (seen once recently) and T2 (seen
+    at least twice). The keys recently evicted from each of them are
+    remembered, without their items, in the ghost lists B1 and B2. A miss
+    on a key of B1 means T1 was too small, a miss on a key of B2 means T2
+    was too small, and the target size `p` of T1 moves accordingly, so the
+    cache balances recency and frequency on its own. Every operation is
+    O(1).
+    """
+    # the victim depends on the key being inserted
+    BULK_EVICTION = False
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.p = 0
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+        # key being inserted, used by _victim to apply the ARC rules
+        self.incoming = None
+
+    def _put(self, key, item, ttl, dirty=True, tags=None):
+        """Adapt to a ghost hit, then store the item like BaseCaching."""
+        if key is not None and item is not None and \
+                key not in self.cache_data:
+            self._adapt(key)
+        self.incoming = key
+        try:
+            super()._put(key, item, ttl, dirty, tags)
+        finally:
+            self.incoming = None
+
+    def _capacity(self) -> int:
+        """Return the number of entries ARC balances T1 and T2 over."""
+        return self.max_items or max(1, len(self.cache_data))
+
+    def _adapt(self, key: str):
+        """Move the target size of T1 on a ghost hit.
+
+        A hit in B1 grows `p` (more room for recency), a hit in B2 shrinks
+        it (more room for frequency), by a step proportional to the
+        relative sizes of the ghost lists.
+        """
+        if key in self.b1:
+            delta = max(1, len(self.b2) // len(self.b1))
+            self.p = min(self._capacity(), self.p + delta)
+        elif key in self.b2:
+            delta = max(1, len(self.b1) // len(self.b2))
+            self.p = max(0, self.p - delta)
+
+    def _on_insert(self, key: str):
+        """Place a new key: ghost hits go to T2, other keys to T1."""
+        if key in self.b1:
+            del self.b1[key]
+            self.t2[key] = None
+        elif key in self.b2:
+            del self.b2[key]
+            self.t2[key] = None
+        else:
+            self.t1[key] = None
+            self._trim_ghosts(self._capacity())
+
+    def _on_access(self, key: str):
+        """A hit makes the key frequent: it moves to the MRU end of T2."""
+        if key in self.t1:
+            del self.t1[key]
+        else:
+            del self.t2[key]
+        self.t2[key] = None
+
+    def _on_update(self, key: str):
+        """Treat an update like a hit."""
+        self._on_access(key)
+
+    def _on_remove(self, key: str):
+        """Forget a key that left the cache."""
+        if key in self.t1:
+            del self.t1[key]
+        else:
+            del self.t2[key]
+
+    def _evict(self, key: str):
+        """Discard a key for room and remember it in the ghost list of its
+        segment; keys deleted or expired leave no ghost, so putting them
+        back does not move `p`."""
+        ghosts = self.b1 if key in self.t1 else self.b2
+        super()._evict(key)
+        ghosts[key] = None
+
+    def _trim_ghosts(self, capacity: int):
+        """Keep the directory (cached plus ghost keys) within bounds."""
+        if len(self.t1) + len(self.b1) > capacity and self.b1:
+            self.b1.popitem(last=False)
+        while len(self.t1) + len(self.t2) + len(self.b1) + \
+                len(self.b2) > 2 * capacity and (self.b1 or self.b2):
+            ghosts = self.b2 if self.b2 else self.b1
+            ghosts.popitem(last=False)
+
+    def _victim(self) -> str:
+        """Return the LRU key of T1 or of T2 following the ARC REPLACE
+        rule for the key being inserted."""
+        if self.t1 and (len(self.t1) > self.p or (
+                self.incoming in self.b2 and len(self.t1) == self.p)
+                or not self.t2):
+            return next(iter(self.t1))
+        return next(iter(self.t2))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+""" 103-main """
+import random
+
+ARCCache = __import__('103-arc_cache').ARCCache
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+print_discard = __import__('eviction_listeners').print_discard
+
+my_cache = ARCCache(listeners=[print_discard])
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.put("C", "Holberton")
+my_cache.put("D", "School")
+my_cache.print_cache()
+print(my_cache.get("B"))
+my_cache.put("E", "Battery")
+my_cache.print_cache()
+my_cache.put("C", "Street")
+my_cache.print_cache()
+print(my_cache.get("A"))
+print(my_cache.get("B"))
+print(my_cache.get("C"))
+my_cache.put("F", "Mission")
+my_cache.print_cache()
+my_cache.put("A", "Hello")
+my_cache.print_cache()
+
+
+def mixed_trace(length=120000, seed=0):
+    """Yield keys alternating between frequency-heavy phases (a skewed
+    hot set hit by scans of cold keys) and recency-heavy phases (a
+    working set that keeps moving)."""
+    rnd = random.Random(seed)
+    cold = 10 ** 6
+    for step in range(length):
+        phase = step // 20000
+        if phase % 2 == 0:
+            if step % 4000 < 600:
+                cold += 1
+                yield cold
+            else:
+                yield int(rnd.paretovariate(0.5)) % 3000
+        else:
+            yield 5000 + phase * 1000 + step % 20000 // 50 + \
+                rnd.randrange(300)
+
+
+def hit_ratio(cache_class):
+    """Return the hit ratio of a 500 entries cache on the mixed trace."""
+    cache = cache_class(max_items=500)
+    hits = lookups = 0
+    for key in mixed_trace():
+        lookups += 1
+        if cache.get(key) is None:
+            cache.put(key, key)
+        else:
+            hits += 1
+    return hits / lookups
+
+
+ratios = [(cache_class.__name__, hit_ratio(cache_class))
+          for cache_class in (LRUCache, LFUCache, ARCCache)]
+for name, ratio in ratios:
+    print("{}: {:.1%} hit ratio".format(name, ratio))
+assert ratios[2][1] > max(ratios[0][1], ratios[1][1])
+
+# a deleted key leaves no ghost: putting it back does not move p
+arc = ARCCache(max_items=2)
+arc.put("A", 1)
+arc.delete("A")
+arc.put("A", 1)
+print(arc.p, list(arc.t1), list(arc.b1))
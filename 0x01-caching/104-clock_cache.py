@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""CLOCK caching policy"""
+
+from base_caching import BaseCaching
+
+
+class CLOCKCache(BaseCaching):
+    """CLOCKCache inherits from BaseCaching
+    and implements a CLOCK (second chance) caching system
+
+    Keys sit in a fixed ring of `max_items` slots with one referenced bit
+    each. A hit only sets the bit of the key's slot, nothing is moved. To
+    evict, a hand sweeps the ring clearing set bits and stops on the first
+    key whose bit is clear, which approximates LRU.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        size = self.max_items or 1
+        self.ring = [None] * size
+        self.referenced = bytearray(size)
+        self.slots = {}
+        self.free_slots = list(range(size - 1, -1, -1))
+        self.hand = 0
+
+    def _on_insert(self, key: str):
+        """Place a new key in a free slot of the ring."""
+        slot = self.free_slots.pop()
+        self.ring[slot] = key
+        self.referenced[slot] = 0
+        self.slots[key] = slot
+
+    def _on_access(self, key: str):
+        """Set the referenced bit of a key read by a cache hit."""
+        self.referenced[self.slots[key]] = 1
+
+    def _on_update(self, key: str):
+        """Set the referenced bit of an updated key."""
+        self.referenced[self.slots[key]] = 1
+
+    def _on_remove(self, key: str):
+        """Free the slot of a key that left the cache."""
+        slot = self.slots.pop(key)
+        self.ring[slot] = None
+        self.free_slots.append(slot)
+
+    def _victim(self) -> str:
+        """Sweep the hand to the first key without its referenced bit."""
+        ring, referenced = self.ring, self.referenced
+        hand, size = self.hand, len(ring)
+        while ring[hand] is None or referenced[hand]:
+            referenced[hand] = 0
+            hand = (hand + 1) % size
+        self.hand = (hand + 1) % size
+        return ring[hand]
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+""" 104-main """
+import random
+import time
+
+CLOCKCache = __import__('104-clock_cache').CLOCKCache
+LRUCache = __import__('3-lru_cache').LRUCache
+print_discard = __import__('eviction_listeners').print_discard
+
+my_cache = CLOCKCache(listeners=[print_discard])
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.put("C", "Holberton")
+my_cache.put("D", "School")
+my_cache.print_cache()
+print(my_cache.get("B"))
+my_cache.put("E", "Battery")
+my_cache.print_cache()
+my_cache.put("C", "Street")
+my_cache.print_cache()
+print(my_cache.get("A"))
+print(my_cache.get("B"))
+print(my_cache.get("C"))
+my_cache.put("F", "Mission")
+my_cache.print_cache()
+my_cache.put("G", "San Francisco")
+my_cache.print_cache()
+
+
+def replay(cache_class):
+    """Return the hit ratio and the time of the hits of a skewed trace."""
+    cache = cache_class(max_items=1000)
+    rnd = random.Random(0)
+    trace = [int(rnd.paretovariate(0.5)) % 20000 for _ in range(200000)]
+    hits = 0
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, key)
+        else:
+            hits += 1
+    get = cache.get
+    warm = list(cache.cache_data) * 200
+    start = time.perf_counter()
+    for key in warm:
+        get(key)
+    elapsed = time.perf_counter() - start
+    return hits / len(trace), len(warm) / elapsed
+
+
+for cache_class in (LRUCache, CLOCKCache):
+    ratio, speed = replay(cache_class)
+    print("{}: {:.1%} hit ratio, {:.0f} hits/s".format(
+        cache_class.__name__, ratio, speed))
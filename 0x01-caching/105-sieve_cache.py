@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""SIEVE caching policy"""
+
+from base_caching import BaseCaching
+
+
+class SIEVECache(BaseCaching):
+    """SIEVECache inherits from BaseCaching
+    and implements a SIEVE caching system
+
+    Keys form a queue from the oldest (tail) to the newest (head) entry,
+    with one visited bit each. A hit only sets the bit. To evict, a hand
+    walks from where it last stopped towards the head, clearing set bits,
+    and discards the first key whose bit is clear; keys that survive stay
+    in place instead of being moved to the head.
+
+    The queue is a doubly linked list over fixed arrays of `max_items`
+    slots, so no node object is allocated per key.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        size = self.max_items or 1
+        self.keys = [None] * size
+        self.visited = bytearray(size)
+        self.newer = [-1] * size
+        self.older = [-1] * size
+        self.slots = {}
+        self.free_slots = list(range(size - 1, -1, -1))
+        self.head = self.tail = self.hand = -1
+
+    def _on_insert(self, key: str):
+        """Put a new key at the head of the queue."""
+        slot = self.free_slots.pop()
+        self.keys[slot] = key
+        self.visited[slot] = 0
+        self.slots[key] = slot
+        self.newer[slot] = -1
+        self.older[slot] = self.head
+        if self.head != -1:
+            self.newer[self.head] = slot
+        self.head = slot
+        if self.tail == -1:
+            self.tail = slot
+
+    def _on_access(self, key: str):
+        """Set the visited bit of a key read by a cache hit."""
+        self.visited[self.slots[key]] = 1
+
+    def _on_update(self, key: str):
+        """Set the visited bit of an updated key."""
+        self.visited[self.slots[key]] = 1
+
+    def _on_remove(self, key: str):
+        """Unlink a key that left the cache and free its slot."""
+        slot = self.slots.pop(key)
+        older, newer = self.older[slot], self.newer[slot]
+        if older != -1:
+            self.newer[older] = newer
+        else:
+            self.tail = newer
+        if newer != -1:
+            self.older[newer] = older
+        else:
+            self.head = older
+        if self.hand == slot:
+            self.hand = newer
+        self.keys[slot] = None
+        self.free_slots.append(slot)
+
+    def _victim(self) -> str:
+        """Walk the hand to the first key without its visited bit."""
+        visited, newer = self.visited, self.newer
+        slot = self.hand if self.hand != -1 else self.tail
+        while visited[slot]:
+            visited[slot] = 0
+            slot = newer[slot]
+            if slot == -1:
+                slot = self.tail
+        self.hand = slot
+        return self.keys[slot]
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+""" 106-main: entries expiring after a time-to-live
+"""
+
+
+class FakeClock():
+    """A clock the script moves forward by hand."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+policies = [
+    __import__('1-fifo_cache').FIFOCache,
+    __import__('2-lifo_cache').LIFOCache,
+    __import__('3-lru_cache').LRUCache,
+    __import__('4-mru_cache').MRUCache,
+    __import__('100-lfu_cache').LFUCache,
+]
+
+clock = FakeClock()
+my_cache = policies[2](default_ttl=10, clock=clock)
+my_cache.put("A", "Hello")
+my_cache.put("B", "World", ttl=2)
+my_cache.put("C", "Holberton", ttl=100)
+my_cache.print_cache()
+clock.now = 1.5
+print(my_cache.get("B"))
+clock.now = 2.0
+print(my_cache.get("B"))
+clock.now = 10.5
+my_cache.put("D", "School")
+my_cache.print_cache()
+my_cache.put("C", "Street")
+clock.now = 21.0
+my_cache.print_cache()
+print(my_cache.get("D"))
+my_cache.print_cache()
+
+for policy in policies:
+    clock = FakeClock()
+    cache = policy(max_items=1000, default_ttl=5, clock=clock)
+    for second in range(60):
+        clock.now = second
+        for key in range(50):
+            cache.put("{}-{}".format(second, key), key)
+            assert cache.get("{}-{}".format(second - 5, key)) is None
+    # only the entries of the last five seconds are left
+    print("{}: {} entries, {} timers".format(
+        policy.__name__, len(cache.cache_data), len(cache.timer_wheel)))
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+""" 107-main: statistics of a cache
+"""
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+my_cache = LFUCache(max_items=3)
+for key in "ABCDABEAF":
+    if my_cache.get(key) is None:
+        my_cache.put(key, key.lower())
+my_cache.put("A", "Street")
+my_cache.delete("F")
+
+snapshot = my_cache.stats_snapshot()
+for name in ("hits", "misses", "hit_ratio", "inserts", "updates",
+             "evictions", "size"):
+    print("{}: {}".format(name, snapshot[name]))
+for line in my_cache.stats_exposition().splitlines():
+    if not line.startswith("cache_get") and not line.startswith("cache_put"):
+        print(line)
+my_cache.stats_snapshot(reset=True)
+print(my_cache.stats_snapshot()["hits"])
+
+quiet = LFUCache(stats=False)
+try:
+    quiet.stats_snapshot()
+except ValueError as error:
+    print(error)
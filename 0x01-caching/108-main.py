@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+""" 108-main """
+import asyncio
+import threading
+import time
+
+memoize_module = __import__('108-memoize')
+memoize = memoize_module.memoize
+memoize_async = memoize_module.memoize_async
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+calls = []
+
+
+@memoize(LFUCache, max_items=2)
+def slow_square(number):
+    """Square a number, slowly."""
+    calls.append(number)
+    time.sleep(0.1)
+    return number * number
+
+
+# 20 threads miss on the same key at once: the function runs only once
+threads = [threading.Thread(target=slow_square, args=(4,))
+           for _ in range(20)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(slow_square(4), calls)
+print(slow_square(5), slow_square(6), slow_square(4), calls)
+print(slow_square.cache.stats_snapshot()["hits"])
+
+
+@memoize_async(max_items=10)
+async def fetch(name, greeting="Hello"):
+    """Pretend to load a greeting from a slow backend."""
+    calls.append(name)
+    await asyncio.sleep(0.1)
+    return "{} {}".format(greeting, name)
+
+
+async def main():
+    """Await the same key many times concurrently."""
+    results = await asyncio.gather(*(fetch("Holberton") for _ in range(20)))
+    print(set(results), calls.count("Holberton"))
+    print(await fetch("School", greeting="Hi"), calls.count("School"))
+
+    # cancelling the first caller does not fail the ones awaiting with it
+    first = asyncio.ensure_future(fetch("Street"))
+    await asyncio.sleep(0)
+    others = asyncio.gather(*(fetch("Street") for _ in range(3)))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    print(await others, first.cancelled(), calls.count("Street"))
+
+asyncio.run(main())
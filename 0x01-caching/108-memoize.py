@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Memoization decorators backed by the caching policies"""
+
+import asyncio
+import functools
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+# caches can't hold None, results of None are stored as this marker
+_NONE = object()
+_KWARGS = object()
+
+
+def make_key(args: Tuple, kwargs: Dict) -> Any:
+    """Build a hashable cache key from the arguments of a call.
+
+    Args:
+        args (Tuple): The positional arguments.
+        kwargs (Dict): The keyword arguments.
+
+    Returns:
+        The only argument when the call has a single positional argument,
+        otherwise a tuple of all the arguments.
+    """
+    if not kwargs and len(args) == 1 and type(args[0]) in (int, str):
+        return args[0]
+    key = args
+    if kwargs:
+        key += (_KWARGS,) + tuple(sorted(kwargs.items()))
+    return key
+
+
+class _Flight():
+    """One computation of a value that concurrent callers wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self) -> Any:
+        """Block until the computation is over and return its result."""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _retrieve(flight: asyncio.Future):
+    """Retrieve the exception of a flight, so one whose callers were all
+    cancelled doesn't log a warning."""
+    if not flight.cancelled():
+        flight.exception()
+
+
+def memoize(policy: type = LRUCache, max_items: int = 128,
+            **options) -> Callable:
+    """Cache the results of a function in a `policy` cache.
+
+    Concurrent calls missing on the same key are coalesced: only the
+    first one runs the function, the others wait for its result (or its
+    exception) instead of recomputing it.
+
+    Args:
+        policy (type): The BaseCaching subclass holding the results.
+        max_items (int): The capacity of the cache.
+        **options: Any other option of the policy (default_ttl, listeners...).
+
+    Returns:
+        A decorator; the decorated function exposes its cache as `.cache`.
+    """
+    def decorator(function: Callable) -> Callable:
+        cache = policy(max_items=max_items, **options)
+        lock = threading.Lock()
+        flights = {}
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            with lock:
+                item = cache.get(key)
+                if item is not None:
+                    return None if item is _NONE else item
+                flight = flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = flights[key] = _Flight()
+            if not leader:
+                return flight.wait()
+
+            try:
+                result = function(*args, **kwargs)
+            except BaseException as error:
+                with lock:
+                    del flights[key]
+                flight.error = error
+                flight.done.set()
+                raise
+            with lock:
+                cache.put(key, _NONE if result is None else result)
+                del flights[key]
+            flight.result = result
+            flight.done.set()
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def memoize_async(policy: type = LRUCache, max_items: int = 128,
+                  **options) -> Callable:
+    """Cache the results of a coroutine function in a `policy` cache.
+
+    Like `memoize`, concurrent awaits missing on the same key share one
+    call of the coroutine function. The call runs in its own task, so
+    cancelling one of the awaiting callers does not cancel it for the
+    others; it completes (and is cached) even if they are all cancelled.
+    The cache must be used from a single event loop.
+
+    Args:
+        policy (type): The BaseCaching subclass holding the results.
+        max_items (int): The capacity of the cache.
+        **options: Any other option of the policy (default_ttl, listeners...).
+
+    Returns:
+        A decorator; the decorated function exposes its cache as `.cache`.
+    """
+    def decorator(function: Callable) -> Callable:
+        cache = policy(max_items=max_items, **options)
+        flights = {}
+
+        async def call(key, args, kwargs):
+            try:
+                result = await function(*args, **kwargs)
+                cache.put(key, _NONE if result is None else result)
+                return result
+            finally:
+                del flights[key]
+
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            item = cache.get(key)
+            if item is not None:
+                return None if item is _NONE else item
+            flight = flights.get(key)
+            if flight is None:
+                flight = flights[key] = asyncio.ensure_future(
+                    call(key, args, kwargs))
+                flight.add_done_callback(_retrieve)
+            return await asyncio.shield(flight)
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+""" 109-main: read-through loading and write-behind writing
+"""
+LRUCache = __import__('3-lru_cache').LRUCache
+ConcurrentLRUCache = __import__('101-concurrent_cache').ConcurrentLRUCache
+
+database = {"A": "Hello", "B": "World", "C": "Holberton", "D": "School"}
+calls = []
+
+
+def loader(key):
+    calls.append(("load", key))
+    return database.get(key)
+
+
+def batch_loader(keys):
+    calls.append(("get_many", sorted(keys)))
+    return {key: database[key] for key in keys if key in database}
+
+
+def writer(batch):
+    calls.append(("write", sorted(batch.items())))
+    database.update(batch)
+
+
+my_cache = LRUCache(loader=loader, batch_loader=batch_loader, writer=writer,
+                    write_interval=3600)
+print(my_cache.get("A"))
+print(my_cache.get("A"))
+print(my_cache.get("Z"))
+print(my_cache.get_many(["A", "B", "C", "Z"]))
+my_cache.print_cache()
+
+my_cache.put("E", "Street")
+my_cache.put("A", "Bonjour")
+my_cache.put("A", "Hola")
+print(database["A"])
+my_cache.flush()
+print(database["A"], database["E"])
+# a deleted key is not written, an invalidated one still is
+my_cache.put("F", "Avenue")
+my_cache.put("G", "Square", tags=["plaza"])
+my_cache.delete("F")
+my_cache.invalidate_tag("plaza")
+my_cache.flush()
+print("F" in database, database.get("G"))
+my_cache.close()
+for call in calls:
+    print(call)
+
+del calls[:]
+sharded = ConcurrentLRUCache(shards=4, max_items=64, batch_loader=batch_loader,
+                             writer=writer, write_batch_size=2)
+print(sharded.get_many(["A", "B", "C", "D"]) == {
+    key: database[key] for key in "ABCD"})
+print(len(calls) <= 4)
+sharded.put("F", "Road")
+sharded.put("G", "Lane")
+sharded.close()
+print(database["F"], database["G"])
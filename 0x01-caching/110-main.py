@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+""" 110-main: bulk operations against per-key loops
+"""
+import random
+import time
+
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+ConcurrentLRUCache = __import__('101-concurrent_cache').ConcurrentLRUCache
+
+my_cache = LRUCache()
+my_cache.put_many({"A": "Hello", "B": "World", "C": "Holberton"})
+print(my_cache.get_many(["A", "C", "Z"]))
+my_cache.put_many([("D", "School"), ("E", "Street"), ("B", "Bonjour")])
+my_cache.print_cache()
+print(my_cache.delete_many(["A", "B", "Z"]))
+my_cache.print_cache()
+
+
+def loop(cache, batches):
+    """Put then get every batch one key at a time."""
+    for batch in batches:
+        for key in batch:
+            cache.put(key, key)
+        for key in batch:
+            cache.get(key)
+
+
+def bulk(cache, batches):
+    """Put then get every batch with one call each."""
+    for batch in batches:
+        cache.put_many(dict.fromkeys(batch, 0))
+        cache.get_many(batch)
+
+
+rnd = random.Random(0)
+batches = [[rnd.randrange(20000) for _ in range(50)] for _ in range(2000)]
+for factory in (lambda: LRUCache(max_items=4096),
+                lambda: LFUCache(max_items=4096),
+                lambda: ConcurrentLRUCache(shards=4, max_items=4096)):
+    timings = []
+    for run in (loop, bulk):
+        cache = factory()
+        start = time.perf_counter()
+        run(cache, batches)
+        timings.append(time.perf_counter() - start)
+    print("{}: per-key {:.0f} ms, bulk {:.0f} ms ({:.1f}x)".format(
+        type(cache).__name__, timings[0] * 1000, timings[1] * 1000,
+        timings[0] / timings[1]))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+""" 111-main: one cache shared by the worker processes of the host
+"""
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+shm_cache = __import__('111-shm_cache')
+SharedMemoryTier = shm_cache.SharedMemoryTier
+TieredCache = shm_cache.TieredCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+path = os.path.join(tempfile.gettempdir(), "111-main.cache")
+if os.path.exists(path):
+    os.unlink(path)
+
+
+def writer(path):
+    """A worker computing values the others will read."""
+    cache = TieredCache(l2=SharedMemoryTier(path, slots=256))
+    cache.put("A", "Hello")
+    cache.put("B", {"World": [1, 2, 3]})
+    cache.put("C", "Holberton", ttl=60)
+
+
+def hammer(path, seed, errors):
+    """A worker reading and writing random keys of the shared tier."""
+    tier = SharedMemoryTier(path, slots=256)
+    rnd = random.Random(seed)
+    for _ in range(3000):
+        key = rnd.randrange(500)
+        if rnd.random() < 0.3:
+            tier.put(key, "value-{}".format(key) * rnd.randrange(1, 10))
+        else:
+            item = tier.get(key)
+            if item is not None and not item.startswith(
+                    "value-{}".format(key)):
+                errors.value += 1
+
+
+process = multiprocessing.Process(target=writer, args=(path,))
+process.start()
+process.join()
+
+# a miss in this process's own L1 is a hit in the shared tier
+cache = TieredCache(LFUCache(max_items=2), SharedMemoryTier(path, slots=256))
+print(cache.get("A"), cache.get("B"), cache.get("Z"))
+print(cache.l1.cache_data)
+cache.print_cache()
+cache.delete("A")
+print(cache.get("A"))
+stats = cache.l2.stats
+print("L2: {} hits, {} misses".format(stats.hits, stats.misses))
+
+# an L2 hit copied into L1 expires there with the L2 entry
+cache.l2.put("D", "short-lived", ttl=0.2)
+print(cache.get("D"), "D" in cache.l1.cache_data)
+time.sleep(0.3)
+print(cache.get("D"))
+
+# a segment file others could write to is refused
+shared = path + ".shared"
+with open(shared, "wb"):
+    pass
+os.chmod(shared, 0o666)
+try:
+    SharedMemoryTier(shared, slots=256)
+except PermissionError as error:
+    print(type(error).__name__)
+os.unlink(shared)
+
+errors = multiprocessing.Value("i", 0)
+workers = [multiprocessing.Process(target=hammer, args=(path, seed, errors))
+           for seed in range(4)]
+for worker in workers:
+    worker.start()
+for worker in workers:
+    worker.join()
+print("{} torn reads, {} entries".format(errors.value, len(cache.l2)))
+cache.l2.close()
+cache.l2.unlink()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""Shared-memory L2 cache tier for the worker processes of one host"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import pickle
+import stat
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Tuple, Union
+
+from cache_stats import CacheStats
+from eviction_listeners import EvictionReason
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+
+def default_path() -> str:
+    """Return the file backing the segment of the current user, in
+    /dev/shm when it exists so the pages never hit the disk."""
+    directory = "/dev/shm"
+    if not os.path.isdir(directory):
+        directory = tempfile.gettempdir()
+    return os.path.join(directory, "alx-backend-cache-{}".format(
+        os.getuid()))
+
+
+def open_private(path: str) -> int:
+    """Open the file at `path`, creating it, and return its descriptor.
+
+    The entries are unpickled, so whoever can write the file can run code
+    in every process using it: an existing file is refused unless it is a
+    regular file (not a symlink) owned by the current user and neither
+    readable nor writable by anybody else.
+
+    Raises:
+        PermissionError: If the existing file is not private.
+    """
+    try:
+        return os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    fd = os.open(path, os.O_RDWR | getattr(os, "O_NOFOLLOW", 0))
+    info = os.fstat(fd)
+    if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid() or \
+            info.st_mode & 0o077:
+        os.close(fd)
+        raise PermissionError(
+            "{} is not a private file of the current user".format(path))
+    return fd
+
+
+class SharedMemoryTier():
+    """SharedMemoryTier stores pickled entries in a file mapped with mmap
+    by every process using the same `path`, so a value put by one worker
+    process is a hit for all the others.
+
+    The segment is a set-associative table of fixed-size slots: a key
+    hashes to a set of WAYS slots, and a new key takes a free slot of its
+    set or replaces the entry of the set written the longest time ago.
+    A value too big for a slot is not stored. Each set is guarded by an
+    fcntl lock on one byte of the file, shared to read and exclusive to
+    write, so processes only wait for each other on the same set.
+
+    Keys are hashed with blake2b of their pickle, which unlike `hash` is
+    the same in every process. Items are unpickled, so the segment must
+    be private to the user, see `open_private`.
+    """
+    MAGIC = b"ALXC"
+    HEADER = struct.Struct("<4sII")
+    # key hash (0 for a free slot), expiry time (0 for none), write time,
+    # value length, key length
+    SLOT = struct.Struct("<QdQIH")
+    WAYS = 8
+
+    def __init__(self, path: str = None, slots: int = 4096,
+                 slot_size: int = 512):
+        """Open the segment at `path`, creating it when missing.
+
+        Args:
+            path (str): file backing the segment, defaults to
+                default_path(). Every process must use the same geometry.
+            slots (int): number of slots, rounded up to a multiple of WAYS.
+            slot_size (int): bytes per slot, pickled key and value
+                included.
+
+        Raises:
+            PermissionError: If the file exists and is not private.
+            ValueError: If the file holds a segment of another geometry.
+        """
+        self.path = path or default_path()
+        self.sets = -(-slots // self.WAYS)
+        self.slot_size = slot_size
+        self.payload = slot_size - self.SLOT.size
+        size = self.HEADER.size + self.sets * self.WAYS * slot_size
+        # fcntl locks belong to the process: threads take this one first
+        self.lock = threading.Lock()
+        self.stats = CacheStats()
+        self.fd = open_private(self.path)
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX)
+            try:
+                self._initialize(size)
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN)
+            self.map = mmap.mmap(self.fd, size)
+        except Exception:
+            os.close(self.fd)
+            raise
+
+    def _initialize(self, size: int):
+        """Size and stamp a new segment, or check the geometry of an
+        existing one; called with the whole file locked."""
+        if os.fstat(self.fd).st_size == 0:
+            os.ftruncate(self.fd, size)
+            os.pwrite(self.fd, self.HEADER.pack(
+                self.MAGIC, self.sets, self.slot_size), 0)
+        header = self.HEADER.unpack(os.pread(self.fd, self.HEADER.size, 0))
+        if header != (self.MAGIC, self.sets, self.slot_size):
+            raise ValueError("{} holds a segment of another geometry"
+                             .format(self.path))
+
+    def _locate(self, key: Any):
+        """Return the pickled key, its hash and its set index."""
+        data = pickle.dumps(key, pickle.HIGHEST_PROTOCOL)
+        hashed = int.from_bytes(
+            hashlib.blake2b(data, digest_size=8).digest(), "little")
+        # a stored hash is never 0, which marks a free slot
+        return data, hashed | 1, hashed % self.sets
+
+    def _slot_offset(self, index: int, way: int) -> int:
+        """Return the offset of a slot in the segment."""
+        return self.HEADER.size + \
+            (index * self.WAYS + way) * self.slot_size
+
+    def _find(self, index: int, data: bytes, hashed: int):
+        """Return the offset of the slot holding a key, or None."""
+        for way in range(self.WAYS):
+            offset = self._slot_offset(index, way)
+            slot_hash, _, _, _, key_size = self.SLOT.unpack_from(
+                self.map, offset)
+            start = offset + self.SLOT.size
+            if slot_hash == hashed and \
+                    self.map[start:start + key_size] == data:
+                return offset
+        return None
+
+    def _lock_set(self, index: int, mode: int):
+        """Lock the byte of a set, see the class docstring."""
+        fcntl.lockf(self.fd, mode, 1, index)
+
+    def put(self, key: Any, item: Any, ttl: float = None):
+        """Store an item for every process.
+
+        Args:
+            key (Any): The key under which the item is stored.
+            item (Any): The item to store, it must be picklable.
+            ttl (float): Seconds the entry lives, forever when None.
+        """
+        if key is None or item is None:
+            return
+        data, hashed, index = self._locate(key)
+        value = pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+        if len(data) + len(value) > self.payload:
+            self.stats.evictions["oversize"] += 1
+            return
+        expires = time.time() + ttl if ttl is not None else 0.0
+        with self.lock:
+            self._lock_set(index, fcntl.LOCK_EX)
+            try:
+                offset = self._find(index, data, hashed)
+                if offset is not None:
+                    self.stats.updates += 1
+                else:
+                    offset = self._free_slot(index)
+                    self.stats.inserts += 1
+                self.SLOT.pack_into(self.map, offset, hashed, expires,
+                                    time.time_ns(), len(value), len(data))
+                start = offset + self.SLOT.size
+                self.map[start:start + len(data)] = data
+                start += len(data)
+                self.map[start:start + len(value)] = value
+            finally:
+                self._lock_set(index, fcntl.LOCK_UN)
+
+    def _free_slot(self, index: int) -> int:
+        """Return a free slot of a set, or the one written the longest
+        time ago (counted as an eviction)."""
+        oldest = None
+        oldest_stamp = None
+        now = time.time()
+        for way in range(self.WAYS):
+            offset = self._slot_offset(index, way)
+            slot_hash, expires, stamp, _, _ = self.SLOT.unpack_from(
+                self.map, offset)
+            if slot_hash == 0 or (expires and expires <= now):
+                return offset
+            if oldest is None or stamp < oldest_stamp:
+                oldest, oldest_stamp = offset, stamp
+        self.stats.evictions[EvictionReason.CAPACITY] += 1
+        return oldest
+
+    def get(self, key: Any) -> Union[Any, None]:
+        """Retrieve an item stored by any process.
+
+        Args:
+            key (Any): The key of the item to retrieve.
+
+        Returns:
+            The item, or None if the key is not in the segment or expired
+        """
+        return self.get_with_ttl(key)[0]
+
+    def get_with_ttl(self, key: Any) -> Tuple[Any, Union[float, None]]:
+        """Retrieve an item stored by any process with the seconds it has
+        left to live.
+
+        Args:
+            key (Any): The key of the item to retrieve.
+
+        Returns:
+            The item and its remaining TTL (None when it never expires),
+            or (None, None) if the key is not in the segment or expired
+        """
+        if key is None:
+            return None, None
+        data, hashed, index = self._locate(key)
+        value = None
+        ttl = None
+        with self.lock:
+            self._lock_set(index, fcntl.LOCK_SH)
+            try:
+                offset = self._find(index, data, hashed)
+                if offset is not None:
+                    _, expires, _, value_size, key_size = \
+                        self.SLOT.unpack_from(self.map, offset)
+                    now = time.time()
+                    if not expires or expires > now:
+                        start = offset + self.SLOT.size + key_size
+                        value = self.map[start:start + value_size]
+                        ttl = expires - now if expires else None
+            finally:
+                self._lock_set(index, fcntl.LOCK_UN)
+        if value is None:
+            self.stats.misses += 1
+            return None, None
+        self.stats.hits += 1
+        return pickle.loads(value), ttl
+
+    def delete(self, key: Any) -> bool:
+        """Remove `key` for every process, return True if it was stored."""
+        if key is None:
+            return False
+        data, hashed, index = self._locate(key)
+        with self.lock:
+            self._lock_set(index, fcntl.LOCK_EX)
+            try:
+                offset = self._find(index, data, hashed)
+                if offset is None:
+                    return False
+                self.SLOT.pack_into(self.map, offset, 0, 0.0, 0, 0, 0)
+                self.stats.evictions[EvictionReason.EXPLICIT] += 1
+                return True
+            finally:
+                self._lock_set(index, fcntl.LOCK_UN)
+
+    def items(self):
+        """Yield the (key, item) pairs of the segment, set by set."""
+        now = time.time()
+        for index in range(self.sets):
+            entries = []
+            with self.lock:
+                self._lock_set(index, fcntl.LOCK_SH)
+                try:
+                    for way in range(self.WAYS):
+                        offset = self._slot_offset(index, way)
+                        slot_hash, expires, _, value_size, key_size = \
+                            self.SLOT.unpack_from(self.map, offset)
+                        if slot_hash and (not expires or expires > now):
+                            start = offset + self.SLOT.size
+                            end = start + key_size + value_size
+                            entries.append((key_size,
+                                            self.map[start:end]))
+                finally:
+                    self._lock_set(index, fcntl.LOCK_UN)
+            for key_size, entry in entries:
+                yield (pickle.loads(entry[:key_size]),
+                       pickle.loads(entry[key_size:]))
+
+    def __len__(self) -> int:
+        """Return the number of live entries of the segment."""
+        return sum(1 for _ in self.items())
+
+    def close(self):
+        """Unmap the segment; the entries stay for the other processes."""
+        self.map.close()
+        os.close(self.fd)
+
+    def unlink(self):
+        """Remove the file backing the segment."""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class TieredCache():
+    """TieredCache puts an in-process policy cache (L1), any BaseCaching
+    subclass, in front of a SharedMemoryTier (L2) shared by the worker
+    processes of the host.
+
+    `get` looks in L1, then in L2, copying an L2 hit into L1 for the time
+    it has left to live in L2; `put` and
+    `delete` write through both tiers. A worker only sees another
+    worker's update of a key once its own L1 copy is gone, so give the L1
+    a short `default_ttl` when that staleness matters.
+    """
+
+    def __init__(self, l1=None, l2: SharedMemoryTier = None):
+        """Initialize the tiers.
+
+        Args:
+            l1 (BaseCaching): in-process cache, defaults to an LRUCache of
+                1024 entries.
+            l2 (SharedMemoryTier): shared tier, defaults to one on
+                default_path().
+        """
+        self.l1 = l1 if l1 is not None else LRUCache(max_items=1024)
+        self.l2 = l2 if l2 is not None else SharedMemoryTier()
+
+    def put(self, key: Any, item: Any, ttl: float = None):
+        """Add an item to both tiers."""
+        if key is None or item is None:
+            return
+        self.l2.put(key, item, ttl)
+        self.l1.put(key, item, ttl)
+
+    def get(self, key: Any) -> Union[Any, None]:
+        """Retrieve an item from L1, or from L2 and keep it in L1."""
+        item = self.l1.get(key)
+        if item is None:
+            item, ttl = self.l2.get_with_ttl(key)
+            if item is not None:
+                self.l1.put(key, item, ttl)
+        return item
+
+    def delete(self, key: Any) -> bool:
+        """Remove `key` from both tiers, return True if it was in one."""
+        in_l1 = self.l1.delete(key)
+        in_l2 = self.l2.delete(key)
+        return in_l1 or in_l2
+
+    def print_cache(self):
+        """Print the entries of the shared tier sorted by key."""
+        data = dict(self.l2.items())
+        print("Current cache:")
+        for key in sorted(data.keys()):
+            print("{}: {}".format(key, data.get(key)))
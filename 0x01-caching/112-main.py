@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+""" 112-main: warm start from a cache snapshot
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+LFUCache = __import__('100-lfu_cache').LFUCache
+LRUCache = __import__('3-lru_cache').LRUCache
+TinyLFUCache = __import__('102-tinylfu_cache').TinyLFUCache
+SnapshotWriter = __import__('cache_snapshot').SnapshotWriter
+
+path = os.path.join(tempfile.gettempdir(), "112-main.snapshot")
+
+my_cache = LFUCache()
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.put("C", "Holberton", ttl=3600)
+my_cache.get("A")
+my_cache.get("A")
+my_cache.get("B")
+print(my_cache.dump_snapshot(path))
+
+# after a restart: same contents, and "C" is still the least used key
+restarted = LFUCache()
+print(restarted.load_snapshot(path))
+restarted.print_cache()
+restarted.put("D", "School")
+restarted.put("E", "Street")
+restarted.print_cache()
+
+# a big cache is usable as soon as its keys are loaded
+big = LRUCache(max_items=100000)
+big.put_many(("key-{}".format(number), {"payload": "x" * 200, "id": number})
+             for number in range(100000))
+start = time.perf_counter()
+big.dump_snapshot(path)
+dumped = time.perf_counter() - start
+
+warm = LRUCache(max_items=100000)
+start = time.perf_counter()
+warm.load_snapshot(path)
+loaded = time.perf_counter() - start
+start = time.perf_counter()
+item = warm.get("key-99999")
+first_hit = time.perf_counter() - start
+print(item["id"], warm.get("key-0") == big.get("key-0"))
+print("100000 entries: dump {:.0f} ms, load {:.0f} ms, first hit {:.3f} ms"
+      .format(dumped * 1000, loaded * 1000, first_hit * 1000))
+
+# periodic snapshots, and a last one at shutdown
+lock = threading.Lock()
+writer = SnapshotWriter(my_cache, path, interval=0.05, lock=lock)
+with lock:
+    my_cache.put("F", "Road")
+time.sleep(0.2)
+with lock:
+    my_cache.put("G", "Lane")
+writer.close()
+last = LFUCache()
+last.load_snapshot(path)
+last.print_cache()
+
+# a snapshot only fits a cache of the same capacity
+try:
+    LFUCache(max_items=8).load_snapshot(path)
+except ValueError as error:
+    print(error)
+
+# the frequency sketch is rebuilt by the process loading the snapshot,
+# whose str hashes differ
+tiny = TinyLFUCache(max_items=100)
+for number in range(100):
+    tiny.put("key-{}".format(number), number)
+    for _ in range(number % 3):
+        tiny.get("key-{}".format(number))
+tiny.dump_snapshot(path)
+code = """
+import sys
+cache = __import__('102-tinylfu_cache').TinyLFUCache(max_items=100)
+cache.load_snapshot(sys.argv[1])
+print(min(cache.sketch.frequency(key) for key in cache.cache_data))
+"""
+print(subprocess.run(
+    [sys.executable, "-c", code, path], stdout=subprocess.PIPE,
+    env=dict(os.environ, PYTHONHASHSEED="1"), universal_newlines=True,
+    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip())
+os.unlink(path)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+""" 113-main: a cache served over a Unix socket to pooled clients
+"""
+import asyncio
+import os
+import tempfile
+import threading
+
+LFUCache = __import__('100-lfu_cache').LFUCache
+CacheServer = __import__('cache_server').CacheServer
+cache_client = __import__('cache_client')
+
+path = os.path.join(tempfile.gettempdir(), "113-main.sock")
+if os.path.exists(path):
+    os.unlink(path)
+
+loop = asyncio.new_event_loop()
+ready = threading.Event()
+
+
+def run_server():
+    """Serve an LFU cache of 4 entries from a background thread."""
+    asyncio.set_event_loop(loop)
+    server = CacheServer(LFUCache())
+    loop.run_until_complete(server.start(path=path))
+    ready.set()
+    loop.run_forever()
+
+
+threading.Thread(target=run_server, daemon=True).start()
+ready.wait()
+
+client = cache_client.CacheClient(path)
+client.set("A", "Hello")
+client.set("B", b"World")
+client.set("C", "Holberton", ttl=60)
+print(client.get("A"), client.get("B"), client.get("Z"))
+print(client.get_many(["A", "B", "C", "Z"]))
+print(client.pipeline().set("D", "School").get("D").delete("A")
+      .get("A").execute())
+print(client.delete("A"))
+stats = client.stats()
+print(stats["hits"], stats["misses"], stats["size"])
+client.close()
+
+pool = cache_client.ClientPool(path, size=2)
+results = []
+
+
+def worker(number):
+    """Share the two pooled connections between eight threads."""
+    for _ in range(50):
+        pool.set(number, str(number))
+        results.append(pool.get(number) in (None, str(number).encode()))
+
+
+threads = [threading.Thread(target=worker, args=(number,))
+           for number in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(len(results), all(results))
+pool.close()
+loop.call_soon_threadsafe(loop.stop)
+os.unlink(path)
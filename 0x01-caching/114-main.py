@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+""" 114-main: repeated misses answered by a negative cache
+"""
+import sys
+import threading
+
+LRUCache = __import__('3-lru_cache').LRUCache
+ConcurrentLRUCache = __import__('101-concurrent_cache').ConcurrentLRUCache
+negative_cache = __import__('negative_cache')
+NegativeCache = negative_cache.NegativeCache
+BloomNegativeCache = negative_cache.BloomNegativeCache
+
+
+class FakeClock():
+    """A clock the script moves forward by hand."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+database = {"A": "Hello", "B": "World"}
+calls = []
+
+
+def loader(key):
+    calls.append(key)
+    return database.get(key)
+
+
+clock = FakeClock()
+my_cache = LRUCache(loader=loader,
+                    negative_cache=NegativeCache(ttl=30, clock=clock))
+for _ in range(3):
+    print(my_cache.get("A"), my_cache.get("Z"))
+print(calls)
+clock.now = 31
+print(my_cache.get("Z"), calls)
+my_cache.put("Z", "Holberton")
+my_cache.delete("Z")
+print(my_cache.get("Z"), calls)
+print(my_cache.stats_snapshot()["negative_hits"])
+
+# cache-aside callers use mark_missing and is_missing
+aside = LRUCache(negative_cache=NegativeCache())
+if aside.get("Y") is None and not aside.is_missing("Y"):
+    aside.mark_missing("Y")
+print(aside.is_missing("Y"))
+
+# 200000 missing keys: a Bloom filter against a set of exact keys
+bloom = BloomNegativeCache(capacity=20000, error_rate=0.001)
+exact = NegativeCache(ttl=3600, max_items=None)
+for number in range(200000):
+    bloom.add("missing-{}".format(number))
+    exact.add("missing-{}".format(number))
+print(all("missing-{}".format(number) in bloom
+          for number in range(0, 200000, 100)))
+false_positives = sum("present-{}".format(number) in bloom
+                      for number in range(20000))
+print("false positive rate {:.4f}".format(false_positives / 20000))
+bloom_bytes = sum(sys.getsizeof(f.bits) for f in bloom.current)
+exact_bytes = sys.getsizeof(exact.deadlines) + sum(
+    sys.getsizeof(key) + 24 for key in exact.deadlines)
+print("bloom {:.2f} MB, exact {:.1f} MB".format(
+    bloom_bytes / 1e6, exact_bytes / 1e6))
+
+# Bloom keys expire too, and discarding keys never added leaves the
+# others in place
+clock.now = 0.0
+bloom = BloomNegativeCache(capacity=1000, clock=clock)
+for number in range(1000):
+    bloom.add("missing-{}".format(number))
+for number in range(20000):
+    bloom.discard("present-{}".format(number))
+print(all("missing-{}".format(number) in bloom for number in range(1000)))
+clock.now = 121
+print("missing-0" in bloom)
+
+# without a ttl, the keys found start new generations past max_found
+forever = BloomNegativeCache(capacity=1000, ttl=None, max_found=100)
+for number in range(5000):
+    forever.add(number)
+    forever.discard(number)
+print(len(forever.found) < 100, len(forever.previous_found) <= 100)
+
+# the shards of a concurrent cache share one negative cache
+shared = NegativeCache(max_items=1000)
+sharded = ConcurrentLRUCache(shards=8, max_items=64, loader=database.get,
+                             negative_cache=shared)
+
+
+def hammer(seed):
+    for number in range(20000):
+        key = "missing-{}".format((number * seed) % 5000)
+        sharded.get(key)
+        if number % 3 == 0:
+            sharded.put(key, number)
+
+
+threads = [threading.Thread(target=hammer, args=(seed,))
+           for seed in range(1, 9)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(len(shared) <= 1000)
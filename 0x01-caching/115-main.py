@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+""" 115-main: invalidation by tag and by key prefix
+"""
+import os
+import tempfile
+import time
+
+FIFOCache = __import__('1-fifo_cache').FIFOCache
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+ShardedCache = __import__('101-concurrent_cache').ShardedCache
+TinyLFUCache = __import__('102-tinylfu_cache').TinyLFUCache
+ARCCache = __import__('103-arc_cache').ARCCache
+CLOCKCache = __import__('104-clock_cache').CLOCKCache
+SIEVECache = __import__('105-sieve_cache').SIEVECache
+
+my_cache = LRUCache(prefix_index=True)
+my_cache.put("user:1:name", "Bob", tags=["user:1"])
+my_cache.put("user:1:mail", "bob@school", tags=["user:1", "mail"])
+my_cache.put("user:2:mail", "ann@school", tags=["user:2", "mail"])
+my_cache.put("motd", "Holberton")
+print(my_cache.invalidate_tag("mail"))
+my_cache.print_cache()
+print(my_cache.invalidate_prefix("user:1:"))
+my_cache.print_cache()
+print(my_cache.invalidate_tag("user:2"), my_cache.invalidate_prefix("x"))
+
+# a repeated tag is indexed once, a str is one tag
+my_cache.put("a", 1, tags=["t", "t"])
+my_cache.put("b", 2, tags="user")
+print(my_cache.delete("a"), my_cache.tag_index.tagged("t"))
+print(my_cache.invalidate_tag("user"), "b" in my_cache.cache_data)
+
+# the index follows every eviction, whatever the policy
+policies = [FIFOCache, LIFOCache, LRUCache, MRUCache, LFUCache,
+            TinyLFUCache, ARCCache, CLOCKCache, SIEVECache]
+for policy in policies:
+    cache = policy(max_items=50, prefix_index=True)
+    for number in range(400):
+        key = "page:{}:{}".format(number % 7, number)
+        cache.put(key, number, tags=["even" if number % 2 else "odd"])
+        cache.get("page:{}:{}".format(number % 7, number // 2))
+        if number % 5 == 0:
+            cache.put_many({"bulk:{}".format(number): number},
+                           tags=["bulk"])
+    index = cache.tag_index
+    consistent = set(index.key_tags) == set(cache.cache_data) and \
+        sorted(index.prefixed("")) == sorted(cache.cache_data)
+    even = sum(1 for key in cache.cache_data
+               if key.startswith("page:") and int(key.split(":")[-1]) % 2)
+    removed = cache.invalidate_tag("even")
+    pages = sum(1 for key in cache.cache_data if key.startswith("page:3:"))
+    print(policy.__name__, consistent, removed == even,
+          cache.invalidate_prefix("page:3:") == pages,
+          len(index.key_tags) == len(cache.cache_data))
+
+# tags survive a snapshot and are split between shards
+path = os.path.join(tempfile.gettempdir(), "115-main.snapshot")
+saved = LFUCache(max_items=10)
+saved.put("A", "Hello", tags=["greeting"])
+saved.put("B", "World")
+saved.dump_snapshot(path)
+restored = LFUCache(max_items=10)
+restored.load_snapshot(path)
+print(restored.invalidate_tag("greeting"), sorted(restored.cache_data))
+os.unlink(path)
+
+sharded = ShardedCache(max_items=1000, shards=4, prefix_index=True)
+sharded.put_many({"session:{}".format(number): number
+                  for number in range(100)}, tags=["session"])
+sharded.put("config:theme", "dark")
+print(sharded.invalidate_prefix("session:1"), len(sharded))
+print(sharded.invalidate_tag("session"), len(sharded))
+
+# O(matching keys) against a scan of 200000 entries
+big = LRUCache(max_items=300000, prefix_index=True)
+big.put_many({"item:{}".format(number): number
+              for number in range(200000)})
+big.put_many({"hot:{}".format(number): number
+              for number in range(50)}, tags=["hot"])
+start = time.perf_counter()
+big.invalidate_tag("hot")
+indexed = time.perf_counter() - start
+start = time.perf_counter()
+big.delete_many([key for key in big.cache_data if key.startswith("hot:")])
+scanned = time.perf_counter() - start
+print("index faster than a scan:", indexed < scanned,
+      len(big.cache_data))
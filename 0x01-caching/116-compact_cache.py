@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Compact caching policies for caches of millions of entries"""
+
+from array import array
+
+from base_caching import BaseCaching
+from slot_list import SlotList, SlotTable
+
+LIFOCache = __import__('2-lifo_cache').LIFOCache
+LRUCache = __import__('3-lru_cache').LRUCache
+MRUCache = __import__('4-mru_cache').MRUCache
+
+
+class CompactLIFOCache(LIFOCache):
+    """CompactLIFOCache is a LIFOCache whose key order is a SlotList.
+
+    The OrderedDict of LIFOCache costs about 90 bytes per key, a hash
+    table entry and a linked node; the SlotList packs the keys and their
+    links in arrays for about 30 bytes, in exchange for slower lookups
+    done in Python.
+    """
+
+    def __init__(self, **kwargs):
+        """Initialize the CompactLIFOCache instance."""
+        super().__init__(**kwargs)
+        self.keys_order = SlotList(self.max_items)
+
+    def _on_insert(self, key: str):
+        """Record a new key as the last one put in the cache."""
+        self.keys_order.append(key)
+
+    def _on_insert_many(self, keys: list):
+        """Record new keys as the last ones put in the cache, in order."""
+        self.keys_order.extend(keys)
+
+    def _on_remove(self, key: str):
+        """Forget a key that left the cache."""
+        self.keys_order.remove(key)
+
+    def _on_remove_many(self, keys: list):
+        """Forget keys that left the cache."""
+        remove = self.keys_order.remove
+        for key in keys:
+            remove(key)
+
+
+class CompactLRUCache(LRUCache):
+    """CompactLRUCache is a LRUCache whose key order is a SlotList, see
+    CompactLIFOCache."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.key_order = SlotList(self.max_items)
+
+    def _on_insert(self, key: str):
+        """Record a new key as the most recently used one."""
+        self.key_order.append(key)
+
+    def _on_insert_many(self, keys: list):
+        """Record new keys as the most recently used ones, in order."""
+        self.key_order.extend(keys)
+
+    def _on_remove(self, key: str):
+        """Forget a key that left the cache."""
+        self.key_order.remove(key)
+
+    def _on_remove_many(self, keys: list):
+        """Forget keys that left the cache."""
+        remove = self.key_order.remove
+        for key in keys:
+            remove(key)
+
+
+class CompactMRUCache(MRUCache):
+    """CompactMRUCache is a MRUCache whose key order is a SlotList, see
+    CompactLIFOCache."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.key_order = SlotList(self.max_items)
+
+    def _on_insert(self, key: str):
+        """Record a new key as the most recently used one."""
+        self.key_order.append(key)
+
+    def _on_insert_many(self, keys: list):
+        """Record new keys as the most recently used ones, in order."""
+        self.key_order.extend(keys)
+
+    def _on_remove(self, key: str):
+        """Forget a key that left the cache."""
+        self.key_order.remove(key)
+
+    def _on_remove_many(self, keys: list):
+        """Forget keys that left the cache."""
+        remove = self.key_order.remove
+        for key in keys:
+            remove(key)
+
+
+class CompactLFUCache(BaseCaching):
+    """CompactLFUCache evicts like LFUCache (lowest frequency first, then
+    least recently used, with optional aging) from parallel arrays.
+
+    Each key has a slot of a SlotTable, and at that slot its frequency in
+    `counts` and its neighbours inside its frequency bucket in `older` and
+    `newer`. A bucket is just the first and last slot of its chain, so the
+    dictionary of frequencies and the OrderedDict buckets of LFUCache are
+    replaced by about 40 bytes of arrays per key. Like in LFUCache,
+    `min_frequency` is None until needed once its bucket emptied.
+    """
+
+    def __init__(self, aging_interval: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.table = SlotTable(self.max_items)
+        self.counts = array("I")
+        self.older = array("i")
+        self.newer = array("i")
+        # frequency -> [first slot, last slot] of its chain
+        self.buckets = {}
+        self.min_frequency = 0
+        self.aging_interval = aging_interval
+        self.operations = 0
+        self._grow()
+
+    def _grow(self):
+        """Extend the arrays to the slots of the table."""
+        size = len(self.table.keys) - len(self.counts)
+        self.counts.extend([0] * size)
+        self.older.extend([-1] * size)
+        self.newer.extend([-1] * size)
+
+    def _link(self, slot: int, frequency: int):
+        """Append a slot to the chain of `frequency`."""
+        self.counts[slot] = frequency
+        self.newer[slot] = -1
+        ends = self.buckets.get(frequency)
+        if ends is None:
+            self.older[slot] = -1
+            self.buckets[frequency] = [slot, slot]
+        else:
+            self.older[slot] = ends[1]
+            self.newer[ends[1]] = slot
+            ends[1] = slot
+
+    def _unlink(self, slot: int):
+        """Take a slot out of its chain, dropping the emptied bucket."""
+        frequency = self.counts[slot]
+        older, newer = self.older[slot], self.newer[slot]
+        ends = self.buckets[frequency]
+        if older == -1:
+            ends[0] = newer
+        else:
+            self.newer[older] = newer
+        if newer == -1:
+            ends[1] = older
+        else:
+            self.older[newer] = older
+        if ends[0] == -1:
+            del self.buckets[frequency]
+            return True
+        return False
+
+    def _add(self, key: str):
+        """Give a new key a free slot with a frequency of 1."""
+        slot = self.table.assign(key)
+        if slot >= len(self.counts):
+            self._grow()
+        self._link(slot, 1)
+        self.min_frequency = 1
+
+    def _on_insert(self, key: str):
+        """Add a new key with a frequency of 1."""
+        self._tick()
+        self._add(key)
+
+    def _on_insert_many(self, keys: list):
+        """Add new keys with a frequency of 1."""
+        add = self._add
+        for key in keys:
+            add(key)
+        if self.aging_interval:
+            self.operations += len(keys) - 1
+            self._tick()
+
+    def _on_access_many(self, keys: list):
+        """Count a cache hit of get_many as a use of each key."""
+        touch = self._touch
+        for key in keys:
+            touch(key)
+        if self.aging_interval:
+            self.operations += len(keys) - 1
+            self._tick()
+
+    def _on_update(self, key: str):
+        """Count an update as a use of the key."""
+        self._tick()
+        self._touch(key)
+
+    def _on_access(self, key: str):
+        """Count a cache hit as a use of the key."""
+        self._tick()
+        self._touch(key)
+
+    def _on_remove(self, key: str):
+        """Forget a key that left the cache and free its slot."""
+        slot = self.table.release(key)
+        frequency = self.counts[slot]
+        if self._unlink(slot) and self.min_frequency == frequency:
+            self.min_frequency = None
+
+    def _victim(self) -> str:
+        """Return the least recently used key of the lowest frequency."""
+        if self.min_frequency is None:
+            self.min_frequency = min(self.buckets)
+        return self.table.keys[self.buckets[self.min_frequency][0]]
+
+    def _victims(self, count: int) -> list:
+        """Return the `count` next keys to evict, lowest frequency first
+        and least recently used first within a frequency."""
+        victims = []
+        keys, newer = self.table.keys, self.newer
+        for frequency in sorted(self.buckets):
+            slot = self.buckets[frequency][0]
+            while slot != -1:
+                victims.append(keys[slot])
+                if len(victims) == count:
+                    return victims
+                slot = newer[slot]
+        return victims
+
+    def _touch(self, key: str):
+        """Move a key to the end of the next frequency chain."""
+        slot = self.table.find(key)
+        frequency = self.counts[slot]
+        if self._unlink(slot) and self.min_frequency == frequency:
+            self.min_frequency = frequency + 1
+        self._link(slot, frequency + 1)
+
+    def _tick(self):
+        """Count an operation and age the frequencies when due."""
+        if not self.aging_interval:
+            return
+        self.operations += 1
+        if self.operations >= self.aging_interval:
+            self.operations = 0
+            self._age()
+
+    def _age(self):
+        """Halve every frequency (never below 1), see LFUCache._age."""
+        chains = []
+        newer = self.newer
+        for frequency in sorted(self.buckets):
+            slot = self.buckets[frequency][0]
+            while slot != -1:
+                chains.append((slot, max(1, frequency // 2)))
+                slot = newer[slot]
+        self.buckets = {}
+        for slot, aged in chains:
+            self._link(slot, aged)
+        # the chains were collected lowest frequency first
+        self.min_frequency = chains[0][1] if chains else 0
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+""" 116-main: compact policies evict like the originals in less memory
+"""
+import random
+
+compact_cache = __import__('116-compact_cache')
+entry_memory = __import__('cache_bench').entry_memory
+print_discard = __import__('eviction_listeners').print_discard
+
+my_cache = compact_cache.CompactLRUCache(listeners=[print_discard])
+my_cache.put("A", "Hello")
+my_cache.put("B", "World")
+my_cache.put("C", "Holberton")
+my_cache.put("D", "School")
+print(my_cache.get("A"))
+my_cache.put("E", "Battery")
+my_cache.print_cache()
+
+pairs = [
+    (__import__('2-lifo_cache').LIFOCache, compact_cache.CompactLIFOCache),
+    (__import__('3-lru_cache').LRUCache, compact_cache.CompactLRUCache),
+    (__import__('4-mru_cache').MRUCache, compact_cache.CompactMRUCache),
+    (__import__('100-lfu_cache').LFUCache, compact_cache.CompactLFUCache),
+]
+
+
+def replay(cache):
+    """Replay the same random workload, return the evicted keys."""
+    evicted = []
+    cache.add_listener(lambda key, item, reason: evicted.append(key))
+    rnd = random.Random(0)
+    for step in range(20000):
+        key = rnd.randrange(300)
+        if step % 7 == 0:
+            cache.put_many({rnd.randrange(300): step for _ in range(5)})
+        elif step % 11 == 0:
+            cache.delete(key)
+        elif cache.get(key) is None:
+            cache.put("s{}".format(key) if key % 2 else key, step)
+    return evicted
+
+
+for policy, compact in pairs:
+    same = replay(policy(max_items=100)) == replay(compact(max_items=100))
+    print("{} evicts like {}: {}".format(
+        compact.__name__, policy.__name__, same))
+
+# ./cache_bench.py --entry-memory all reports 10^6 entries
+for policy, compact in pairs:
+    print("{} {:.0f} bytes per entry, {} {:.0f}".format(
+        policy.__name__, entry_memory(policy, 100000),
+        compact.__name__, entry_memory(compact, 100000)))
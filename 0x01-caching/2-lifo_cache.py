@@ -2,46 +2,45 @@
 """LIFO caching policy"""
 
 from base_caching import BaseCaching
-from typing import Any
+from collections import OrderedDict
+from itertools import islice
 
 
 class LIFOCache(BaseCaching):
     """LIFOCache class inherits from BaseCaching
     and implements a LIFO caching system"""
-    def __init__(self):
+    def __init__(self, **kwargs):
         """Initialize the LIFOCache instance."""
-        super().__init__()
-        self.keys_order = []
-
-    def put(self, key: str, item: Any):
-        """ Add an item to the cache with LIFO policy
-
-        Args:
-            key (str): The key under which the item is stored.
-            item (Any): The item to store in the cache.
-        """
-        if key and item:
-            if key in self.cache_data:
-                # If key already exists, update
-                # its value and move it to the end
-                self.keys_order.remove(key)
-            elif len(self.cache_data) >= self.MAX_ITEMS:
-                # Remove the last added key from the ordered list
-                last_key = self.keys_order.pop(-1)
-                self.cache_data.pop(last_key)
-                print(f"DISCARD: {last_key}")
-
-            # Add the new key-value pair
-            self.cache_data[key] = item
-            self.keys_order.append(key)
-
-    def get(self, key):
-        """Retrieve an item from the cache by key.
-
-        Args:
-            key (str): The key of the item to retrieve.
-
-        Returns:
-            The cached item, or None if the key is not in the cache or is None
-        """
-        return self.cache_data.get(key, None)
+        super().__init__(**kwargs)
+        # keys in the order they were last put in the cache
+        self.keys_order = OrderedDict()
+
+    def _on_insert(self, key: str):
+        """Record a new key as the last one put in the cache."""
+        self.keys_order[key] = None
+
+    def _on_update(self, key: str):
+        """An updated key becomes the last one put in the cache."""
+        self.keys_order.move_to_end(key)
+
+    def _on_insert_many(self, keys: list):
+        """Record new keys as the last ones put in the cache, in order."""
+        self.keys_order.update(dict.fromkeys(keys))
+
+    def _on_remove(self, key: str):
+        """Forget a key that left the cache."""
+        del self.keys_order[key]
+
+    def _on_remove_many(self, keys: list):
+        """Forget keys that left the cache."""
+        order = self.keys_order
+        for key in keys:
+            del order[key]
+
+    def _victim(self) -> str:
+        """Return the last key put in the cache (LIFO policy)."""
+        return next(reversed(self.keys_order))
+
+    def _victims(self, count: int) -> list:
+        """Return the `count` last keys put in the cache."""
+        return list(islice(reversed(self.keys_order), count))
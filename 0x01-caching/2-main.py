@@ -1,8 +1,9 @@
 #!/usr/bin/python3
 """ 2-main """
 LIFOCache = __import__('2-lifo_cache').LIFOCache
+print_discard = __import__('eviction_listeners').print_discard
 
-my_cache = LIFOCache()
+my_cache = LIFOCache(listeners=[print_discard])
 my_cache.put("A", "Hello")
 my_cache.put("B", "World")
 my_cache.put("C", "Holberton")
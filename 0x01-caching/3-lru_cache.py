@@ -2,48 +2,56 @@
 """LRU caching policy"""
 
 from base_caching import BaseCaching
-from typing import Union, Any
+from collections import OrderedDict
+from itertools import islice
 
 
 class LRUCache(BaseCaching):
     """LRUCache inherits from BaseCaching
-    and implements a LRu caching system"""
-
-    def __init__(self):
-        super().__init__()
-        self.key_order = []
-
-    def put(self, key: str, item: Any):
-        """ Add an item to the cache with LRU policy
-
-        Args:
-            key (str): The key under which the item is stored.
-            item (Any): The item to store in the cache.
-        """
-        if key and item:
-            # check if key exist in key_order
-            if key in self.key_order:
-                # remove key from key _order
-                self.key_order.remove(key)
-            elif len(self.cache_data) >= self.MAX_ITEMS:
-                # if cache is full free memory
-                lru_key = self.key_order.pop(0)
-                print(f"DISCARD: {lru_key}")
-                self.cache_data.pop(lru_key)
-            self.cache_data[key] = item
-            self.key_order.append(key)
-
-    def get(self, key: str) -> Union[Any, None]:
-        """Retrieve an item from the cache by key.
-
-        Args:
-            key (str): The key of the item to retrieve.
-
-        Returns:
-            The cached item, or None if the key is not in the cache or is None
-        """
-        if key in self.cache_data:
-            self.key_order.remove(key)
-            self.key_order.append(key)
-            return self.cache_data[key]
-        return None
+    and implements a LRU caching system"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # keys ordered from least to most recently used; an OrderedDict
+        # keeps reordering and eviction O(1) instead of list.remove()
+        self.key_order = OrderedDict()
+
+    def _on_insert(self, key: str):
+        """Record a new key as the most recently used one."""
+        self.key_order[key] = None
+
+    def _on_update(self, key: str):
+        """Mark an updated key as the most recently used one."""
+        self.key_order.move_to_end(key)
+
+    def _on_access(self, key: str):
+        """Mark a key read by a cache hit as the most recently used one."""
+        self.key_order.move_to_end(key)
+
+    def _on_insert_many(self, keys: list):
+        """Record new keys as the most recently used ones, in order."""
+        self.key_order.update(dict.fromkeys(keys))
+
+    def _on_access_many(self, keys: list):
+        """Mark keys read by get_many as the most recently used ones."""
+        move_to_end = self.key_order.move_to_end
+        for key in keys:
+            move_to_end(key)
+
+    def _on_remove(self, key: str):
+        """Forget a key that left the cache."""
+        del self.key_order[key]
+
+    def _on_remove_many(self, keys: list):
+        """Forget keys that left the cache."""
+        order = self.key_order
+        for key in keys:
+            del order[key]
+
+    def _victim(self) -> str:
+        """Return the least recently used key (LRU policy)."""
+        return next(iter(self.key_order))
+
+    def _victims(self, count: int) -> list:
+        """Return the `count` least recently used keys."""
+        return list(islice(self.key_order, count))
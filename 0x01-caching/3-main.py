@@ -1,8 +1,9 @@
 #!/usr/bin/python3
 """ 3-main """
 LRUCache = __import__('3-lru_cache').LRUCache
+print_discard = __import__('eviction_listeners').print_discard
 
-my_cache = LRUCache()
+my_cache = LRUCache(listeners=[print_discard])
 my_cache.put("A", "Hello")
 my_cache.put("B", "World")
 my_cache.put("C", "Holberton")
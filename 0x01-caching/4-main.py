@@ -1,8 +1,9 @@
 #!/usr/bin/python3
 """ 4-main """
 MRUCache = __import__('4-mru_cache').MRUCache
+print_discard = __import__('eviction_listeners').print_discard
 
-my_cache = MRUCache()
+my_cache = MRUCache(listeners=[print_discard])
 my_cache.put("A", "Hello")
 my_cache.put("B", "World")
 my_cache.put("C", "Holberton")
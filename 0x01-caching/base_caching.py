@@ -1,35 +1,695 @@
 #!/usr/bin/python3
 """ BaseCaching module
 """
+import sys
+import time
+from time import perf_counter_ns
+
+from cache_snapshot import Encoded, decoded
+import cache_snapshot
+from cache_stats import CacheStats
+from eviction_listeners import EvictionReason
+from tag_index import TagIndex
+from timer_wheel import TimerWheel
+from write_behind import WriteBehindQueue
+
+
+def default_weigher(key, item):
+    """ Estimate the memory held by an entry as the shallow size of its
+    key plus the shallow size of its item
+    """
+    return sys.getsizeof(key) + sys.getsizeof(item)
 
 
 class BaseCaching():
     """ BaseCaching defines:
       - constants of your caching system
       - where your data are stored (in a dictionary)
+      - the put/get flow shared by every caching policy
+
+    A policy only keeps its own bookkeeping through the hooks
+    `_on_insert`, `_on_update`, `_on_access`, `_on_miss` and `_on_remove`,
+    and names the next entry to discard in `_victim`. The capacity, either
+    a number of entries or a byte budget measured by a weigher, is enforced
+    here so it works the same way for every policy.
+
+    Entries can also expire after a time-to-live, given per `put` or as a
+    default for the cache. Expired entries are never returned by `get`
+    and are removed by a timer wheel in amortized O(1) instead of a scan
+    of `cache_data`.
+
+    Every entry leaving the cache, or whose item is overwritten, is
+    reported to the eviction listeners as listener(key, item, reason)
+    with an `EvictionReason`. There are no listeners by default.
+
+    Unless built with `stats=False`, a cache counts its hits, misses,
+    inserts, updates and evictions and the latency of `get` and `put` in
+    `self.stats`, see `stats_snapshot` and `stats_exposition`.
+
+    A cache built with a `loader` is read-through: a miss of `get` calls
+    loader(key) and caches its item, and `get_many` fills all its misses
+    with one call of `batch_loader(keys)`. A cache built with a `writer`
+    is write-behind: the items put are queued and handed to writer(batch)
+    by a background thread, see `WriteBehindQueue`; deleting a key drops
+    its queued write, while the writes of invalidated, evicted and
+    expired entries are still made. A `negative_cache`
+    (see `negative_cache`) remembers the keys the loaders did not find, so
+    repeated misses on them are answered without calling the loaders;
+    without loaders, use `mark_missing` and `is_missing` around the
+    backend lookups.
+
+    `get_many`, `put_many` and `delete_many` work on many keys at once:
+    expired entries are collected once, the policy bookkeeping of the
+    batch is done in one pass by `_on_insert_many` and `_on_access_many`,
+    and all the room a batch of new keys needs is made in one eviction
+    sweep. A policy whose victim depends on the key being inserted sets
+    `BULK_EVICTION` to False and gets its batches put key by key.
+
+    Entries can be put with tags, and `invalidate_tag` removes all the
+    entries of a tag; with `prefix_index`, `invalidate_prefix` removes all
+    the str keys starting with a prefix. Both find the keys in a
+    `TagIndex` kept up to date on every insertion and removal, whatever
+    the policy, so they cost O(matching keys) instead of a scan.
+
+    `dump_snapshot` saves the entries and the policy state to a file that
+    `load_snapshot` maps back in memory on startup; loaded items are only
+    unpickled on their first hit, see `cache_snapshot`.
     """
     MAX_ITEMS = 4
+    BULK_EVICTION = True
+    # set by BaseCaching itself, the other attributes are policy state
+    BASE_ATTRIBUTES = frozenset((
+        "cache_data", "max_items", "max_bytes", "weigher", "current_bytes",
+        "weights", "default_ttl", "clock", "expires", "timer_wheel",
+        "listeners", "stats", "loader", "batch_loader", "write_behind",
+        "negative_cache", "tag_index"))
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, weigher=None,
+                 default_ttl=None, clock=None, ttl_resolution=1.0,
+                 listeners=None, stats=True, loader=None, batch_loader=None,
+                 writer=None, write_batch_size=100, write_interval=1.0,
+                 negative_cache=None, prefix_index=False):
         """ Initiliaze
+
+        Args:
+            max_items (int): maximum number of entries of this instance,
+                defaults to MAX_ITEMS.
+            max_bytes (int): optional memory budget for the entries.
+            weigher (callable): weigher(key, item) returning the size of
+                an entry in bytes, defaults to `default_weigher`.
+            default_ttl (float): seconds an entry lives when `put` is not
+                given a ttl, entries never expire by default.
+            clock (callable): returns the current time in seconds,
+                defaults to `time.monotonic`.
+            ttl_resolution (float): tick of the expiration timer wheel.
+            listeners (list): callables notified of every eviction.
+            stats (bool): keep the counters and latency histograms.
+            loader (callable): loader(key) returning the item of a key
+                missing from the cache, or None.
+            batch_loader (callable): batch_loader(keys) returning a
+                dictionary of the items found for `keys`.
+            writer (callable): writer(batch) storing a dictionary of the
+                items put in the cache, called in the background.
+            write_batch_size (int): dirty keys that trigger a write.
+            write_interval (float): seconds between two writes.
+            negative_cache: NegativeCache or BloomNegativeCache of the
+                keys known to be missing from the backend.
+            prefix_index (bool): index the str keys for
+                `invalidate_prefix`.
         """
         self.cache_data = {}
+        self.max_items = self.MAX_ITEMS if max_items is None else max_items
+        self.max_bytes = max_bytes
+        self.weigher = weigher or default_weigher
+        self.current_bytes = 0
+        self.weights = {}
+        self.default_ttl = default_ttl
+        self.clock = clock or time.monotonic
+        self.expires = {}
+        self.timer_wheel = TimerWheel(ttl_resolution, self.clock())
+        self.listeners = list(listeners or ())
+        self.stats = CacheStats() if stats else None
+        self.loader = loader
+        self.batch_loader = batch_loader
+        self.write_behind = None
+        if writer is not None:
+            self.write_behind = WriteBehindQueue(
+                writer, write_batch_size, write_interval)
+        self.negative_cache = negative_cache
+        self.tag_index = TagIndex(prefix_index)
 
     def print_cache(self):
         """ Print the cache
         """
+        if self.expires:
+            self._expire()
         print("Current cache:")
         for key in sorted(self.cache_data.keys()):
-            print("{}: {}".format(key, self.cache_data.get(key)))
+            print("{}: {}".format(key, decoded(self.cache_data.get(key))))
+
+    def put(self, key, item, ttl=None, tags=None):
+        """ Add an item in the cache, discarding the entries chosen by
+        the policy while the cache is over its capacity
 
-    def put(self, key, item):
-        """ Add an item in the cache
+        `ttl` is the number of seconds the entry lives, it defaults to
+        `default_ttl`. `tags` replace the tags of the entry, see
+        `invalidate_tag`.
         """
-        raise NotImplementedError(
-            "put must be implemented in your cache class")
+        stats = self.stats
+        if stats is None or stats.skip_sample():
+            self._put(key, item, ttl, tags=tags)
+            return
+        start = perf_counter_ns()
+        self._put(key, item, ttl, tags=tags)
+        stats.put_latency.record(perf_counter_ns() - start)
 
     def get(self, key):
         """ Get an item by key
         """
+        stats = self.stats
+        if stats is None or stats.skip_sample():
+            item = self._get(key)
+        else:
+            start = perf_counter_ns()
+            item = self._get(key)
+            stats.get_latency.record(perf_counter_ns() - start)
+        if item is None and self.loader is not None and key is not None:
+            item = self._load(key)
+        return item
+
+    def get_many(self, keys):
+        """ Return a dictionary of the items found for `keys`
+
+        With loaders, the missing keys are fetched with one call of the
+        batch loader (or with the loader, key by key, when there is no
+        batch loader) and cached.
+        """
+        keys = [key for key in dict.fromkeys(keys) if key is not None]
+        if self.expires:
+            self._expire_many(keys)
+        data = self.cache_data
+        found = {}
+        missing = []
+        for key in keys:
+            item = data.get(key)
+            if item is None:
+                missing.append(key)
+            elif type(item) is Encoded:
+                found[key] = data[key] = item.decode()
+            else:
+                found[key] = item
+        if self.stats is not None:
+            self.stats.hits += len(found)
+            self.stats.misses += len(missing)
+        if found:
+            self._on_access_many(list(found))
+        for key in missing:
+            self._on_miss(key)
+        negative = self.negative_cache
+        if negative is not None and self.batch_loader is not None:
+            known = [key for key in missing if key in negative]
+            if known:
+                if self.stats is not None:
+                    self.stats.negative_hits += len(known)
+                missing = [key for key in missing if key not in negative]
+        if not missing:
+            return found
+        if self.batch_loader is not None:
+            loaded = {key: item for key, item in
+                      (self.batch_loader(missing) or {}).items()
+                      if item is not None}
+            self._put_many(loaded, None, dirty=False)
+            found.update(loaded)
+            if negative is not None:
+                for key in missing:
+                    if key not in loaded:
+                        negative.add(key)
+        elif self.loader is not None:
+            for key in missing:
+                item = self._load(key)
+                if item is not None:
+                    found[key] = item
+        return found
+
+    def put_many(self, items, ttl=None, tags=None):
+        """ Add many items in the cache, from a dictionary or an iterable
+        of (key, item) pairs, with the same `ttl` and `tags`
+
+        The batch is admitted as a whole: the room for all its new keys is
+        made before they are inserted, so the policy never discards one of
+        them for another. A batch larger than the cache keeps its last
+        keys.
+        """
+        batch = {key: item for key, item in dict(items).items()
+                 if key is not None and item is not None}
+        if batch:
+            self._put_many(batch, ttl, tags=tags)
+
+    def invalidate_tag(self, tag):
+        """ Remove the entries put with `tag`, return how many there were
+        """
+        keys = self.tag_index.tagged(tag)
+        if keys:
+            self._remove_many(keys, EvictionReason.EXPLICIT)
+        return len(keys)
+
+    def invalidate_prefix(self, prefix):
+        """ Remove the entries whose str key starts with `prefix`, return
+        how many there were; the cache must be built with `prefix_index`
+        """
+        keys = self.tag_index.prefixed(prefix)
+        if keys:
+            self._remove_many(keys, EvictionReason.EXPLICIT)
+        return len(keys)
+
+    def delete_many(self, keys):
+        """ Remove many entries, return the number of keys that were in
+        the cache
+        """
+        keys = [key for key in dict.fromkeys(keys) if key is not None]
+        if self.expires:
+            self._expire_many(keys)
+        data = self.cache_data
+        deleted = [key for key in keys if key in data]
+        for key in deleted:
+            self._remove(key, EvictionReason.EXPLICIT)
+        if deleted and self.write_behind is not None:
+            self.write_behind.discard_many(deleted)
+        return len(deleted)
+
+    def flush(self):
+        """ Hand the pending write-behind entries to the writer now
+        """
+        if self.write_behind is not None:
+            self.write_behind.flush()
+
+    def close(self):
+        """ Write the pending entries and stop the write-behind thread
+        """
+        if self.write_behind is not None:
+            self.write_behind.close()
+
+    def mark_missing(self, key):
+        """ Remember in the negative cache that the backend has no `key`
+        """
+        if self.negative_cache is not None and key is not None:
+            self.negative_cache.add(key)
+
+    def is_missing(self, key):
+        """ Tell whether the negative cache knows `key` is missing
+        """
+        if self.negative_cache is None or key not in self.negative_cache:
+            return False
+        if self.stats is not None:
+            self.stats.negative_hits += 1
+        return True
+
+    def _load(self, key):
+        """ Fetch a missing item with the loader and cache it, unless the
+        negative cache knows it is missing
+        """
+        if self.is_missing(key):
+            return None
+        item = self.loader(key)
+        if item is not None:
+            self._put(key, item, None, dirty=False)
+        else:
+            self.mark_missing(key)
+        return item
+
+    def _put(self, key, item, ttl, dirty=True, tags=None):
+        """ Store an item, see `put`; `dirty` is False for the items that
+        come from the loaders and must not be written back
+        """
+        if key is None or item is None:
+            return
+        if dirty and self.write_behind is not None:
+            self.write_behind.mark(key, item)
+        if self.negative_cache is not None:
+            self.negative_cache.discard(key)
+        if self.expires:
+            self._expire(key)
+
+        weight = self._weigh(key, item)
+        if key in self.cache_data:
+            self._replace(key, item, weight, ttl, tags)
+            # a bigger value may push the cache over its byte budget
+            while self.max_bytes is not None and \
+                    self.current_bytes > self.max_bytes:
+                self._evict(self._victim())
+            return
+
+        if self.max_bytes is not None and weight > self.max_bytes:
+            # the entry can never fit, don't flush the cache for it
+            return
+        while self.cache_data and self._is_full(weight):
+            self._evict(self._victim())
+        self.cache_data[key] = item
+        self._on_insert(key)
+        if self.stats is not None:
+            self.stats.inserts += 1
+        self._charge(key, weight)
+        self._set_ttl(key, ttl)
+        if tags or self.tag_index:
+            self.tag_index.add(key, tags)
+
+    def _put_many(self, batch, ttl, dirty=True, tags=None):
+        """ Store a dictionary of items, see `put_many`
+        """
+        if not self.BULK_EVICTION:
+            for key, item in batch.items():
+                self._put(key, item, ttl, dirty, tags)
+            return
+        if dirty and self.write_behind is not None:
+            self.write_behind.mark_many(batch)
+        if self.negative_cache is not None:
+            for key in batch:
+                self.negative_cache.discard(key)
+        if self.expires:
+            self._expire_many(batch)
+
+        data = self.cache_data
+        max_bytes = self.max_bytes
+        new = {}
+        weights = {}
+        for key, item in batch.items():
+            if key in data:
+                self._replace(key, item, self._weigh(key, item), ttl, tags)
+            elif max_bytes is None:
+                new[key] = item
+            else:
+                weight = self.weigher(key, item)
+                if weight <= max_bytes:
+                    new[key] = item
+                    weights[key] = weight
+
+        # only the last keys of a batch larger than the cache can stay
+        if self.max_items is not None and len(new) > self.max_items:
+            for key in list(new)[:len(new) - self.max_items]:
+                del new[key]
+        new_bytes = sum(weights[key] for key in new) if weights else 0
+        if max_bytes is not None and new_bytes > max_bytes:
+            for key in list(new):
+                del new[key]
+                new_bytes -= weights[key]
+                if new_bytes <= max_bytes:
+                    break
+
+        # one sweep makes room for the whole batch
+        if self.max_items is not None:
+            excess = len(data) + len(new) - self.max_items
+            if excess > 0:
+                victims = self._victims(excess)
+                if victims is None:
+                    for _ in range(excess):
+                        self._evict(self._victim())
+                else:
+                    self._remove_many(victims, EvictionReason.CAPACITY)
+        if max_bytes is not None:
+            while data and self.current_bytes + new_bytes > max_bytes:
+                self._evict(self._victim())
+        if not new:
+            return
+        data.update(new)
+        self._on_insert_many(list(new))
+        if self.stats is not None:
+            self.stats.inserts += len(new)
+        if self.max_bytes is not None:
+            self.current_bytes += new_bytes
+            self.weights.update((key, weights[key]) for key in new)
+        if ttl is not None or self.default_ttl is not None:
+            for key in new:
+                self._set_ttl(key, ttl)
+        if tags or self.tag_index:
+            for key in new:
+                self.tag_index.add(key, tags)
+
+    def _replace(self, key, item, weight, ttl, tags=None):
+        """ Overwrite the item of a cached key
+        """
+        if self.stats is not None:
+            self.stats.evictions[EvictionReason.REPLACED] += 1
+        if self.listeners:
+            self._notify(key, decoded(self.cache_data[key]),
+                         EvictionReason.REPLACED)
+        self.cache_data[key] = item
+        self._on_update(key)
+        if self.stats is not None:
+            self.stats.updates += 1
+        self._charge(key, weight)
+        self._set_ttl(key, ttl)
+        if tags or self.tag_index:
+            self.tag_index.add(key, tags)
+
+    def _get(self, key):
+        """ Look an item up, see `get`
+        """
+        if key is None:
+            return None
+        if self.expires:
+            self._expire(key)
+        if key not in self.cache_data:
+            if self.stats is not None:
+                self.stats.misses += 1
+            self._on_miss(key)
+            return None
+        if self.stats is not None:
+            self.stats.hits += 1
+        self._on_access(key)
+        item = self.cache_data[key]
+        if type(item) is Encoded:
+            item = self.cache_data[key] = item.decode()
+        return item
+
+    def delete(self, key):
+        """ Remove an entry, return True if `key` was in the cache
+        """
+        if self.expires:
+            self._expire(key)
+        if key is None or key not in self.cache_data:
+            return False
+        self._remove(key, EvictionReason.EXPLICIT)
+        if self.write_behind is not None:
+            self.write_behind.discard(key)
+        return True
+
+    def add_listener(self, listener):
+        """ Notify `listener(key, item, reason)` of every eviction
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """ Stop notifying `listener`
+        """
+        self.listeners.remove(listener)
+
+    def stats_snapshot(self, reset=False):
+        """ Return the statistics of the cache as a dictionary, including
+        its current size and bytes, and optionally reset the counters;
+        the cache must not be built with `stats=False`
+        """
+        self._check_stats()
+        return self.stats.snapshot(reset, size=len(self.cache_data),
+                                   bytes=self.current_bytes)
+
+    def stats_exposition(self, prefix="cache"):
+        """ Return the statistics in the Prometheus text format, labelled
+        with the name of the cache class
+        """
+        self._check_stats()
+        return self.stats.exposition(
+            prefix, {"cache": type(self).__name__},
+            size=len(self.cache_data), bytes=self.current_bytes)
+
+    def dump_snapshot(self, path):
+        """ Save the entries, their time-to-live and the policy state to
+        `path`, return the number of entries saved
+        """
+        return cache_snapshot.dump(self, path)
+
+    def load_snapshot(self, path):
+        """ Fill this empty cache from a snapshot of a cache of the same
+        class and capacity, return the number of entries loaded
+        """
+        return cache_snapshot.load(self, path)
+
+    def _check_stats(self):
+        """ Raise ValueError when the cache keeps no statistics
+        """
+        if self.stats is None:
+            raise ValueError("the cache was built with stats=False")
+
+    def _is_full(self, weight=0, count=1):
+        """ Tell whether `count` entries of `weight` bytes in all need
+        room to be made
+        """
+        if self.max_items is not None and \
+                len(self.cache_data) + count > self.max_items:
+            return True
+        return self.max_bytes is not None and \
+            self.current_bytes + weight > self.max_bytes
+
+    def _weigh(self, key, item):
+        """ Size of an entry, only measured when a byte budget is set
+        """
+        if self.max_bytes is None:
+            return 0
+        return self.weigher(key, item)
+
+    def _charge(self, key, weight):
+        """ Record the size of an entry in the byte budget
+        """
+        if self.max_bytes is None:
+            return
+        self.current_bytes += weight - self.weights.get(key, 0)
+        self.weights[key] = weight
+
+    def _set_ttl(self, key, ttl):
+        """ Schedule the expiration of an entry
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        if ttl is None:
+            if self.expires.pop(key, None) is not None:
+                self.timer_wheel.cancel(key)
+            return
+        deadline = self.clock() + ttl
+        self.expires[key] = deadline
+        self.timer_wheel.schedule(key, deadline)
+
+    def _expire(self, key=None):
+        """ Remove the entries whose timer fired, and `key` if its ttl is
+        over even though the wheel has not reached its tick yet
+        """
+        now = self.clock()
+        for expired in self.timer_wheel.advance(now):
+            self._remove(expired, EvictionReason.EXPIRED)
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= now:
+            self._remove(key, EvictionReason.EXPIRED)
+
+    def _expire_many(self, keys):
+        """ Remove the entries whose timer fired, and those of `keys`
+        whose ttl is over, checking the clock once
+        """
+        now = self.clock()
+        for expired in self.timer_wheel.advance(now):
+            self._remove(expired, EvictionReason.EXPIRED)
+        expires = self.expires
+        for key in keys:
+            deadline = expires.get(key)
+            if deadline is not None and deadline <= now:
+                self._remove(key, EvictionReason.EXPIRED)
+
+    def _remove(self, key, reason):
+        """ Drop an entry from the data, the policy, the byte budget and
+        the expiration timers, then tell the listeners why it left
+        """
+        item = self.cache_data.pop(key)
+        self._on_remove(key)
+        if self.weights:
+            self.current_bytes -= self.weights.pop(key, 0)
+        if self.expires.pop(key, None) is not None:
+            self.timer_wheel.cancel(key)
+        if self.tag_index:
+            self.tag_index.remove(key)
+        if self.stats is not None:
+            self.stats.evictions[reason] += 1
+        if self.listeners:
+            self._notify(key, decoded(item), reason)
+
+    def _remove_many(self, keys, reason):
+        """ Drop a list of entries at once, see `_remove`
+        """
+        pop = self.cache_data.pop
+        items = [pop(key) for key in keys]
+        self._on_remove_many(keys)
+        if self.weights:
+            weights = self.weights
+            self.current_bytes -= sum(weights.pop(key, 0) for key in keys)
+        if self.expires:
+            expires = self.expires
+            for key in keys:
+                if expires.pop(key, None) is not None:
+                    self.timer_wheel.cancel(key)
+        if self.tag_index:
+            for key in keys:
+                self.tag_index.remove(key)
+        if self.stats is not None:
+            self.stats.evictions[reason] += len(keys)
+        if self.listeners:
+            for key, item in zip(keys, items):
+                self._notify(key, decoded(item), reason)
+
+    def _evict(self, key):
+        """ Discard an entry to make room for another one
+        """
+        self._remove(key, EvictionReason.CAPACITY)
+
+    def _notify(self, key, item, reason):
+        """ Call every eviction listener
+        """
+        for listener in self.listeners:
+            listener(key, item, reason)
+
+    def _on_insert(self, key):
+        """ Policy hook: `key` was added to the cache
+        """
+
+    def _on_update(self, key):
+        """ Policy hook: the item of an existing `key` was replaced
+        """
+
+    def _on_access(self, key):
+        """ Policy hook: `key` was read by a cache hit
+        """
+
+    def _on_miss(self, key):
+        """ Policy hook: `key` was looked up but is not in the cache
+        """
+
+    def _on_insert_many(self, keys):
+        """ Policy hook: the list of `keys` was added to the cache
+        """
+        for key in keys:
+            self._on_insert(key)
+
+    def _on_access_many(self, keys):
+        """ Policy hook: the list of `keys` was read by `get_many`
+        """
+        for key in keys:
+            self._on_access(key)
+
+    def _on_remove(self, key):
+        """ Policy hook: `key` left the cache
+        """
+
+    def _on_remove_many(self, keys):
+        """ Policy hook: the list of `keys` left the cache
+        """
+        for key in keys:
+            self._on_remove(key)
+
+    def _victim(self):
+        """ Policy hook: the key to discard when the cache is full
+        """
         raise NotImplementedError(
-            "get must be implemented in your cache class")
+            "_victim must be implemented in your cache class")
+
+    def _policy_state(self):
+        """ Policy hook: the bookkeeping saved in a snapshot, by default
+        every attribute the policy added to the ones of BaseCaching
+        """
+        return {name: value for name, value in vars(self).items()
+                if name not in self.BASE_ATTRIBUTES}
+
+    def _restore_policy_state(self, state):
+        """ Policy hook: restore the bookkeeping of `_policy_state`
+        """
+        vars(self).update(state)
+
+    def _victims(self, count):
+        """ Policy hook: the list of the next `count` keys to discard, or
+        None when the policy can only name them one at a time
+        """
+        return None
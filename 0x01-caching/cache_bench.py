@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+""" Replay access traces through caching policies and report their hit
+ratio, throughput, operation latency and peak memory
+
+    ./cache_bench.py --trace zipf --skew 0.9 --capacity 1000 lru lfu arc
+    ./cache_bench.py --trace accesses.txt --capacity 50000 all
+    ./cache_bench.py --entry-memory all
+"""
+import argparse
+import itertools
+import random
+import time
+import tracemalloc
+from array import array
+from typing import Iterable, Iterator, List
+
+POLICIES = {
+    "fifo": ("1-fifo_cache", "FIFOCache"),
+    "lifo": ("2-lifo_cache", "LIFOCache"),
+    "lru": ("3-lru_cache", "LRUCache"),
+    "mru": ("4-mru_cache", "MRUCache"),
+    "lfu": ("100-lfu_cache", "LFUCache"),
+    "tinylfu": ("102-tinylfu_cache", "TinyLFUCache"),
+    "arc": ("103-arc_cache", "ARCCache"),
+    "clock": ("104-clock_cache", "CLOCKCache"),
+    "sieve": ("105-sieve_cache", "SIEVECache"),
+    "compact-lifo": ("116-compact_cache", "CompactLIFOCache"),
+    "compact-lru": ("116-compact_cache", "CompactLRUCache"),
+    "compact-mru": ("116-compact_cache", "CompactMRUCache"),
+    "compact-lfu": ("116-compact_cache", "CompactLFUCache"),
+}
+
+
+def load_policy(name: str) -> type:
+    """Return a cache class from a short name of POLICIES or from a
+    `module:Class` specification."""
+    module, _, class_name = name.partition(":")
+    if not class_name:
+        module, class_name = POLICIES[name.lower()]
+    return getattr(__import__(module), class_name)
+
+
+def zipf_trace(length: int, keys: int, skew: float,
+               seed: int = 0) -> Iterator[int]:
+    """Yield keys drawn from a Zipf distribution of parameter `skew`
+    over `keys` distinct keys (key 0 is the most popular)."""
+    rnd = random.Random(seed)
+    weights = itertools.accumulate(
+        1.0 / rank ** skew for rank in range(1, keys + 1))
+    population = range(keys)
+    cum_weights = list(weights)
+    while length > 0:
+        batch = min(4096, length)
+        yield from rnd.choices(population, cum_weights=cum_weights, k=batch)
+        length -= batch
+
+
+def scan_loop_trace(length: int, keys: int, skew: float,
+                    seed: int = 0) -> Iterator[int]:
+    """Yield a Zipf workload interrupted by one-off scans of cold keys
+    and by loops over a range slightly larger than a small cache."""
+    hot = zipf_trace(length, keys, skew, seed)
+    cold = keys
+    for step, key in enumerate(hot):
+        phase = step % 10000
+        if phase < 1000:
+            cold += 1
+            yield cold
+        elif phase < 2000:
+            yield keys + 10 ** 9 + phase % (keys // 10 + 1)
+        else:
+            yield key
+
+
+def shifting_trace(length: int, keys: int, skew: float,
+                   seed: int = 0, period: int = 50000) -> Iterator[int]:
+    """Yield a Zipf workload whose popular keys change every `period`
+    accesses."""
+    for step, key in enumerate(zipf_trace(length, keys, skew, seed)):
+        yield key + step // period * keys
+
+
+def file_trace(path: str, length: int = None) -> Iterator[str]:
+    """Yield the first word of every line of a trace file, skipping
+    blank lines and `#` comments."""
+    with open(path) as trace:
+        words = (line.split(None, 1)[0] for line in trace
+                 if line.strip() and not line.startswith("#"))
+        yield from itertools.islice(words, length)
+
+
+TRACES = {
+    "zipf": zipf_trace,
+    "scan": scan_loop_trace,
+    "shift": shifting_trace,
+}
+
+
+def percentile(values: List[int], fraction: float) -> int:
+    """Return the value at `fraction` of sorted `values`."""
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def replay(cache, trace: Iterable) -> dict:
+    """Look every key of `trace` up in `cache`, putting it on a miss,
+    and return the hit ratio, throughput and latencies of the run."""
+    get, put = cache.get, cache.put
+    clock = time.perf_counter_ns
+    latencies = array("Q")
+    record = latencies.append
+    hits = lookups = 0
+    start = clock()
+    for key in trace:
+        before = clock()
+        if get(key) is None:
+            put(key, True)
+        else:
+            hits += 1
+        record(clock() - before)
+        lookups += 1
+    elapsed = (clock() - start) / 1e9
+    ordered = sorted(latencies)
+    return {
+        "lookups": lookups,
+        "hit_ratio": hits / lookups if lookups else 0.0,
+        "ops_per_sec": lookups / elapsed if elapsed else 0.0,
+        "p50_us": percentile(ordered, 0.50) / 1000,
+        "p99_us": percentile(ordered, 0.99) / 1000,
+    }
+
+
+def peak_memory(cache, trace: Iterable) -> int:
+    """Replay `trace` under tracemalloc and return the peak number of
+    bytes allocated by the cache."""
+    tracemalloc.start()
+    try:
+        for key in trace:
+            if cache.get(key) is None:
+                cache.put(key, True)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def entry_memory(policy: type, entries: int) -> float:
+    """Fill a cache with `entries` entries and return the number of bytes
+    it holds per entry.
+
+    The keys and items are allocated before tracing, so only the storage
+    of the cache (its dictionary and the bookkeeping of its policy) is
+    counted."""
+    batch = dict.fromkeys(range(entries), True)
+    tracemalloc.start()
+    try:
+        cache = policy(max_items=entries)
+        cache.put_many(batch)
+        held = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    if len(cache.cache_data) != entries:
+        raise ValueError("{} kept {} of {} entries".format(
+            policy.__name__, len(cache.cache_data), entries))
+    return held / entries
+
+
+def main(argv: List[str] = None):
+    """Parse the command line, run every policy and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("policies", nargs="+",
+                        help="short names ({}), module:Class or all"
+                        .format(", ".join(POLICIES)))
+    parser.add_argument("--trace", default="zipf",
+                        help="zipf, scan, shift or the path of a trace file"
+                        " with one key per line")
+    parser.add_argument("--length", type=int,
+                        help="keys of the trace, 200000 for synthetic"
+                        " traces and the whole file for trace files")
+    parser.add_argument("--keys", type=int, default=100000,
+                        help="distinct keys of synthetic traces")
+    parser.add_argument("--skew", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--capacity", type=int, nargs="+", default=[1000])
+    parser.add_argument("--save", metavar="PATH",
+                        help="write the synthetic trace to PATH and exit")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the (slow) tracemalloc replay")
+    parser.add_argument("--entry-memory", type=int, nargs="?",
+                        const=1000000, metavar="ENTRIES",
+                        help="only report the bytes per entry of caches"
+                        " filled with ENTRIES (10^6) entries")
+    args = parser.parse_args(argv)
+
+    names = list(POLICIES) if args.policies == ["all"] else args.policies
+    if args.entry_memory:
+        print("{:<18} {:>10} {:>14}".format(
+            "policy", "entries", "bytes/entry"))
+        for name in names:
+            policy = load_policy(name)
+            print("{:<18} {:>10} {:>14.1f}".format(
+                policy.__name__, args.entry_memory,
+                entry_memory(policy, args.entry_memory)))
+        return
+
+    if args.trace in TRACES:
+        length = 200000 if args.length is None else args.length
+        keys = list(TRACES[args.trace](length, args.keys, args.skew,
+                                       args.seed))
+        if args.save:
+            with open(args.save, "w") as trace:
+                trace.writelines("{}\n".format(key) for key in keys)
+            return
+    else:
+        keys = list(file_trace(args.trace, args.length))
+
+    print("{:<18} {:>9} {:>7} {:>11} {:>8} {:>8} {:>10}".format(
+        "policy", "capacity", "hit%", "ops/s", "p50 us", "p99 us",
+        "peak KiB"))
+    for capacity, name in itertools.product(args.capacity, names):
+        policy = load_policy(name)
+        result = replay(policy(max_items=capacity), keys)
+        peak = "-" if args.no_memory else "{:.0f}".format(
+            peak_memory(policy(max_items=capacity), keys) / 1024)
+        print("{:<18} {:>9} {:>7.2f} {:>11.0f} {:>8.2f} {:>8.2f} "
+              "{:>10}".format(policy.__name__, capacity,
+                              100 * result["hit_ratio"],
+                              result["ops_per_sec"], result["p50_us"],
+                              result["p99_us"], peak))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+""" Client of the cache server
+"""
+import json
+import queue
+import socket
+from contextlib import contextmanager
+
+from cache_protocol import (DELETE, ERROR, GET, HEADER, MGET, NOT_FOUND, OK,
+                            PING, SET, STATS, as_bytes, decode_values,
+                            encode_keys, encode_set, frame)
+
+
+class CacheError(Exception):
+    """ The server answered a request with an ERROR response
+    """
+
+
+class CacheClient():
+    """ CacheClient is one connection to the cache server, at a
+    (host, port) TCP address or a Unix socket path.
+
+    It is not thread-safe, see ClientPool. Keys and values are bytes;
+    anything else is sent as its str in UTF-8, and values always come
+    back as bytes. `pipeline()` sends many requests in one write before
+    reading the responses.
+    """
+
+    def __init__(self, address, timeout=5.0):
+        """ Connect to `address`
+        """
+        if isinstance(address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.settimeout(timeout)
+        self.sock.connect(address)
+        self.file = self.sock.makefile("rb")
+
+    def close(self):
+        """ Close the connection
+        """
+        self.file.close()
+        self.sock.close()
+
+    def _read(self):
+        """ Read one response, return (status, payload)
+        """
+        header = self.file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ConnectionError("the cache server closed the connection")
+        length, status = HEADER.unpack(header)
+        payload = self.file.read(length - 1)
+        if status == ERROR:
+            raise CacheError(payload.decode(errors="replace"))
+        return status, payload
+
+    def _call(self, code, payload=b""):
+        """ Send one request and read its response
+        """
+        self.sock.sendall(frame(code, payload))
+        return self._read()
+
+    def get(self, key):
+        """ Return the value of `key`, or None
+        """
+        status, payload = self._call(GET, as_bytes(key))
+        return None if status == NOT_FOUND else payload
+
+    def set(self, key, value, ttl=None):
+        """ Store `value` under `key`, for `ttl` seconds when given
+        """
+        self._call(SET, encode_set(key, value, ttl))
+
+    def delete(self, key):
+        """ Remove `key`, return True if it was cached
+        """
+        status, _ = self._call(DELETE, as_bytes(key))
+        return status == OK
+
+    def get_many(self, keys):
+        """ Return a dictionary of the values found for `keys` in one
+        request
+        """
+        keys = list(keys)
+        _, payload = self._call(MGET, encode_keys(keys))
+        return {key: value for key, value in zip(keys, decode_values(payload))
+                if value is not None}
+
+    def ping(self):
+        """ Check the connection
+        """
+        self._call(PING)
+
+    def stats(self):
+        """ Return the statistics of the server's cache
+        """
+        _, payload = self._call(STATS)
+        return json.loads(payload)
+
+    def pipeline(self):
+        """ Return a Pipeline of requests on this connection
+        """
+        return Pipeline(self)
+
+
+class Pipeline():
+    """ Pipeline queues requests and sends them in one write; `execute`
+    returns their results in order, as the methods of CacheClient would.
+    """
+
+    def __init__(self, client):
+        """ Initiliaze
+        """
+        self.client = client
+        self.frames = []
+        self.decoders = []
+
+    def get(self, key):
+        """ Queue a GET """
+        self.frames.append(frame(GET, as_bytes(key)))
+        self.decoders.append(
+            lambda status, payload: None if status == NOT_FOUND else payload)
+        return self
+
+    def set(self, key, value, ttl=None):
+        """ Queue a SET """
+        self.frames.append(frame(SET, encode_set(key, value, ttl)))
+        self.decoders.append(lambda status, payload: None)
+        return self
+
+    def delete(self, key):
+        """ Queue a DELETE """
+        self.frames.append(frame(DELETE, as_bytes(key)))
+        self.decoders.append(lambda status, payload: status == OK)
+        return self
+
+    def execute(self):
+        """ Send the queued requests and return their results
+        """
+        frames, decoders = self.frames, self.decoders
+        self.frames, self.decoders = [], []
+        self.client.sock.sendall(b"".join(frames))
+        results = []
+        failure = None
+        for decode in decoders:
+            # read every response, even after an error, to stay in sync
+            try:
+                results.append(decode(*self.client._read()))
+            except CacheError as error:
+                failure = failure or error
+                results.append(None)
+        if failure is not None:
+            raise failure
+        return results
+
+
+class ClientPool():
+    """ ClientPool shares up to `size` connections between threads: each
+    call borrows an idle connection, or opens one, and gives it back.
+    A connection that fails is closed instead of being reused.
+    """
+
+    def __init__(self, address, size=8, timeout=5.0):
+        """ Initiliaze, connections are opened when first needed
+        """
+        self.address = address
+        self.timeout = timeout
+        # idle connections, and None for each one not opened yet
+        self.pool = queue.LifoQueue()
+        for _ in range(size):
+            self.pool.put(None)
+
+    @contextmanager
+    def connection(self):
+        """ Borrow a CacheClient for the duration of a `with` block
+        """
+        client = self.pool.get()
+        if client is None:
+            try:
+                client = CacheClient(self.address, self.timeout)
+            except BaseException:
+                self.pool.put(None)
+                raise
+        try:
+            yield client
+        except CacheError:
+            # the error response was read, the connection is still usable
+            self.pool.put(client)
+            raise
+        except BaseException:
+            client.close()
+            self.pool.put(None)
+            raise
+        else:
+            self.pool.put(client)
+
+    def close(self):
+        """ Close the idle connections
+        """
+        clients = []
+        while True:
+            try:
+                clients.append(self.pool.get_nowait())
+            except queue.Empty:
+                break
+        for client in clients:
+            if client is not None:
+                client.close()
+            self.pool.put(None)
+
+    def get(self, key):
+        """ CacheClient.get on a pooled connection """
+        with self.connection() as client:
+            return client.get(key)
+
+    def set(self, key, value, ttl=None):
+        """ CacheClient.set on a pooled connection """
+        with self.connection() as client:
+            client.set(key, value, ttl)
+
+    def delete(self, key):
+        """ CacheClient.delete on a pooled connection """
+        with self.connection() as client:
+            return client.delete(key)
+
+    def get_many(self, keys):
+        """ CacheClient.get_many on a pooled connection """
+        with self.connection() as client:
+            return client.get_many(keys)
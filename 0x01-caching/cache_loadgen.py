@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+""" Load a cache server and report its throughput and tail latency
+
+    ./cache_loadgen.py --port 11311 --processes 4 --connections 8
+    ./cache_loadgen.py --unix /tmp/cache.sock --pipeline 16 --mget 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+from time import perf_counter_ns
+from typing import List, Tuple
+
+from cache_client import CacheClient
+from cache_protocol import (GET, HEADER, MGET, SET, encode_keys, encode_set,
+                            frame)
+from cache_stats import LatencyHistogram
+
+
+async def connection(args: argparse.Namespace, seed: int,
+                     histogram: LatencyHistogram) -> int:
+    """Run the requests of one connection, return how many were sent.
+
+    Each round sends `pipeline` requests in one write then reads their
+    responses; the latency of a request runs from that write to its own
+    response."""
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    rnd = random.Random(seed)
+    value = b"x" * args.value_size
+    sent = 0
+    while sent < args.requests:
+        frames = []
+        for _ in range(min(args.pipeline, args.requests - sent)):
+            if rnd.random() >= args.read_ratio:
+                key = str(rnd.randrange(args.keys))
+                frames.append(frame(SET, encode_set(key, value)))
+            elif args.mget > 1:
+                frames.append(frame(MGET, encode_keys(
+                    [str(rnd.randrange(args.keys))
+                     for _ in range(args.mget)])))
+            else:
+                frames.append(frame(GET, str(rnd.randrange(args.keys))
+                                    .encode()))
+        start = perf_counter_ns()
+        writer.write(b"".join(frames))
+        for _ in frames:
+            length, _ = HEADER.unpack(await reader.readexactly(HEADER.size))
+            await reader.readexactly(length - 1)
+            histogram.record(perf_counter_ns() - start)
+        sent += len(frames)
+    writer.close()
+    return sent
+
+
+def worker(args: argparse.Namespace,
+           seed: int) -> Tuple[int, LatencyHistogram]:
+    """Run the connections of one process."""
+    histogram = LatencyHistogram()
+
+    async def run():
+        counts = await asyncio.gather(*(
+            connection(args, seed * 1000 + number, histogram)
+            for number in range(args.connections)))
+        return sum(counts)
+
+    return asyncio.run(run()), histogram
+
+
+def preload(args: argparse.Namespace):
+    """Set every key once so reads hit."""
+    address = args.unix or (args.host, args.port)
+    client = CacheClient(address)
+    value = b"x" * args.value_size
+    pipeline = client.pipeline()
+    for key in range(args.keys):
+        pipeline.set(str(key), value)
+        if key % 1000 == 999:
+            pipeline.execute()
+    pipeline.execute()
+    client.close()
+
+
+def main(argv: List[str] = None):
+    """Parse the command line, run the load and print the report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11311)
+    parser.add_argument("--unix", help="Unix socket path of the server")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--connections", type=int, default=4,
+                        help="connections per process")
+    parser.add_argument("--requests", type=int, default=20000,
+                        help="requests per connection")
+    parser.add_argument("--pipeline", type=int, default=1,
+                        help="requests sent per round trip")
+    parser.add_argument("--mget", type=int, default=0,
+                        help="keys per read, as one MGET when above 1")
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--value-size", type=int, default=100)
+    parser.add_argument("--read-ratio", type=float, default=0.9)
+    parser.add_argument("--no-preload", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.no_preload:
+        preload(args)
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.processes) as pool:
+        results = pool.starmap(worker, [(args, seed)
+                                        for seed in range(args.processes)])
+    elapsed = time.perf_counter() - start
+
+    histogram = LatencyHistogram()
+    for _, part in results:
+        histogram.merge(part)
+    requests = sum(count for count, _ in results)
+    print("{} requests in {:.2f} s: {:.0f} requests/s".format(
+        requests, elapsed, requests / elapsed))
+    print("latency us: p50 {:.0f}  p99 {:.0f}  p99.9 {:.0f}  max {:.0f}"
+          .format(*(value / 1000 for value in (
+              histogram.percentile(0.5), histogram.percentile(0.99),
+              histogram.percentile(0.999), histogram.max))))
+
+
+if __name__ == "__main__":
+    main()
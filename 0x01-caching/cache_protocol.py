@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+""" Binary protocol of the cache server
+
+Every message is a frame, all integers in network byte order:
+
+    u32 length of the rest of the frame
+    u8  opcode (requests) or status (responses)
+    ... payload
+
+Requests:
+  - GET    key                                  -> OK value | NOT_FOUND
+  - SET    u32 ttl_ms, u16 key length, key, value  -> OK
+  - DELETE key                                  -> OK | NOT_FOUND
+  - MGET   u16 count, count * (u16 length, key) -> OK u16 count,
+           count * (i32 length, value), a length of -1 for a miss
+  - PING                                        -> OK
+  - STATS                                       -> OK JSON object
+
+A ttl_ms of 0 means the default time-to-live of the cache. Keys and
+values are opaque bytes. An ERROR response carries a UTF-8 message.
+Requests may be pipelined: the server answers them in order.
+"""
+import struct
+
+GET = 1
+SET = 2
+DELETE = 3
+MGET = 4
+PING = 5
+STATS = 6
+
+OK = 0
+NOT_FOUND = 1
+ERROR = 2
+
+HEADER = struct.Struct("!IB")
+SET_HEADER = struct.Struct("!IH")
+COUNT = struct.Struct("!H")
+LENGTH = struct.Struct("!i")
+# frames above this size are refused and close the connection
+MAX_FRAME = 64 << 20
+
+
+def frame(code, payload=b""):
+    """ Return a frame of `code` (opcode or status) and `payload`
+    """
+    return HEADER.pack(len(payload) + 1, code) + payload
+
+
+def as_bytes(value):
+    """ Leave bytes as they are, encode anything else as its str in UTF-8
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    return str(value).encode()
+
+
+def encode_set(key, value, ttl=None):
+    """ Return the payload of a SET request, `ttl` in seconds
+    """
+    key = as_bytes(key)
+    ttl_ms = 0 if ttl is None else max(1, int(ttl * 1000))
+    return SET_HEADER.pack(ttl_ms, len(key)) + key + as_bytes(value)
+
+
+def decode_set(payload):
+    """ Return (key, value, ttl in seconds or None) of a SET payload
+    """
+    ttl_ms, key_size = SET_HEADER.unpack_from(payload)
+    start = SET_HEADER.size
+    key = payload[start:start + key_size]
+    value = payload[start + key_size:]
+    return key, value, ttl_ms / 1000 if ttl_ms else None
+
+
+def encode_keys(keys):
+    """ Return the payload of a MGET request
+    """
+    parts = [COUNT.pack(len(keys))]
+    for key in keys:
+        key = as_bytes(key)
+        parts.append(COUNT.pack(len(key)))
+        parts.append(key)
+    return b"".join(parts)
+
+
+def decode_keys(payload):
+    """ Return the keys of a MGET payload
+    """
+    count, = COUNT.unpack_from(payload)
+    position = COUNT.size
+    keys = []
+    for _ in range(count):
+        size, = COUNT.unpack_from(payload, position)
+        position += COUNT.size
+        keys.append(payload[position:position + size])
+        position += size
+    return keys
+
+
+def encode_values(values):
+    """ Return the payload of a MGET response, None for a miss
+    """
+    parts = [COUNT.pack(len(values))]
+    for value in values:
+        if value is None:
+            parts.append(LENGTH.pack(-1))
+        else:
+            parts.append(LENGTH.pack(len(value)))
+            parts.append(value)
+    return b"".join(parts)
+
+
+def decode_values(payload):
+    """ Return the values of a MGET response, None for a miss
+    """
+    count, = COUNT.unpack_from(payload)
+    position = COUNT.size
+    values = []
+    for _ in range(count):
+        size, = LENGTH.unpack_from(payload, position)
+        position += LENGTH.size
+        if size < 0:
+            values.append(None)
+        else:
+            values.append(payload[position:position + size])
+            position += size
+    return values
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+""" Serve a caching policy to other processes, in any language, over TCP
+or a Unix socket with the binary protocol of cache_protocol
+
+    ./cache_server.py --policy lfu --max-items 100000 --port 11311
+    ./cache_server.py --policy lru --unix /tmp/cache.sock
+"""
+import argparse
+import asyncio
+import json
+from typing import List
+
+from cache_bench import load_policy
+from cache_protocol import (DELETE, ERROR, GET, HEADER, MAX_FRAME, MGET,
+                            NOT_FOUND, OK, PING, SET, STATS, decode_keys,
+                            decode_set, encode_values, frame)
+
+OK_FRAME = frame(OK)
+NOT_FOUND_FRAME = frame(NOT_FOUND)
+
+
+class CacheServer():
+    """Answer the requests of every connection with one cache.
+
+    The cache is only used from the event loop thread, so any BaseCaching
+    policy works without a lock.
+    """
+
+    def __init__(self, cache):
+        """Serve `cache`, a BaseCaching (or ShardedCache) instance."""
+        self.cache = cache
+        self.connections = 0
+
+    def dispatch(self, code: int, payload: bytes) -> bytes:
+        """Run one request and return its response frame."""
+        cache = self.cache
+        if code == GET:
+            item = cache.get(payload)
+            return NOT_FOUND_FRAME if item is None else frame(OK, item)
+        if code == SET:
+            key, value, ttl = decode_set(payload)
+            cache.put(key, value, ttl)
+            return OK_FRAME
+        if code == MGET:
+            keys = decode_keys(payload)
+            found = cache.get_many(keys)
+            return frame(OK, encode_values([found.get(key) for key in keys]))
+        if code == DELETE:
+            return OK_FRAME if cache.delete(payload) else NOT_FOUND_FRAME
+        if code == PING:
+            return OK_FRAME
+        if code == STATS:
+            snapshot = dict(cache.stats_snapshot(),
+                            connections=self.connections)
+            return frame(OK, json.dumps(snapshot).encode())
+        return frame(ERROR, "unknown opcode {}".format(code).encode())
+
+    async def start(self, host: str = None, port: int = None,
+                    path: str = None) -> List[asyncio.AbstractServer]:
+        """Listen on TCP `host`:`port` and/or on the Unix socket `path`."""
+        loop = asyncio.get_running_loop()
+        servers = []
+        if port is not None:
+            servers.append(await loop.create_server(
+                lambda: CacheConnection(self), host, port))
+        if path is not None:
+            servers.append(await loop.create_unix_server(
+                lambda: CacheConnection(self), path))
+        return servers
+
+
+class CacheConnection(asyncio.Protocol):
+    """One client connection.
+
+    Every complete frame received is answered at once and the responses
+    of one read are sent with a single write, so a client pipelining its
+    requests gets them back in as few packets as it sent them.
+    """
+
+    def __init__(self, server: CacheServer):
+        self.server = server
+        self.buffer = bytearray()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server.connections += 1
+
+    def connection_lost(self, error):
+        self.server.connections -= 1
+
+    def data_received(self, data: bytes):
+        buffer = self.buffer
+        buffer += data
+        dispatch = self.server.dispatch
+        responses = []
+        position = 0
+        while len(buffer) - position >= HEADER.size:
+            length, code = HEADER.unpack_from(buffer, position)
+            if not length or length > MAX_FRAME:
+                responses.append(frame(ERROR, b"bad frame length"))
+                self.transport.write(b"".join(responses))
+                self.transport.close()
+                return
+            end = position + 4 + length
+            if end > len(buffer):
+                break
+            payload = bytes(buffer[position + HEADER.size:end])
+            try:
+                responses.append(dispatch(code, payload))
+            except Exception as error:
+                responses.append(frame(ERROR, repr(error).encode()))
+            position = end
+        del buffer[:position]
+        if responses:
+            self.transport.write(b"".join(responses))
+
+    def pause_writing(self):
+        # the client doesn't read its responses: stop reading requests
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+async def serve(server: CacheServer, host: str, port: int, path: str):
+    """Run the server until it is cancelled."""
+    servers = await server.start(host, port, path)
+    for listening in servers:
+        for sock in listening.sockets:
+            print("listening on {}".format(sock.getsockname()))
+    await asyncio.gather(*(listening.serve_forever()
+                           for listening in servers))
+
+
+def main(argv: List[str] = None):
+    """Parse the command line and serve forever."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--policy", default="lru",
+                        help="policy name or module:Class (default lru)")
+    parser.add_argument("--max-items", type=int, default=100000)
+    parser.add_argument("--max-bytes", type=int)
+    parser.add_argument("--default-ttl", type=float)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int,
+                        help="TCP port (default 11311 without --unix)")
+    parser.add_argument("--unix", help="Unix socket path")
+    args = parser.parse_args(argv)
+    if args.port is None and args.unix is None:
+        args.port = 11311
+
+    cache = load_policy(args.policy)(max_items=args.max_items,
+                                     max_bytes=args.max_bytes,
+                                     default_ttl=args.default_ttl)
+    try:
+        asyncio.run(serve(CacheServer(cache), args.host, args.port,
+                          args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
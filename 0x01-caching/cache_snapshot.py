@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+""" Cache snapshot module
+"""
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+from array import array
+from itertools import accumulate, repeat
+
+from eviction_listeners import EvictionReason
+
+
+MAGIC = b"ALXS"
+VERSION = 1
+# magic, version, length of the pickled index
+HEADER = struct.Struct("<4sHQ")
+
+
+class Encoded(tuple):
+    """ Encoded is the item of an entry loaded from a snapshot and not
+    read yet: (view, start, end) of its pickle in the mapped snapshot
+    file.
+
+    BaseCaching decodes it on its first hit, so loading a snapshot only
+    unpickles the keys and the policy state, whatever the size of the
+    items. It is a tuple so a whole snapshot of them is built by C code.
+    """
+    __slots__ = ()
+
+    def raw(self):
+        """ The pickle of the item
+        """
+        view, start, end = self
+        return view[start:end]
+
+    def decode(self):
+        """ Unpickle the item
+        """
+        return pickle.loads(self.raw())
+
+
+def decoded(item):
+    """ Return `item`, decoded when it is still Encoded
+    """
+    if type(item) is Encoded:
+        return item.decode()
+    return item
+
+
+def dump(cache, path):
+    """ Write the entries of `cache`, their time-to-live and the state of
+    its policy to `path`
+
+    The file holds a header, a pickled index (the keys, the sizes of the
+    items, the policy state...) then the pickles of the items one after
+    the other. It is written next to `path` then renamed over it, so a
+    reader never sees half a snapshot. Items still Encoded are copied as
+    they are, without being decoded.
+    """
+    if cache.expires:
+        cache._expire()
+    now = cache.clock()
+    values = [item.raw() if type(item) is Encoded
+              else pickle.dumps(item, pickle.HIGHEST_PROTOCOL)
+              for item in cache.cache_data.values()]
+    index = pickle.dumps({
+        "class": type(cache).__name__,
+        "max_items": cache.max_items,
+        "max_bytes": cache.max_bytes,
+        "time": time.time(),
+        "policy": cache._policy_state(),
+        "keys": list(cache.cache_data),
+        "sizes": array("Q", map(len, values)),
+        "ttls": {key: deadline - now
+                 for key, deadline in cache.expires.items()},
+        "weights": cache.weights,
+        "tags": cache.tag_index.key_tags,
+    }, pickle.HIGHEST_PROTOCOL)
+
+    temporary = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        file.write(index)
+        for value in values:
+            file.write(value)
+    os.replace(temporary, path)
+    return len(values)
+
+
+def load(cache, path):
+    """ Fill the empty `cache` with the snapshot at `path`, return the
+    number of entries loaded
+
+    The cache must be of the class and the capacity (entries and bytes)
+    of the dumped one. The file is mapped in memory and the items stay
+    Encoded until they are read. The time-to-live of the entries keeps
+    counting while the snapshot sits on disk; the entries expired since
+    are skipped.
+    """
+    if cache.cache_data:
+        raise ValueError("a snapshot can only be loaded in an empty cache")
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    magic, version, index_size = HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("{} is not a cache snapshot".format(path))
+    start = HEADER.size + index_size
+    index = pickle.loads(view[HEADER.size:start])
+    # the policy state is sized for the capacity of the dumped cache
+    if index["class"] != type(cache).__name__ or \
+            index["max_items"] != cache.max_items or \
+            index.get("max_bytes") != cache.max_bytes:
+        raise ValueError(
+            "{} is a snapshot of a {} of {} entries and {} bytes".format(
+                path, index["class"], index["max_items"],
+                index.get("max_bytes")))
+
+    cache._restore_policy_state(index["policy"])
+    ends = list(accumulate(index["sizes"]))
+    starts = [0] + ends[:-1]
+    cache.cache_data.update(zip(index["keys"], map(Encoded, zip(
+        repeat(view), [start + offset for offset in starts],
+        [start + offset for offset in ends]))))
+    if index["weights"]:
+        cache.weights.update(index["weights"])
+        cache.current_bytes = sum(index["weights"].values())
+    # snapshots written before the tags have none
+    tags = index.get("tags", {})
+    if cache.tag_index or tags:
+        for key in index["keys"]:
+            cache.tag_index.add(key, tags.get(key))
+
+    elapsed = max(0.0, time.time() - index["time"])
+    now = cache.clock()
+    expired = []
+    for key, remaining in index["ttls"].items():
+        if remaining <= elapsed:
+            expired.append(key)
+        else:
+            cache.expires[key] = now + remaining - elapsed
+            cache.timer_wheel.schedule(key, now + remaining - elapsed)
+    # dropped through the policy, which knows them from its saved state
+    for key in expired:
+        cache._remove(key, EvictionReason.EXPIRED)
+    return len(cache.cache_data)
+
+
+class SnapshotWriter():
+    """ SnapshotWriter dumps a cache to `path` every `interval` seconds
+    from a background thread, and a last time when closed.
+
+    A BaseCaching is not thread-safe: pass the `lock` every user of the
+    cache holds, it is held while the snapshot is written. Anything with
+    a `dump_snapshot(path)` method, like a ShardedCache, can be used.
+    """
+
+    def __init__(self, cache, path, interval=60.0, lock=None):
+        """ Initiliaze and start the dumping thread
+        """
+        self.cache = cache
+        self.path = path
+        self.interval = interval
+        self.lock = lock
+        self.errors = 0
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def dump(self):
+        """ Write the snapshot now
+        """
+        if self.lock is None:
+            self.cache.dump_snapshot(self.path)
+            return
+        with self.lock:
+            self.cache.dump_snapshot(self.path)
+
+    def close(self):
+        """ Stop the dumping thread after a last snapshot
+        """
+        self.closed = True
+        self.wakeup.set()
+        self.thread.join()
+        self.dump()
+
+    def _run(self):
+        """ Dump on every wake-up until the writer is closed
+        """
+        while not self.closed:
+            self.wakeup.wait(self.interval)
+            if self.closed:
+                break
+            try:
+                self.dump()
+            except Exception:
+                # counted in `errors`, the next snapshot is tried anyway
+                self.errors += 1
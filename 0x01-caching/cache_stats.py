@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+""" Cache statistics module
+"""
+from collections import Counter
+
+
+class LatencyHistogram():
+    """ LatencyHistogram counts durations in nanoseconds in log-linear
+    buckets, like an HDR histogram:
+      - values below 2 ** PRECISION get a bucket each
+      - every power of two above is split in 2 ** (PRECISION - 1) buckets
+
+    so a percentile is reported with a relative error below
+    2 ** (1 - PRECISION) for any value, in a fixed number of buckets.
+    """
+    PRECISION = 5
+    HALF = 1 << (PRECISION - 1)
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.counts = [0] * ((66 - self.PRECISION) * self.HALF)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        """ Count one duration of `value` nanoseconds
+        """
+        shift = value.bit_length() - self.PRECISION
+        if shift <= 0:
+            self.counts[value] += 1
+        else:
+            self.counts[shift * self.HALF + (value >> shift)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def bucket_bound(self, index):
+        """ Largest value counted in the bucket `index`
+        """
+        if index < 2 * self.HALF:
+            return index
+        shift = index // self.HALF - 1
+        return ((index - shift * self.HALF + 1) << shift) - 1
+
+    def percentile(self, fraction):
+        """ Upper bound of the bucket holding the `fraction` percentile
+        """
+        if not self.count:
+            return 0
+        rank = max(1, int(round(self.count * fraction)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_bound(index), self.max)
+        return self.max
+
+    def buckets(self):
+        """ Yield (upper bound, cumulative count) of the non-empty buckets
+        """
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                seen += count
+                yield self.bucket_bound(index), seen
+
+    def merge(self, other):
+        """ Add the counts of another histogram to this one
+        """
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+class CacheStats():
+    """ CacheStats holds the counters of a cache:
+      - hits and misses of `get`
+      - negative hits: misses answered by the negative cache
+      - inserts and updates of `put`
+      - evictions by `EvictionReason`
+      - latency histograms of `get` and `put`
+
+    The counters are plain integers bumped inline by BaseCaching, cheap
+    enough to stay enabled in production. Timing an operation costs more
+    than the operation itself, so only one operation in `sample_every` is
+    timed; the histograms hold that sample.
+    """
+
+    def __init__(self, sample_every=16):
+        """ Initiliaze
+        """
+        self.sample_every = sample_every
+        self.countdown = sample_every
+        self.reset()
+
+    def skip_sample(self):
+        """ Tell whether the current operation is left out of the latency
+        sample
+        """
+        self.countdown -= 1
+        if self.countdown:
+            return True
+        self.countdown = self.sample_every
+        return False
+
+    def reset(self):
+        """ Set every counter back to zero
+        """
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.inserts = 0
+        self.updates = 0
+        self.evictions = Counter()
+        self.get_latency = LatencyHistogram()
+        self.put_latency = LatencyHistogram()
+
+    def merge(self, other):
+        """ Add the counters of another CacheStats to these ones
+        """
+        self.hits += other.hits
+        self.misses += other.misses
+        self.negative_hits += other.negative_hits
+        self.inserts += other.inserts
+        self.updates += other.updates
+        self.evictions.update(other.evictions)
+        self.get_latency.merge(other.get_latency)
+        self.put_latency.merge(other.put_latency)
+
+    def snapshot(self, reset=False, **gauges):
+        """ Return the counters as a dictionary, with the `gauges` (like
+        the current size) added as they are, and optionally reset them
+        """
+        lookups = self.hits + self.misses
+        snapshot = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "negative_hits": self.negative_hits,
+            "inserts": self.inserts,
+            "updates": self.updates,
+            "evictions": dict(self.evictions),
+        }
+        for name, histogram in (("get", self.get_latency),
+                                ("put", self.put_latency)):
+            for label, fraction in (("p50", 0.5), ("p99", 0.99),
+                                    ("p999", 0.999)):
+                snapshot["{}_{}_ns".format(name, label)] = \
+                    histogram.percentile(fraction)
+            snapshot["{}_max_ns".format(name)] = histogram.max
+        snapshot.update(gauges)
+        if reset:
+            self.reset()
+        return snapshot
+
+    def exposition(self, prefix="cache", labels=None, **gauges):
+        """ Render the counters in the Prometheus text format
+        """
+        labels = dict(labels or {})
+
+        def series(name, value, **extra):
+            """ One sample line """
+            merged = dict(labels, **extra)
+            text = ",".join('{}="{}"'.format(key, merged[key])
+                            for key in sorted(merged))
+            return "{}_{}{} {}".format(
+                prefix, name, "{" + text + "}" if text else "", value)
+
+        lines = []
+        for name, value in (("hits_total", self.hits),
+                            ("misses_total", self.misses),
+                            ("negative_hits_total", self.negative_hits),
+                            ("inserts_total", self.inserts),
+                            ("updates_total", self.updates)):
+            lines.append("# TYPE {}_{} counter".format(prefix, name))
+            lines.append(series(name, value))
+        lines.append("# TYPE {}_evictions_total counter".format(prefix))
+        for reason in sorted(self.evictions):
+            lines.append(series("evictions_total", self.evictions[reason],
+                                reason=reason))
+        for name in sorted(gauges):
+            lines.append("# TYPE {}_{} gauge".format(prefix, name))
+            lines.append(series(name, gauges[name]))
+        for name, histogram in (("get", self.get_latency),
+                                ("put", self.put_latency)):
+            metric = "{}_latency_seconds".format(name)
+            lines.append("# TYPE {}_{} histogram".format(prefix, metric))
+            for bound, seen in histogram.buckets():
+                lines.append(series(metric + "_bucket", seen,
+                                    le="{:.9f}".format(bound / 1e9)))
+            lines.append(series(metric + "_bucket", histogram.count,
+                                le="+Inf"))
+            lines.append(series(metric + "_sum", histogram.total / 1e9))
+            lines.append(series(metric + "_count", histogram.count))
+        return "\n".join(lines) + "\n"
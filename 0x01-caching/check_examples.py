@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+""" Run the main scripts shown in the README and compare their output,
+DISCARD lines included, with the one printed there
+
+    ./check_examples.py
+    ./check_examples.py 3-main.py 4-main.py
+"""
+import argparse
+import difflib
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RUN = re.compile(r"^\S+@\S+:\S+\$ \./(\S+-main\.py)$")
+PROMPT = re.compile(r"^\S+@\S+:\S+\$")
+
+
+def expected_outputs(path: str) -> Dict[str, List[str]]:
+    """Return the output lines the README shows for each main script.
+
+    Args:
+        path (str): The path of the README.
+
+    Returns:
+        Dict[str, List[str]]: The lines printed by each script, by name.
+    """
+    outputs = {}
+    script = None
+    with open(path) as readme:
+        for line in readme:
+            line = line.rstrip("\n")
+            match = RUN.match(line)
+            if match:
+                script = match.group(1)
+                outputs[script] = []
+            elif script is not None:
+                if PROMPT.match(line):
+                    script = None
+                else:
+                    outputs[script].append(line)
+    return outputs
+
+
+def check(script: str, expected: List[str]) -> bool:
+    """Run `script` and print the differences with `expected`.
+
+    Args:
+        script (str): The name of a main script of this directory.
+        expected (List[str]): The lines it should print.
+
+    Returns:
+        bool: True if the output is the expected one.
+    """
+    result = subprocess.run(
+        [sys.executable, script], cwd=HERE, stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT, universal_newlines=True)
+    output = result.stdout.splitlines()
+    if output == expected:
+        print("{}: OK".format(script))
+        return True
+    print("{}: FAILED".format(script))
+    for line in difflib.unified_diff(expected, output, "README", script,
+                                     lineterm=""):
+        print(line)
+    return False
+
+
+def main(argv: List[str] = None) -> int:
+    """Check the scripts given (all those of the README by default)."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("scripts", nargs="*",
+                        help="main scripts to check, all by default")
+    args = parser.parse_args(argv)
+
+    outputs = expected_outputs(os.path.join(HERE, "README.md"))
+    scripts = args.scripts or sorted(outputs, key=lambda name: int(
+        name.split("-")[0]))
+    missing = [script for script in scripts if script not in outputs]
+    if missing:
+        parser.error("no expected output for {}".format(", ".join(missing)))
+    results = [check(script, outputs[script]) for script in scripts]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+""" Eviction listeners module
+"""
+import logging
+import threading
+from collections import deque
+
+
+class EvictionReason():
+    """ Why an entry left the cache, as passed to eviction listeners:
+      - CAPACITY: discarded by the policy to make room
+      - EXPLICIT: removed by a call to `delete`
+      - EXPIRED: its time-to-live is over
+      - REPLACED: its item was overwritten by `put`
+    """
+    CAPACITY = "capacity"
+    EXPLICIT = "explicit"
+    EXPIRED = "expired"
+    REPLACED = "replaced"
+
+
+def print_discard(key, item, reason):
+    """ Listener printing `DISCARD: <key>` for the entries discarded to
+    make room, as the caching tasks expect
+    """
+    if reason == EvictionReason.CAPACITY:
+        print("DISCARD: {}".format(key))
+
+
+class BatchedLogSink():
+    """ BatchedLogSink is a listener that only queues eviction events and
+    writes them to a logger from a background thread, one record per
+    batch, so `put` never waits on logging I/O.
+
+    A batch is written every `interval` seconds, or sooner once
+    `batch_size` events are queued. At most `max_pending` events are kept;
+    older ones are dropped and counted in `dropped` when the logger can't
+    keep up.
+    """
+
+    def __init__(self, logger=None, batch_size=1024, interval=1.0,
+                 max_pending=100000):
+        """ Initiliaze and start the flushing thread
+        """
+        self.logger = logger or logging.getLogger("caching.evictions")
+        self.batch_size = batch_size
+        self.interval = interval
+        self.events = deque(maxlen=max_pending)
+        self.dropped = 0
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __call__(self, key, item, reason):
+        """ Queue one eviction event
+        """
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append((key, reason))
+        if len(self.events) >= self.batch_size:
+            self.wakeup.set()
+
+    def flush(self):
+        """ Write the queued events as one log record
+        """
+        batch = []
+        while True:
+            try:
+                batch.append(self.events.popleft())
+            except IndexError:
+                break
+        if batch:
+            self.logger.info("%d evictions: %s", len(batch), " ".join(
+                "{}:{}".format(key, reason) for key, reason in batch))
+
+    def close(self):
+        """ Stop the flushing thread after writing the pending events
+        """
+        self.closed = True
+        self.wakeup.set()
+        self.thread.join()
+
+    def _run(self):
+        """ Flush on every wake-up until the sink is closed
+        """
+        while not self.closed:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+        self.flush()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+""" Negative cache module: remember the keys the backend does not have
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class NegativeCache():
+    """ NegativeCache remembers missing keys exactly for `ttl` seconds.
+
+    At most `max_items` keys are kept, the oldest ones are forgotten
+    first. All the keys live the same time, so the insertion order is
+    also the expiration order and expired keys are dropped from the front
+    in amortized O(1). It has its own lock, so one instance can be shared
+    by the shards of a ShardedCache.
+    """
+
+    def __init__(self, ttl=60.0, max_items=100000, clock=None):
+        """ Initiliaze
+        """
+        self.ttl = ttl
+        self.max_items = max_items
+        self.clock = clock or time.monotonic
+        self.deadlines = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, key):
+        """ Remember that `key` is missing
+        """
+        with self.lock:
+            self.deadlines.pop(key, None)
+            self.deadlines[key] = self.clock() + self.ttl
+            if self.max_items is not None and \
+                    len(self.deadlines) > self.max_items:
+                self.deadlines.popitem(last=False)
+
+    def discard(self, key):
+        """ Forget `key`, which exists now
+        """
+        with self.lock:
+            self.deadlines.pop(key, None)
+
+    def __contains__(self, key):
+        """ Tell whether `key` is known to be missing
+        """
+        now = self.clock()
+        with self.lock:
+            deadlines = self.deadlines
+            while deadlines:
+                oldest = next(iter(deadlines))
+                if deadlines[oldest] > now:
+                    break
+                del deadlines[oldest]
+            return key in deadlines
+
+    def __len__(self):
+        """ Number of keys remembered
+        """
+        return len(self.deadlines)
+
+
+class BloomFilter():
+    """ BloomFilter holds `capacity` keys with a false positive rate of
+    `error_rate`, in one bit per position.
+
+    Keys cannot be removed, see BloomNegativeCache.discard.
+    """
+
+    def __init__(self, capacity, error_rate):
+        """ Size the filter with the optimal number of bits and hashes
+        """
+        self.capacity = capacity
+        self.size = max(8, int(math.ceil(
+            -capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(
+            self.size / capacity * math.log(2))))
+        self.bits = bytearray(-(-self.size // 8))
+        self.count = 0
+
+    def _indexes(self, key):
+        """ The distinct bit positions of `key`, by double hashing
+        """
+        first = hash(key)
+        second = hash((key, 0x9E3779B1)) | 1
+        size = self.size
+        return {(first + index * second) % size
+                for index in range(self.hashes)}
+
+    def add(self, key):
+        """ Add `key` to the filter
+        """
+        bits = self.bits
+        for index in self._indexes(key):
+            bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        """ Tell whether the filter may hold `key`
+        """
+        bits = self.bits
+        return all(bits[index >> 3] >> (index & 7) & 1
+                   for index in self._indexes(key))
+
+
+class BloomNegativeCache():
+    """ BloomNegativeCache remembers missing keys in a scalable Bloom
+    filter: far less memory than NegativeCache for many keys, at
+    the cost of a false positive rate of about `error_rate`.
+
+    A false positive makes an existing key look missing, so the rate
+    should stay low. The filter starts sized for `capacity` keys and adds
+    a filter twice as large, with a tighter error rate, each time the
+    last one is full, which keeps the total rate near `error_rate`.
+
+    Bits cannot be cleared without clearing other keys, so `discard`
+    keeps the keys a generation holds (or falsely seems to) that were
+    found since exactly in its `found` set instead.
+
+    The filters are dropped in two generations: a key is remembered
+    between `ttl` and twice `ttl` seconds, or until two generations
+    later when `ttl` is None. A new generation also starts once
+    `max_found` keys of the current one were found, which bounds the
+    `found` sets. Like NegativeCache, it has its own lock.
+    """
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, capacity=10000, error_rate=0.001, ttl=60.0,
+                 clock=None, max_found=None):
+        """ Initiliaze, `max_found` defaulting to `capacity`
+        """
+        self.capacity = capacity
+        self.max_found = max_found or capacity
+        self.error_rate = error_rate
+        self.ttl = ttl
+        self.clock = clock or time.monotonic
+        self.current = self._new_generation()
+        self.previous = []
+        self.found = set()
+        self.previous_found = set()
+        self.rotated = self.clock()
+        self.lock = threading.Lock()
+
+    def _new_generation(self):
+        """ Return the filters of an empty generation
+        """
+        return [BloomFilter(
+            self.capacity, self.error_rate * (1 - self.TIGHTENING))]
+
+    def _rotate(self):
+        """ Start a new generation once the current one is `ttl` old
+        """
+        now = self.clock()
+        if now - self.rotated >= self.ttl:
+            # two periods elapsed: the previous generation is too old too
+            self._shift(now - self.rotated < 2 * self.ttl)
+            self.rotated = now
+
+    def _shift(self, keep=True):
+        """ Make the current generation the previous one, or drop both
+        """
+        self.previous = self.current if keep else []
+        self.previous_found = self.found if keep else set()
+        self.current = self._new_generation()
+        self.found = set()
+
+    def add(self, key):
+        """ Remember that `key` is missing
+        """
+        with self.lock:
+            if self.ttl is not None:
+                self._rotate()
+            self.found.discard(key)
+            for bloom in self.current:
+                if key in bloom:
+                    return
+            last = self.current[-1]
+            if last.count >= last.capacity:
+                last = BloomFilter(
+                    last.capacity * self.GROWTH,
+                    self.error_rate * (1 - self.TIGHTENING) *
+                    self.TIGHTENING ** len(self.current))
+                self.current.append(last)
+            last.add(key)
+
+    def discard(self, key):
+        """ Forget `key`, which exists now
+        """
+        with self.lock:
+            if any(key in bloom for bloom in self.previous):
+                self.previous_found.add(key)
+            if any(key in bloom for bloom in self.current):
+                self.found.add(key)
+                if len(self.found) >= self.max_found:
+                    self._shift()
+
+    def __contains__(self, key):
+        """ Tell whether `key` is known (or falsely believed) missing
+        """
+        with self.lock:
+            if self.ttl is not None:
+                self._rotate()
+            if key not in self.found and \
+                    any(key in bloom for bloom in self.current):
+                return True
+            return key not in self.previous_found and \
+                any(key in bloom for bloom in self.previous)
+
+    def __len__(self):
+        """ Number of keys added to the live generations
+        """
+        return sum(bloom.count for bloom in self.current + self.previous)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+""" Slot list module: keys and their bookkeeping packed in parallel arrays
+instead of dictionaries and node objects
+"""
+from array import array
+
+
+class SlotTable():
+    """ SlotTable gives every key a slot number, the index of the key in
+    the `keys` list, that callers use to keep metadata in parallel arrays.
+
+    The slot of a key is found through an open addressing hash table of
+    slot numbers (linear probing, at most half full) held in an array,
+    not a dictionary: a dictionary would need an int object for every
+    slot number, which costs more than the arrays of metadata. Removed
+    slots are reused and the table doubles when every slot is taken.
+    """
+    MULTIPLIER = 0x9E3779B97F4A7C15
+    MASK = (1 << 64) - 1
+
+    def __init__(self, capacity=0):
+        """ Initiliaze with room for `capacity` keys
+        """
+        self.keys = []
+        self.free = array("i")
+        self.index = array("i")
+        self.shift = 64
+        self._grow(max(1, capacity or 0))
+
+    def _grow(self, size):
+        """ Add `size` free slots
+        """
+        start = len(self.keys)
+        self.keys.extend([None] * size)
+        self.free.extend(range(start + size - 1, start - 1, -1))
+        self._rehash()
+
+    def _rehash(self):
+        """ Build the hash table of the slots in use, with twice as many
+        positions as slots at least
+        """
+        bits = max(3, (2 * len(self.keys) - 1).bit_length())
+        self.shift = 64 - bits
+        self.index = array("i", [-1]) * (1 << bits)
+        for slot, key in enumerate(self.keys):
+            if key is not None:
+                self._place(key, slot)
+
+    def _home(self, key):
+        """ First position of `key` in the hash table, by Fibonacci
+        hashing so that regular int keys spread out
+        """
+        return (hash(key) * self.MULTIPLIER & self.MASK) >> self.shift
+
+    def _place(self, key, slot):
+        """ Store `slot` at the first empty position from the home of
+        `key`
+        """
+        index = self.index
+        mask = len(index) - 1
+        position = self._home(key)
+        while index[position] != -1:
+            position = (position + 1) & mask
+        index[position] = slot
+
+    def _position(self, key):
+        """ Position of `key` in the hash table, -1 if it is absent
+        """
+        index, keys = self.index, self.keys
+        mask = len(index) - 1
+        position = self._home(key)
+        while True:
+            slot = index[position]
+            if slot == -1:
+                return -1
+            found = keys[slot]
+            if found is key or found == key:
+                return position
+            position = (position + 1) & mask
+
+    def __len__(self):
+        """ Number of keys
+        """
+        return len(self.keys) - len(self.free)
+
+    def __contains__(self, key):
+        """ Tell whether `key` has a slot
+        """
+        return self._position(key) != -1
+
+    def find(self, key):
+        """ Return the slot of `key`, -1 if it is absent
+        """
+        position = self._position(key)
+        return -1 if position == -1 else self.index[position]
+
+    def assign(self, key):
+        """ Give a slot to a new key and return it
+        """
+        if not self.free:
+            self._grow(len(self.keys))
+        slot = self.free.pop()
+        self.keys[slot] = key
+        self._place(key, slot)
+        return slot
+
+    def release(self, key):
+        """ Free the slot of `key` and return it
+
+        The entries that follow in the same run of the hash table are
+        shifted back, so no tombstone is left behind.
+        """
+        position = self._position(key)
+        if position == -1:
+            raise KeyError(key)
+        index, keys = self.index, self.keys
+        mask = len(index) - 1
+        slot = index[position]
+        index[position] = -1
+        following = position
+        while True:
+            following = (following + 1) & mask
+            moved = index[following]
+            if moved == -1:
+                break
+            home = self._home(keys[moved])
+            if (following - home) & mask >= (following - position) & mask:
+                index[position] = moved
+                index[following] = -1
+                position = following
+        keys[slot] = None
+        self.free.append(slot)
+        return slot
+
+    def __getstate__(self):
+        """ Leave the hash table out of pickles: str hashes change from a
+        process to the next
+        """
+        state = dict(vars(self))
+        del state["index"]
+        return state
+
+    def __setstate__(self, state):
+        """ Rebuild the hash table of an unpickled table
+        """
+        vars(self).update(state)
+        self._rehash()
+
+
+class SlotList(SlotTable):
+    """ SlotList keeps keys in order, from first to last, with O(1)
+    append, move_to_end and remove.
+
+    The neighbours of a key are the slot numbers at its slot of the
+    `older` and `newer` arrays (-1 at the ends), so a key costs its slot
+    in `keys`, 8 bytes of links and 8 to 16 bytes of hash table, about a
+    third of an OrderedDict entry.
+    """
+
+    def __init__(self, capacity=0):
+        """ Initiliaze with room for `capacity` keys
+        """
+        self.older = array("i")
+        self.newer = array("i")
+        self.first = self.last = -1
+        super().__init__(capacity)
+
+    def _grow(self, size):
+        """ Add `size` free slots
+        """
+        self.older.extend([-1] * size)
+        self.newer.extend([-1] * size)
+        super()._grow(size)
+
+    def __iter__(self):
+        """ Iterate over the keys from first to last
+        """
+        keys, newer = self.keys, self.newer
+        slot = self.first
+        while slot != -1:
+            yield keys[slot]
+            slot = newer[slot]
+
+    def __reversed__(self):
+        """ Iterate over the keys from last to first
+        """
+        keys, older = self.keys, self.older
+        slot = self.last
+        while slot != -1:
+            yield keys[slot]
+            slot = older[slot]
+
+    def append(self, key):
+        """ Add a new key after the last one
+        """
+        self._link(self.assign(key))
+
+    def extend(self, keys):
+        """ Append new keys in order
+        """
+        for key in keys:
+            self._link(self.assign(key))
+
+    def move_to_end(self, key):
+        """ Make `key` the last key
+        """
+        slot = self.find(key)
+        if slot == -1:
+            raise KeyError(key)
+        if slot != self.last:
+            self._unlink(slot)
+            self._link(slot)
+
+    def remove(self, key):
+        """ Remove `key`
+        """
+        self._unlink(self.release(key))
+
+    def _link(self, slot):
+        """ Link a slot after the last one
+        """
+        last = self.last
+        self.older[slot] = last
+        self.newer[slot] = -1
+        if last == -1:
+            self.first = slot
+        else:
+            self.newer[last] = slot
+        self.last = slot
+
+    def _unlink(self, slot):
+        """ Join the neighbours of a slot
+        """
+        older, newer = self.older[slot], self.newer[slot]
+        if older == -1:
+            self.first = newer
+        else:
+            self.newer[older] = newer
+        if newer == -1:
+            self.last = older
+        else:
+            self.older[newer] = older
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+""" Tag index module: find the keys of a tag or of a key prefix without a
+scan of the cache
+"""
+
+
+class PrefixTrie():
+    """ PrefixTrie holds str keys in a tree of one node per character.
+
+    A node is a dictionary of its children by character, plus the entry
+    "" when a key ends there. Finding the keys of a prefix walks down the
+    prefix then visits only the subtree below it.
+    """
+
+    def __init__(self):
+        """ Initiliaze
+        """
+        self.root = {}
+
+    def add(self, key):
+        """ Add a key
+        """
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def remove(self, key):
+        """ Remove a key and the nodes left without any key
+        """
+        path = []
+        node = self.root
+        for char in key:
+            path.append((node, char))
+            node = node.get(char)
+            if node is None:
+                return
+        node.pop("", None)
+        for parent, char in reversed(path):
+            if parent[char]:
+                break
+            del parent[char]
+
+    def keys(self, prefix):
+        """ Return the keys starting with `prefix`
+        """
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        keys = []
+        stack = [(node, prefix)]
+        while stack:
+            node, key = stack.pop()
+            for char, child in node.items():
+                if char:
+                    stack.append((child, key + char))
+                else:
+                    keys.append(key)
+        return keys
+
+
+class TagIndex():
+    """ TagIndex maps the tags of the entries to their keys, and keeps the
+    str keys in a PrefixTrie when built with `prefixes=True`.
+
+    It is false while it holds nothing to maintain, so a cache only pays
+    for it once tags or prefixes are used.
+    """
+
+    def __init__(self, prefixes=False):
+        """ Initiliaze
+        """
+        self.tag_keys = {}
+        self.key_tags = {}
+        self.trie = PrefixTrie() if prefixes else None
+
+    def __bool__(self):
+        """ Tell whether the index has entries to maintain
+        """
+        return bool(self.key_tags) or self.trie is not None
+
+    def add(self, key, tags=None):
+        """ Index a key put with `tags`, replacing its previous tags
+
+        `tags` is an iterable of tags, repeated ones counted once, or a
+        single str tag.
+        """
+        old = self.key_tags.pop(key, None)
+        if old:
+            self._untag(key, old)
+        if tags:
+            tags = (tags,) if isinstance(tags, str) else \
+                tuple(dict.fromkeys(tags))
+            self.key_tags[key] = tags
+            for tag in tags:
+                keys = self.tag_keys.get(tag)
+                if keys is None:
+                    self.tag_keys[tag] = {key}
+                else:
+                    keys.add(key)
+        if self.trie is not None and isinstance(key, str):
+            self.trie.add(key)
+
+    def remove(self, key):
+        """ Forget a key that left the cache
+        """
+        tags = self.key_tags.pop(key, None)
+        if tags:
+            self._untag(key, tags)
+        if self.trie is not None and isinstance(key, str):
+            self.trie.remove(key)
+
+    def _untag(self, key, tags):
+        """ Remove a key from the keys of its tags
+        """
+        for tag in tags:
+            keys = self.tag_keys[tag]
+            keys.discard(key)
+            if not keys:
+                del self.tag_keys[tag]
+
+    def tagged(self, tag):
+        """ Return the keys of `tag`
+        """
+        return list(self.tag_keys.get(tag, ()))
+
+    def prefixed(self, prefix):
+        """ Return the keys starting with `prefix`
+        """
+        if self.trie is None:
+            raise ValueError("the cache was built without prefix_index")
+        return self.trie.keys(prefix)
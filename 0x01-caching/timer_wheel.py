@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+""" TimerWheel module
+"""
+
+
+class TimerWheel():
+    """ TimerWheel keeps deadlines in a hierarchy of wheels of SLOTS
+    slots each:
+      - level 0 has one slot per tick
+      - each level above covers SLOTS times the span of the one below
+
+    Scheduling and cancelling a timer are O(1). Advancing the clock only
+    visits the slots of the elapsed ticks, and a timer is moved down one
+    level at most LEVELS - 1 times before it fires, so the cost per timer
+    is amortized O(1) whatever the number of pending timers.
+    """
+    SLOTS = 64
+    LEVELS = 4
+
+    def __init__(self, resolution=1.0, now=0.0):
+        """ Initiliaze
+
+        Args:
+            resolution (float): length of a tick, in seconds.
+            now (float): current time on the clock used with the wheel.
+        """
+        self.resolution = resolution
+        self.current = int(now // resolution)
+        self.wheels = [[{} for _ in range(self.SLOTS)]
+                       for _ in range(self.LEVELS)]
+        self.timers = {}
+
+    def __len__(self):
+        """ Number of pending timers
+        """
+        return len(self.timers)
+
+    def schedule(self, key, deadline):
+        """ Fire `key` once the clock reaches `deadline`, replacing any
+        timer already pending for it
+        """
+        self.cancel(key)
+        # round up so a timer never fires before its deadline
+        tick = -int(-deadline // self.resolution)
+        self._place(key, max(tick, self.current + 1))
+
+    def cancel(self, key):
+        """ Drop the pending timer of `key`, if any
+        """
+        location = self.timers.pop(key, None)
+        if location is not None:
+            level, slot = location
+            del self.wheels[level][slot][key]
+
+    def advance(self, now):
+        """ Move the clock to `now` and return the keys whose timer fired
+        """
+        target = int(now // self.resolution)
+        expired = []
+        if not self.timers:
+            self.current = max(self.current, target)
+            return expired
+        while self.current < target:
+            self.current += 1
+            tick = self.current
+            for level in range(1, self.LEVELS):
+                span = self.SLOTS ** level
+                if tick % span:
+                    break
+                self._cascade(level, (tick // span) % self.SLOTS)
+            slot = self.wheels[0][tick % self.SLOTS]
+            if slot:
+                for key in slot:
+                    del self.timers[key]
+                expired.extend(slot)
+                slot.clear()
+            if not self.timers:
+                self.current = target
+        return expired
+
+    def _place(self, key, tick):
+        """ Put a timer in the slot of the lowest level that spans it
+        """
+        delta = tick - self.current
+        for level in range(self.LEVELS):
+            span = self.SLOTS ** level
+            if delta < span * self.SLOTS:
+                slot = (tick // span) % self.SLOTS
+                break
+        else:
+            # beyond the last wheel: park it in the farthest slot, it is
+            # placed again with its real tick when that slot cascades
+            span = self.SLOTS ** level
+            slot = ((self.current + span * self.SLOTS - 1) // span) % \
+                self.SLOTS
+        self.wheels[level][slot][key] = tick
+        self.timers[key] = (level, slot)
+
+    def _cascade(self, level, slot):
+        """ Move the timers of a slot down to the lower levels
+        """
+        timers = self.wheels[level][slot]
+        self.wheels[level][slot] = {}
+        for key, tick in timers.items():
+            self._place(key, max(tick, self.current))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+""" Write-behind module
+"""
+import threading
+
+
+class WriteBehindQueue():
+    """ WriteBehindQueue collects the entries written to a cache and hands
+    them to `writer(batch)` from a background thread, `batch` being a
+    dictionary of keys to items.
+
+    Writes to the same key are coalesced, only its last item is kept. A
+    batch is written every `interval` seconds, or sooner once
+    `batch_size` keys are dirty. A batch whose write fails is merged back
+    into the queue, without overwriting newer items, and retried with the
+    next one. `discard` drops the pending write of a key deleted from the
+    cache (not of one invalidated, which stays queued); a batch already
+    handed to the writer is still written.
+    """
+
+    def __init__(self, writer, batch_size=100, interval=1.0):
+        """ Initiliaze and start the flushing thread
+        """
+        self.writer = writer
+        self.batch_size = batch_size
+        self.interval = interval
+        self.dirty = {}
+        self.lock = threading.Lock()
+        self.flushing = threading.Lock()
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.errors = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __len__(self):
+        """ Number of dirty keys waiting to be written
+        """
+        return len(self.dirty)
+
+    def mark(self, key, item):
+        """ Queue the write of `item` under `key`
+        """
+        with self.lock:
+            self.dirty[key] = item
+            full = len(self.dirty) >= self.batch_size
+        if full:
+            self.wakeup.set()
+
+    def mark_many(self, items):
+        """ Queue the writes of a dictionary of items
+        """
+        with self.lock:
+            self.dirty.update(items)
+            full = len(self.dirty) >= self.batch_size
+        if full:
+            self.wakeup.set()
+
+    def discard(self, key):
+        """ Drop the pending write of `key`
+        """
+        with self.lock:
+            self.dirty.pop(key, None)
+
+    def discard_many(self, keys):
+        """ Drop the pending writes of many keys
+        """
+        with self.lock:
+            for key in keys:
+                self.dirty.pop(key, None)
+
+    def flush(self):
+        """ Write the dirty entries now, in one call of the writer
+        """
+        with self.flushing:
+            with self.lock:
+                batch, self.dirty = self.dirty, {}
+            if not batch:
+                return
+            try:
+                self.writer(batch)
+            except Exception:
+                self.errors += 1
+                with self.lock:
+                    batch.update(self.dirty)
+                    self.dirty = batch
+                raise
+
+    def close(self):
+        """ Stop the flushing thread after writing the dirty entries
+        """
+        self.closed = True
+        self.wakeup.set()
+        self.thread.join()
+        self.flush()
+
+    def _run(self):
+        """ Flush on every wake-up until the queue is closed
+        """
+        while not self.closed:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # counted in `errors`, the batch is retried next time
+                pass
@@ -0,0 +1,114 @@
+import net from 'net';
+
+// Client of the cache server of 0x01-caching (cache_server.py); the
+// frames are described in 0x01-caching/cache_protocol.py
+const GET = 1;
+const SET = 2;
+const DELETE = 3;
+const MGET = 4;
+const PING = 5;
+const STATS = 6;
+
+const OK = 0;
+const ERROR = 2;
+
+const toBuffer = (value) => (Buffer.isBuffer(value) ? value : Buffer.from(String(value)));
+
+export default class CacheClient {
+    // options are those of net.createConnection: { host, port } or { path }
+    constructor(options = { host: '127.0.0.1', port: 11311 }) {
+        this.socket = net.createConnection(options);
+        this.socket.setNoDelay(true);
+        this.buffer = Buffer.alloc(0);
+        // requests waiting for their response, in the order they were sent
+        this.pending = [];
+        this.socket.on('data', (data) => this.onData(data));
+        this.socket.on('error', (error) => this.failAll(error));
+        this.socket.on('close', () => this.failAll(new Error('Cache server connection closed')));
+    }
+
+    onData(data) {
+        this.buffer = this.buffer.length ? Buffer.concat([this.buffer, data]) : data;
+        while (this.buffer.length >= 5) {
+            const length = this.buffer.readUInt32BE(0);
+            if (this.buffer.length < 4 + length) break;
+            const status = this.buffer[4];
+            const payload = this.buffer.subarray(5, 4 + length);
+            this.buffer = this.buffer.subarray(4 + length);
+            const { resolve, reject, decode } = this.pending.shift();
+            if (status === ERROR) reject(new Error(payload.toString()));
+            else resolve(decode(status, payload));
+        }
+    }
+
+    failAll(error) {
+        const pending = this.pending;
+        this.pending = [];
+        pending.forEach(({ reject }) => reject(error));
+    }
+
+    // requests can be sent without waiting: the server answers in order
+    send(code, payload, decode) {
+        return new Promise((resolve, reject) => {
+            const header = Buffer.alloc(5);
+            header.writeUInt32BE(payload.length + 1, 0);
+            header[4] = code;
+            this.pending.push({ resolve, reject, decode });
+            this.socket.write(Buffer.concat([header, payload]));
+        });
+    }
+
+    get(key) {
+        return this.send(GET, toBuffer(key), (status, value) => (status === OK ? value : null));
+    }
+
+    set(key, value, ttlSeconds) {
+        const keyBuffer = toBuffer(key);
+        const header = Buffer.alloc(6);
+        header.writeUInt32BE(ttlSeconds ? Math.max(1, Math.round(ttlSeconds * 1000)) : 0, 0);
+        header.writeUInt16BE(keyBuffer.length, 4);
+        return this.send(SET, Buffer.concat([header, keyBuffer, toBuffer(value)]), () => true);
+    }
+
+    del(key) {
+        return this.send(DELETE, toBuffer(key), (status) => status === OK);
+    }
+
+    mget(keys) {
+        const parts = [Buffer.alloc(2)];
+        parts[0].writeUInt16BE(keys.length, 0);
+        keys.forEach((key) => {
+            const keyBuffer = toBuffer(key);
+            const size = Buffer.alloc(2);
+            size.writeUInt16BE(keyBuffer.length, 0);
+            parts.push(size, keyBuffer);
+        });
+        return this.send(MGET, Buffer.concat(parts), (status, payload) => {
+            const values = [];
+            let position = 2;
+            for (let index = 0; index < payload.readUInt16BE(0); index += 1) {
+                const size = payload.readInt32BE(position);
+                position += 4;
+                if (size < 0) {
+                    values.push(null);
+                } else {
+                    values.push(payload.subarray(position, position + size));
+                    position += size;
+                }
+            }
+            return values;
+        });
+    }
+
+    ping() {
+        return this.send(PING, Buffer.alloc(0), () => true);
+    }
+
+    stats() {
+        return this.send(STATS, Buffer.alloc(0), (status, payload) => JSON.parse(payload.toString()));
+    }
+
+    close() {
+        this.socket.end();
+    }
+}